@@ -0,0 +1,61 @@
+"""
+Compares the installed JSON codecs on Solr-shaped update batches and query
+responses.
+
+    python benchmarks/codec.py --docs 500 --rounds 50
+"""
+from __future__ import print_function
+import argparse
+import random
+import timeit
+
+from solnado.codec import available_codecs, get_codec
+
+WORDS = (
+    'solr lucene index shard replica query filter facet cursor commit '
+    'tornado async batch stream router leader collection schema field'
+).split()
+
+
+def make_doc(i):
+    rnd = random.Random(i)
+    return {
+        'id':          'doc-%d' % i,
+        'title_t':     ' '.join(rnd.choice(WORDS) for _ in range(8)),
+        'body_t':      ' '.join(rnd.choice(WORDS) for _ in range(200)),
+        'tags_ss':     [rnd.choice(WORDS) for _ in range(5)],
+        'price_f':     rnd.random() * 100,
+        'stock_i':     rnd.randint(0, 1000),
+        'in_stock_b':  rnd.random() > 0.5,
+        'created_dt':  '2016-01-%02dT00:00:00Z' % (i % 28 + 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--docs',   type=int, default=500)
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    docs = [make_doc(i) for i in range(args.docs)]
+    response = {
+        'responseHeader': {'status': 0, 'QTime': 3, 'params': {'q': '*:*'}},
+        'response':       {'numFound': 10 ** 6, 'start': 0, 'docs': docs},
+    }
+    body = get_codec('json').dumps(response)
+    print('%d docs, %d bytes per batch' % (len(docs), len(body)))
+
+    print('%-10s %12s %12s' % ('codec', 'encode ms', 'decode ms'))
+    for name in available_codecs():
+        codec = get_codec(name)
+        enc = min(timeit.repeat(
+            lambda: codec.dumps(docs), number=args.rounds, repeat=3
+        )) / args.rounds
+        dec = min(timeit.repeat(
+            lambda: codec.loads(body), number=args.rounds, repeat=3
+        )) / args.rounds
+        print('%-10s %12.3f %12.3f' % (name, enc * 1000, dec * 1000))
+
+
+if __name__ == '__main__':
+    main()
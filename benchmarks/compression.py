@@ -0,0 +1,69 @@
+"""
+Measures what compressing update bodies costs in CPU and saves in bytes, for
+each encoding and level ``SolrClient(compress=...)`` accepts. The last column
+is the link speed below which compressing wins: slower links spend more time
+sending the saved bytes than the compressor spends on the CPU.
+
+    python benchmarks/compression.py --docs 500 --rounds 20
+"""
+from __future__ import print_function
+import argparse
+import random
+import timeit
+
+from solnado.client import ENCODINGS, compress_body
+from solnado.codec import get_codec
+
+WORDS = (
+    'solr lucene index shard replica query filter facet cursor commit '
+    'tornado async batch stream router leader collection schema field'
+).split()
+
+
+def make_doc(i):
+    rnd = random.Random(i)
+    return {
+        'id':          'doc-%d' % i,
+        'title_t':     ' '.join(rnd.choice(WORDS) for _ in range(8)),
+        'body_t':      ' '.join(rnd.choice(WORDS) for _ in range(200)),
+        'tags_ss':     [rnd.choice(WORDS) for _ in range(5)],
+        'price_f':     rnd.random() * 100,
+        'stock_i':     rnd.randint(0, 1000),
+        'in_stock_b':  rnd.random() > 0.5,
+        'created_dt':  '2016-01-%02dT00:00:00Z' % (i % 28 + 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--docs',   type=int, default=500)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    body = get_codec().dumps([make_doc(i) for i in range(args.docs)])
+    print('%d docs, %d bytes per batch' % (args.docs, len(body)))
+
+    print('%-8s %5s %10s %7s %10s %10s %14s' % (
+        'encoding', 'level', 'bytes', 'ratio', 'ms', 'MB/s', 'wins below'
+    ))
+    for encoding in sorted(ENCODINGS):
+        for level in (1, 6, 9):
+            compressed = compress_body(body, encoding, level)
+            secs = min(timeit.repeat(
+                lambda: compress_body(body, encoding, level),
+                number=args.rounds, repeat=3,
+            )) / args.rounds
+            saved = len(body) - len(compressed)
+            print('%-8s %5d %10d %6.1fx %10.3f %10.1f %9.0f Mbit' % (
+                encoding,
+                level,
+                len(compressed),
+                float(len(body)) / len(compressed),
+                secs * 1000,
+                len(body) / secs / 1e6,
+                saved * 8 / secs / 1e6,
+            ))
+
+
+if __name__ == '__main__':
+    main()
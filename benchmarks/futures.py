@@ -0,0 +1,89 @@
+"""
+Per call overhead of the callback API solnado had before methods returned
+Futures, ``fetch(request, callback=)`` waited on with ``gen.Task``, against
+yielding the Future a method returns now. The HTTP client is replaced by
+one that resolves immediately so only the client overhead is measured.
+
+tornado 6 dropped ``fetch(callback=)``, so the stub runs callbacks the way
+tornado 5 did, on the next IOLoop iteration.
+
+    python benchmarks/futures.py --calls 20000
+"""
+from __future__ import print_function
+from functools import partial
+import argparse
+import time
+
+from tornado import gen, ioloop
+from tornado.concurrent import Future
+
+from solnado import SolrClient
+
+
+class ImmediateHTTPClient(object):
+    def fetch(self, request, callback=None, raise_error=True):
+        f = Future()
+        f.set_result(request)
+        if callback is not None:
+            loop = ioloop.IOLoop.current()
+            f.add_done_callback(
+                lambda f: loop.add_callback(callback, f.result())
+            )
+        return f
+
+
+def baseline_schema(c, collection, callback=None, indent='off',
+        req_kwargs={}, wt='json'):
+    # SolrClient.schema before it returned a Future
+    url = c.mk_url('solr', collection, 'schema',
+        **{'indent':indent, 'wt':wt}
+    )
+
+    request = c.mk_req(url, **req_kwargs)
+    c.client.fetch(request, callback=callback)
+
+
+def task(func):
+    # what gen.Task did: hand a callback to func and wait on a Future
+    f = Future()
+    func(callback=f.set_result)
+    return f
+
+
+@gen.coroutine
+def callback_style(c, calls):
+    start = time.time()
+    for _ in range(calls):
+        yield task(partial(baseline_schema, c, 'c'))
+    raise gen.Return(time.time() - start)
+
+
+@gen.coroutine
+def future_style(c, calls):
+    start = time.time()
+    for _ in range(calls):
+        yield c.schema('c')
+    raise gen.Return(time.time() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=20000)
+    args = parser.parse_args()
+
+    c = SolrClient()
+    c.client = ImmediateHTTPClient()
+    loop = ioloop.IOLoop.current()
+
+    for name, fn in (
+        ('callback + gen.Task', callback_style),
+        ('yield future',        future_style),
+    ):
+        elapsed = min(
+            loop.run_sync(partial(fn, c, args.calls)) for _ in range(3)
+        )
+        print('%-20s %8.2f us/call' % (name, elapsed / args.calls * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Compares javabin with JSON for a large result page and an update batch:
+body size, encode time and decode time, including building the
+``QueryResult`` documents.
+
+    python benchmarks/javabin.py --docs 1000 --rounds 10
+"""
+from __future__ import print_function
+import argparse
+import random
+import timeit
+from io import BytesIO
+
+from tornado.httpclient import HTTPRequest, HTTPResponse
+
+from solnado import javabin
+from solnado.codec import get_codec
+from solnado.results import QueryResult
+
+WORDS = (
+    'solr lucene index shard replica query filter facet cursor commit '
+    'tornado async batch stream router leader collection schema field'
+).split()
+
+
+def make_doc(i):
+    rnd = random.Random(i)
+    return {
+        'id':          'doc-%d' % i,
+        'title_t':     ' '.join(rnd.choice(WORDS) for _ in range(8)),
+        'body_t':      ' '.join(rnd.choice(WORDS) for _ in range(200)),
+        'tags_ss':     [rnd.choice(WORDS) for _ in range(5)],
+        'price_f':     rnd.random() * 100,
+        'stock_i':     rnd.randint(0, 1000),
+        'in_stock_b':  rnd.random() > 0.5,
+        'created_dt':  '2016-01-%02dT00:00:00Z' % (i % 28 + 1),
+    }
+
+
+def best(func, rounds):
+    return min(timeit.repeat(func, number=rounds, repeat=3)) / rounds * 1000
+
+
+def page(body, codec):
+    response = HTTPResponse(
+        HTTPRequest('http://localhost:8983/solr/c/query'), 200,
+        buffer=BytesIO(body),
+    )
+    return QueryResult(response, codec=codec).docs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--docs',   type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=10)
+    args = parser.parse_args()
+
+    docs   = [make_doc(i) for i in range(args.docs)]
+    header = {'status': 0, 'QTime': 3, 'params': {'q': '*:*'}}
+    bin_codec = javabin.JavabinCodec()
+
+    json_res = get_codec('json').dumps({
+        'responseHeader': header,
+        'response':       {'numFound': 10 ** 6, 'start': 0, 'docs': docs},
+    })
+    bin_res = javabin.dumps(javabin.NamedList([
+        ('responseHeader', javabin.NamedList(header.items(), ordered=True)),
+        ('response',       javabin.DocumentList(docs, num_found=10 ** 6)),
+    ]))
+
+    print('%d docs per page and batch' % args.docs)
+    print('%-24s %10s %10s %10s' % ('', 'bytes', 'encode ms', 'decode ms'))
+
+    for name in ('json', 'orjson'):
+        try:
+            codec = get_codec(name)
+        except ImportError:
+            continue
+        print('%-24s %10d %10.2f %10.2f' % (
+            'page %s' % name,
+            len(json_res),
+            best(lambda: codec.dumps(docs), args.rounds),
+            best(lambda: page(json_res, codec), args.rounds),
+        ))
+    print('%-24s %10d %10s %10.2f' % (
+        'page javabin', len(bin_res), '-',
+        best(lambda: page(bin_res, bin_codec), args.rounds),
+    ))
+
+    for name in ('json', 'orjson'):
+        try:
+            codec = get_codec(name)
+        except ImportError:
+            continue
+        print('%-24s %10d %10.2f %10s' % (
+            'update %s' % name,
+            len(codec.dumps(docs)),
+            best(lambda: codec.dumps(docs), args.rounds),
+            '-',
+        ))
+    print('%-24s %10d %10.2f %10s' % (
+        'update javabin',
+        len(javabin.update_request(docs)),
+        best(lambda: javabin.update_request(docs), args.rounds),
+        '-',
+    ))
+
+
+if __name__ == '__main__':
+    main()
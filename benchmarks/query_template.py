@@ -0,0 +1,59 @@
+"""
+Measures the client-side cost of starting a query: building the parameters,
+the URL and the tornado request, and handing it to the HTTP client. The
+HTTP client never answers, so no network or response parsing is counted.
+
+    python benchmarks/query_template.py --calls 20000
+"""
+from __future__ import print_function
+import argparse
+import timeit
+
+from tornado.concurrent import Future
+
+from solnado import CollectionHandle, QueryTemplate, SolrClient
+
+STATIC = {
+    'defType': 'edismax',
+    'qf':      'title_t^4 body_t tags_ss^2',
+    'pf':      'title_t^8',
+    'fl':      'id,title_t,price_f,score',
+    'bq':      'in_stock_b:true^2',
+    'rows':    20,
+}
+
+
+class NullHTTPClient(object):
+    def fetch(self, request, raise_error=True):
+        return Future()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=20000)
+    args = parser.parse_args()
+
+    client = SolrClient(coalesce=False)
+    client.client = NullHTTPClient()
+    handle   = CollectionHandle(client, 'products')
+    template = QueryTemplate(STATIC)
+    terms    = ['term%d' % i for i in range(args.calls)]
+
+    def query():
+        for term in terms:
+            q = dict(STATIC)
+            q.update({'q': term, 'start': 0})
+            client.query('products', q)
+
+    def templated():
+        for term in terms:
+            handle.query(template, {'q': term, 'start': 0})
+
+    print('%-22s %10s' % ('', 'us/call'))
+    for name, func in (('SolrClient.query', query), ('CollectionHandle.query', templated)):
+        secs = min(timeit.repeat(func, number=1, repeat=3))
+        print('%-22s %10.2f' % (name, secs / args.calls * 1e6))
+
+
+if __name__ == '__main__':
+    main()
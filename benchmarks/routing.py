@@ -0,0 +1,142 @@
+"""
+Compares plain ``add_json_documents`` against ``add_json_documents_routed`` on
+a local stand-in cluster. Each stand-in node owns one shard and forwards any
+document it does not own to the owning node, the way SolrCloud does.
+
+    python benchmarks/routing.py --nodes 4 --docs 20000 --batch 500
+"""
+from __future__ import print_function
+from functools import partial
+import argparse
+import json
+import socket
+import time
+
+from tornado import gen, ioloop, web
+from tornado.httpclient import AsyncHTTPClient
+from tornado.httpserver import HTTPServer
+
+from solnado.client import SolrClient
+from solnado.routing import CompositeIdRouter
+
+STATS = {'requests': 0, 'forwarded_docs': 0, 'forwarded_requests': 0}
+
+
+def free_port():
+    s = socket.socket()
+    s.bind(('127.0.0.1', 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+def cluster_status(ports):
+    step = 0x100000000 // len(ports)
+    shards = {}
+    for i, port in enumerate(ports):
+        lo = (0x80000000 + i * step) & 0xffffffff
+        hi = (lo + step - 1) & 0xffffffff
+        shards['shard%d' % i] = {
+            'range':    '%08x-%08x' % (lo, hi),
+            'state':    'active',
+            'replicas': {'core_node%d' % i: {
+                'core':     'c_shard%d' % i,
+                'base_url': 'http://127.0.0.1:%d/solr' % port,
+                'state':    'active',
+                'leader':   'true',
+            }},
+        }
+    return {'cluster': {'collections': {'c': {
+        'router': {'name': 'compositeId'},
+        'shards': shards,
+    }}}}
+
+
+class UpdateHandler(web.RequestHandler):
+
+    def initialize(self, shard, router):
+        self.shard  = shard
+        self.router = router
+
+    @gen.coroutine
+    def post(self, core):
+        STATS['requests'] += 1
+        docs = json.loads(self.request.body.decode('utf8'))
+
+        if self.get_argument('distrib', 'true') == 'true':
+            http = AsyncHTTPClient()
+            forwards = []
+            for shard, shard_docs in self.router.group(docs).items():
+                if shard is self.shard:
+                    continue
+                STATS['forwarded_docs']     += len(shard_docs)
+                STATS['forwarded_requests'] += 1
+                forwards.append(http.fetch(
+                    shard.leader_url + '/update?distrib=false',
+                    method  = 'POST',
+                    body    = json.dumps(shard_docs),
+                    headers = {'Content-Type': 'application/json'},
+                ))
+            yield forwards
+
+        self.write({'responseHeader': {'status': 0}})
+
+
+def start_cluster(nodes):
+    ports  = [free_port() for _ in range(nodes)]
+    router = CompositeIdRouter.from_cluster_status(cluster_status(ports), 'c')
+    by_url = dict((s.leader_url, s) for s in router.shards)
+
+    for port in ports:
+        shard = [
+            s for u, s in by_url.items()
+            if u.startswith('http://127.0.0.1:%d/' % port)
+        ][0]
+        app = web.Application([
+            (r'/solr/([^/]+)/update', UpdateHandler,
+                {'shard': shard, 'router': router}),
+        ])
+        HTTPServer(app).listen(port, '127.0.0.1')
+
+    return ports, router
+
+
+@gen.coroutine
+def run(client, batches, router=None):
+    for k in STATS:
+        STATS[k] = 0
+    start = time.time()
+    for batch in batches:
+        if router:
+            yield client.add_json_documents_routed('c', batch, router)
+        else:
+            yield client.add_json_documents('c', batch)
+    raise gen.Return((time.time() - start, dict(STATS)))
+
+
+@gen.coroutine
+def main_coro(args):
+    ports, router = start_cluster(args.nodes)
+    client  = SolrClient(host='127.0.0.1', port=ports[0])
+    docs    = [{'id': 'doc%d' % i, 'title': 'x' * 200} for i in range(args.docs)]
+    batches = [docs[i:i + args.batch] for i in range(0, len(docs), args.batch)]
+
+    for name, r in (('node', None), ('routed', router)):
+        elapsed, stats = yield run(client, batches, r)
+        print('%-7s %6.3fs  requests=%-5d forwarded_docs=%-6d forwarded_requests=%d' % (
+            name, elapsed, stats['requests'], stats['forwarded_docs'],
+            stats['forwarded_requests'],
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--nodes', type=int, default=4)
+    parser.add_argument('--docs',  type=int, default=20000)
+    parser.add_argument('--batch', type=int, default=500)
+    args = parser.parse_args()
+    ioloop.IOLoop.current().run_sync(partial(main_coro, args))
+
+
+if __name__ == '__main__':
+    main()
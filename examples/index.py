@@ -1,4 +1,3 @@
-from functools import partial
 from solnado   import SolrClient
 from tornado   import ioloop, gen
 
@@ -6,31 +5,25 @@ c = SolrClient()
 
 @gen.coroutine
 def create_core():
-    p = partial(
-        c.core_create,
+    res = yield c.core_create(
         'foo',
     )
-    res = yield gen.Task(p)
     raise gen.Return(res)
 
 @gen.coroutine
 def create_collection():
-    p = partial(
-        c.create_collection,
+    res = yield c.create_collection(
         'foo',
     )
-    res = yield gen.Task(p)
     raise gen.Return(res)
 
 @gen.coroutine
 def index_documents(docs):
-    p = partial(
-       c.add_json_documents,
+    res = yield c.add_json_documents(
        'foo',
        docs,
        **{'commitWithin': 0}
     )
-    res = yield gen.Task(p)
     raise gen.Return(res)
 
 @gen.coroutine
@@ -13,14 +13,19 @@ long_description = f.read().strip()
 f.close()
 
 install_requires = [
-    'tornado>=3.2',
+    'tornado>=5.0',
 ]
+extras_require = {
+    'orjson':    ['orjson'],
+    'ujson':     ['ujson'],
+    'rapidjson': ['python-rapidjson'],
+}
 tests_require = [
     'nose',
     'coverage',
     'mock',
     'nosexcover',
-    'tornado>=3.2.2',
+    'tornado>=5.0',
 ]
 
 # use external unittest for 2.6
@@ -49,11 +54,8 @@ setup(
         "Operating System :: OS Independent",
         "Programming Language :: Python",
         "Programming Language :: Python :: 2",
-        "Programming Language :: Python :: 2.6",
         "Programming Language :: Python :: 2.7",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.2",
-        "Programming Language :: Python :: 3.3",
         "Programming Language :: Python :: 3.4",
         "Programming Language :: Python :: 3.5",
         "Programming Language :: Python :: Implementation :: CPython",
@@ -62,6 +64,7 @@ setup(
         "Topic :: Text Processing :: Indexing",
     ],
     install_requires=install_requires,
+    extras_require=extras_require,
 
     test_suite='tests.run_tests.run_all',
     tests_require=tests_require,
@@ -1,5 +1,12 @@
 from __future__ import absolute_import
-from .client import SolrClient
+from .client  import SolrClient
+from .bulk    import BulkIndexer
+from .cache   import DocumentCache, QueryCache
+from .lb      import LoadBalancedClient
+from .routing import CompositeIdRouter
+from .results import QueryResult
+from .retry   import CircuitBreaker, RetryPolicy
+from .template import CollectionHandle, QueryTemplate
 VERSION = (0, 9, 3)
 __version__ = VERSION
 __versionstr__ = '.'.join(map(str, VERSION))
@@ -66,8 +66,7 @@ def create_coro(args):
     if args.nshards and args.router == 'compositeId':
         collection_kwargs.update({'numShards': args.nshards})
 
-    p = partial(
-        c.create_collection,
+    s = yield c.create_collection(
         args.name,
         **{
             'replication':       args.replication,
@@ -77,7 +76,6 @@ def create_coro(args):
             'collection_kwargs': collection_kwargs,
         }
     )
-    s = yield gen.Task(p)
     print(s.body)
 
 def create_collection(args):
@@ -112,12 +110,10 @@ def add_delete_subparser(subparsers):
 def delete_coro(args):
     c = SolrClient(host=args.host)
 
-    p = partial(
-        c.delete_collection,
+    s = yield c.delete_collection(
         args.name,
         **{'shard': args.shard}
     )
-    s = yield gen.Task(p)
     print(s.body)
 
 def delete_collection(args):
@@ -47,15 +47,13 @@ def create_coro(args):
     c = SolrClient(host=args.host)
     collection_kwargs = {}
 
-    p = partial(
-        c.core_create,
+    s = yield c.core_create(
         args.name,
         **{
             'config':       args.conf_file,
             'instance_dir': args.instance_dir,
         }
     )
-    s = yield gen.Task(p)
     print(s.body)
 
 def create_core(args):
@@ -85,11 +83,9 @@ def delete_coro(args):
     c = SolrClient(host=args.host)
     collection_kwargs = {}
 
-    p = partial(
-        c.core_unload,
+    s = yield c.core_unload(
         args.name,
     )
-    s = yield gen.Task(p)
     print(s.body)
 
 def delete_core(args):
@@ -119,11 +115,9 @@ def status_coro(args):
     c = SolrClient(host=args.host)
     collection_kwargs = {}
 
-    p = partial(
-        c.core_status,
+    s = yield c.core_status(
         **{'core': args.name}
     )
-    s = yield gen.Task(p)
     print(s.body)
 
 def core_status(args):
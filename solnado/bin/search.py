@@ -3,6 +3,7 @@ from functools import partial
 from tornado import gen
 from tornado import ioloop
 from solnado.client import SolrClient
+import json
 import os
 
 def solnado_cmd(subparsers):
@@ -36,6 +37,17 @@ def solnado_cmd(subparsers):
         type    = int,
         default = None,
     )
+    query_subparser.add_argument(
+        '-c', '--cursor',
+        action  = 'store_true',
+        help    = 'page through every match with cursorMark',
+    )
+    query_subparser.add_argument(
+        '-r', '--rows',
+        type    = int,
+        default = 100,
+        help    = 'rows per page with --cursor',
+    )
 
 @gen.coroutine
 def main_coro(args):
@@ -44,11 +56,19 @@ def main_coro(args):
 
     if args.filter:
         q.update({'json.filter': args.filter})
-    if args.limit:
+    if args.limit and not args.cursor:
         q.update({'json.limit': args.limit})
 
-    p = partial(c.query, args.collection, q)
-    s = yield gen.Task(p)
+    if args.cursor:
+        cursor = c.cursor(args.collection, q, rows=args.rows, mode='post')
+        while True:
+            doc = yield cursor.next()
+            if doc is None:
+                break
+            print(json.dumps(doc.to_dict()))
+        return
+
+    s = yield c.query(args.collection, q, mode='post')
     print(s.body)
 
 def main(args):
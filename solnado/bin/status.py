@@ -22,7 +22,7 @@ def solnado_cmd(subparsers):
 @gen.coroutine
 def main_coro(args):
     c = SolrClient(host=args.host)
-    s = yield gen.Task(c.core_status)
+    s = yield c.core_status()
     print(s.body)
 
 def main(args):
@@ -0,0 +1,258 @@
+import logging
+import time
+from   tornado.concurrent import Future
+import tornado.ioloop
+
+log = logging.getLogger(__name__)
+
+
+class BulkIndexerClosedError(Exception):
+    pass
+
+
+class BatchResult(object):
+    """
+    Outcome of a single flushed batch, passed to the ``on_batch`` hook and
+    used to resolve the futures returned by :meth:`BulkIndexer.flush`.
+    """
+
+    __slots__ = ('docs', 'nbytes', 'latency', 'response', 'error')
+
+    def __init__(self, docs, nbytes, latency, response, error):
+        self.docs     = docs
+        self.nbytes   = nbytes
+        self.latency  = latency
+        self.response = response
+        self.error    = error
+
+    def __repr__(self):
+        return '<BatchResult docs=%d bytes=%d latency=%.4f error=%r>' % (
+            self.docs, self.nbytes, self.latency, self.error
+        )
+
+
+def _all_done(futures):
+    """
+    Returns a future that resolves once every future in ``futures`` is done.
+    """
+    done = Future()
+    pending = [len(futures)]
+
+    if not futures:
+        done.set_result([])
+        return done
+
+    def on_done(_):
+        pending[0] -= 1
+        if not pending[0]:
+            done.set_result([f.result() for f in futures])
+
+    for f in futures:
+        f.add_done_callback(on_done)
+
+    return done
+
+
+class BulkIndexer(object):
+    """
+    Buffers documents added one at a time and sends them to
+    :meth:`SolrClient.add_json_documents` in batches.
+
+    A batch is flushed when it holds ``batch_size`` documents, when its
+    encoded size reaches ``batch_bytes`` or when ``flush_interval`` seconds
+    have passed since the first document entered the buffer. At most
+    ``concurrency`` batches are in flight; further batches wait in a queue.
+    Documents are encoded once, when they are added, and a batch is sent as
+    the joined encodings.
+
+    :arg client:         A :class:`SolrClient`
+    :arg collection:     The name of the collection
+    :arg batch_size:     Maximum number of documents per batch
+    :arg batch_bytes:    Maximum encoded bytes per batch
+    :arg concurrency:    Maximum number of batches in flight
+    :arg flush_interval: Seconds before a partial batch is flushed
+    :arg max_pending:    Queued batches before :meth:`add` applies back-pressure
+    :arg on_batch:       Callback receiving a :class:`BatchResult` per batch,
+                         errors it raises are logged
+    :arg ioloop:         Tornado IOLoop, defaults to the current one
+    :arg update_kwargs:  Extra kwargs for :meth:`SolrClient.add_json_documents`
+    """
+
+    def __init__(self,
+            client,
+            collection,
+            batch_size     = 500,
+            batch_bytes    = 5 * 1024 * 1024,
+            concurrency    = 4,
+            flush_interval = 1.0,
+            max_pending    = 8,
+            on_batch       = None,
+            ioloop         = None,
+            update_kwargs  = None
+    ):
+        self.client         = client
+        self.collection     = collection
+        self.batch_size     = batch_size
+        self.batch_bytes    = batch_bytes
+        self.concurrency    = concurrency
+        self.flush_interval = flush_interval
+        self.max_pending    = max_pending
+        self.on_batch       = on_batch
+        self.ioloop         = ioloop or tornado.ioloop.IOLoop.current()
+        self.update_kwargs  = update_kwargs or {}
+
+        self.stats = {
+            'docs':    0,
+            'bytes':   0,
+            'batches': 0,
+            'errors':  0,
+        }
+
+        self._buf       = []
+        self._parts     = []
+        self._buf_bytes = 0
+        self._timeout   = None
+        self._queue     = []
+        self._in_flight = {}
+        self._waiters   = []
+        self._closed    = False
+
+    @property
+    def in_flight(self):
+        return len(self._in_flight)
+
+    @property
+    def pending(self):
+        return len(self._queue)
+
+    def add(self, doc):
+        """
+        Buffers a document. Returns a future that resolves immediately unless
+        more than ``max_pending`` batches are queued, in which case it resolves
+        once the queue has drained below that limit.
+
+        :arg doc: Dictionary to be uploaded
+        """
+        if self._closed:
+            raise BulkIndexerClosedError()
+
+        part   = self.client.codec.dumps(doc)
+        nbytes = len(part) + 1
+
+        if self._buf and self._buf_bytes + nbytes > self.batch_bytes:
+            self._cut_batch()
+
+        self._buf.append(doc)
+        self._parts.append(part)
+        self._buf_bytes += nbytes
+
+        if len(self._buf) >= self.batch_size or \
+                self._buf_bytes >= self.batch_bytes:
+            self._cut_batch()
+        elif self._timeout is None and self.flush_interval:
+            self._timeout = self.ioloop.add_timeout(
+                self.ioloop.time() + self.flush_interval,
+                self._on_timeout
+            )
+
+        ready = Future()
+        if len(self._queue) <= self.max_pending:
+            ready.set_result(None)
+        else:
+            self._waiters.append(ready)
+        return ready
+
+    def flush(self):
+        """
+        Sends the buffered documents. Returns a future resolving to the list of
+        :class:`BatchResult` for every batch queued or in flight at call time.
+        """
+        self._cut_batch()
+        futures = [f for _, f in self._queue]
+        futures.extend(self._in_flight.values())
+        return _all_done(futures)
+
+    def close(self):
+        """
+        Flushes the remaining documents and stops accepting new ones. Returns
+        the future from :meth:`flush`.
+        """
+        self._closed = True
+        return self.flush()
+
+    def _on_timeout(self):
+        self._timeout = None
+        self._cut_batch()
+
+    def _cut_batch(self):
+        if self._timeout is not None:
+            self.ioloop.remove_timeout(self._timeout)
+            self._timeout = None
+
+        if not self._buf:
+            return
+
+        batch = (self._buf, b'[' + b','.join(self._parts) + b']')
+        self._buf       = []
+        self._parts     = []
+        self._buf_bytes = 0
+
+        self._queue.append((batch, Future()))
+        self._dispatch()
+
+    def _dispatch(self):
+        while self._queue and len(self._in_flight) < self.concurrency:
+            batch, future = self._queue.pop(0)
+            self._send(batch, future)
+
+        while self._waiters and len(self._queue) <= self.max_pending:
+            self._waiters.pop(0).set_result(None)
+
+    def _send(self, batch, future):
+        docs, body = batch
+        nbytes = len(body)
+        start  = time.time()
+        key    = object()
+
+        def on_done(f):
+            try:
+                response = f.result()
+                error    = getattr(response, 'error', None)
+                if error is None and getattr(response, 'code', 200) >= 400:
+                    error = response.code
+            except Exception as e:
+                response = None
+                error    = e
+
+            result = BatchResult(
+                len(docs), nbytes, time.time() - start, response, error
+            )
+
+            self.stats['batches'] += 1
+            self.stats['docs']    += len(docs)
+            self.stats['bytes']   += nbytes
+            if error is not None:
+                self.stats['errors'] += 1
+
+            del self._in_flight[key]
+            try:
+                if self.on_batch:
+                    self.on_batch(result)
+            except Exception:
+                log.exception('on_batch hook failed')
+            finally:
+                future.set_result(result)
+                self._dispatch()
+
+        try:
+            sent = self.client.add_json_documents(
+                self.collection,
+                docs,
+                body = body,
+                **self.update_kwargs
+            )
+        except Exception as e:
+            sent = Future()
+            sent.set_exception(e)
+        self._in_flight[key] = future
+        sent.add_done_callback(on_done)
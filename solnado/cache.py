@@ -0,0 +1,209 @@
+import json
+import time
+from   collections import OrderedDict
+
+
+class QueryCache(object):
+    """
+    In-process LRU cache for :meth:`SolrClient.query` results.
+
+    Entries are keyed on the collection, a canonical form of the query
+    dictionary and the response format. The cache holds at most
+    ``max_entries`` results and ``max_bytes`` of response bodies, evicting
+    the least recently used first, and each entry expires ``ttl`` seconds
+    after it was stored.
+
+    The client drops a collection's entries whenever it sends an update,
+    delete or commit to that collection. Results of queries that were in
+    flight during an update are not stored.
+
+    :arg max_entries: Maximum number of cached results
+    :arg max_bytes:   Maximum total size of cached response bodies
+    :arg ttl:         Seconds an entry stays valid, None for no expiry
+    :arg clock:       Function returning the current time in seconds
+    """
+
+    def __init__(self,
+            max_entries = 1024,
+            max_bytes   = 64 * 1024 * 1024,
+            ttl         = 60.0,
+            clock       = time.time
+    ):
+        self.max_entries = max_entries
+        self.max_bytes   = max_bytes
+        self.ttl         = ttl
+        self.clock       = clock
+
+        self.stats = {
+            'hits':          0,
+            'misses':        0,
+            'evictions':     0,
+            'expired':       0,
+            'invalidations': 0,
+        }
+
+        self._entries     = OrderedDict()
+        self._collections = {}
+        self._generations = {}
+        self._epoch       = 0
+        self._bytes       = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def key(self, collection, q, *args):
+        """
+        Returns the cache key for a query. Dictionary order does not change
+        the key.
+
+        :arg collection: The name of the collection
+        :arg q:          Query dictionary
+        :arg args:       Other request options that change the response
+        """
+        canonical = json.dumps(
+            q, sort_keys=True, separators=(',', ':'), default=repr
+        )
+        return (collection, canonical) + args
+
+    def generation(self, collection):
+        """
+        Returns a token that changes whenever ``collection`` is invalidated.
+        Pass it to :meth:`put` so results fetched before an update are not
+        stored.
+        """
+        return (self._epoch, self._generations.get(collection, 0))
+
+    def get(self, key):
+        """
+        Returns the cached value for ``key``, or None.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+
+        expires, _, value = entry
+        if expires is not None and expires <= self.clock():
+            self._remove(key)
+            self.stats['expired'] += 1
+            self.stats['misses']  += 1
+            return None
+
+        del self._entries[key]
+        self._entries[key] = entry
+        self.stats['hits'] += 1
+        return value
+
+    def put(self, key, value, nbytes=0, generation=None):
+        """
+        Stores ``value`` under ``key``, evicting old entries to stay within
+        the size limits. Values larger than ``max_bytes`` are not stored.
+
+        :arg key:        Key from :meth:`key`
+        :arg value:      Value to cache
+        :arg nbytes:     Size accounted against ``max_bytes``
+        :arg generation: Result of :meth:`generation` when the request was sent
+        """
+        collection = key[0]
+        if generation is not None and generation != self.generation(collection):
+            return
+        if nbytes > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        expires = None if self.ttl is None else self.clock() + self.ttl
+        self._entries[key] = (expires, nbytes, value)
+        self._collections.setdefault(collection, set()).add(key)
+        self._bytes += nbytes
+
+        while len(self._entries) > self.max_entries or \
+                self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats['evictions'] += 1
+
+    def invalidate(self, collection=None):
+        """
+        Drops every entry for ``collection``, or the whole cache if None.
+        """
+        if collection is None:
+            collections = list(self._collections)
+            self._epoch += 1
+        else:
+            collections = [collection]
+            self._generations[collection] = \
+                self._generations.get(collection, 0) + 1
+
+        self.stats['invalidations'] += 1
+        for c in collections:
+            for key in list(self._collections.get(c, ())):
+                self._remove(key)
+
+    def _remove(self, key):
+        _, nbytes, _ = self._entries.pop(key)
+        self._bytes -= nbytes
+        keys = self._collections[key[0]]
+        keys.discard(key)
+        if not keys:
+            del self._collections[key[0]]
+
+
+class DocumentCache(QueryCache):
+    """
+    In-process LRU cache of documents by uniqueKey, for
+    :meth:`SolrClient.get_many`.
+
+    The client drops the ids it adds or deletes through
+    :meth:`SolrClient.add_json_documents` and :meth:`SolrClient.delete`, and
+    a collection's entries for other updates. Changes made by other clients
+    are only seen once entries expire.
+
+    :arg max_entries: Maximum number of cached documents
+    :arg ttl:         Seconds an entry stays valid, None for no expiry
+    :arg unique_key:  The uniqueKey field name
+    :arg clock:       Function returning the current time in seconds
+    """
+
+    def __init__(self,
+            max_entries = 10000,
+            ttl         = 60.0,
+            unique_key  = 'id',
+            clock       = time.time
+    ):
+        super(DocumentCache, self).__init__(
+            max_entries = max_entries,
+            ttl         = ttl,
+            clock       = clock,
+        )
+        self.unique_key = unique_key
+
+    def key(self, collection, id):
+        """
+        Returns the cache key for a document id.
+
+        :arg collection: The name of the collection
+        :arg id:         The document's uniqueKey value
+        """
+        return (collection, u'%s' % (id,))
+
+    def invalidate(self, collection=None, ids=None):
+        """
+        Drops the documents with ``ids`` from ``collection``, or every entry
+        for ``collection`` if ``ids`` is None, or the whole cache if both
+        are None.
+        """
+        if ids is None or collection is None:
+            return super(DocumentCache, self).invalidate(collection)
+
+        self._generations[collection] = self._generations.get(collection, 0) + 1
+        self.stats['invalidations'] += 1
+        for id in ids:
+            key = self.key(collection, id)
+            if key in self._entries:
+                self._remove(key)
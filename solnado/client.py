@@ -1,48 +1,446 @@
-import json
+import copy
+import random
+import re
 import sys
+import zlib
 from   abc import ABCMeta, abstractmethod
-from   tornado.httpclient import AsyncHTTPClient, HTTPRequest
+from   datetime import timedelta
+from   functools import partial
+from   tornado import gen
+from   tornado.concurrent import Future, chain_future
+from   tornado.httpclient import AsyncHTTPClient, HTTPError, HTTPRequest, HTTPResponse
+from   tornado.locks import Semaphore
 import tornado.ioloop
+from   .codec import JSONCodec, get_codec
+from   .cursor import Cursor
+from   .javabin import JavabinCodec, update_request
+from   .results import QueryResult
+from   .retry import SolrCircuitOpenError, is_failure
+from   .stream import DocumentStream, TupleStream
 
 PY2 = sys.version_info[0] == 2
 if PY2:
     from urllib import urlencode
+    from urlparse import urlsplit
+    string_types = basestring
 else:
-    from urllib.parse import urlencode
+    from urllib.parse import urlencode, urlsplit
+    string_types = str
 
 
 class SolrConfigurationError(Exception):
     pass
 
+_default_codec = JSONCodec()
+
+_COLLECTION_RE = re.compile(r'/solr/([^/?]+)/')
+
+_TIME_ALLOWED_RE = re.compile(r'([?&]timeAllowed=)(\d+)')
+_javabin_codec = JavabinCodec()
+
+def with_callback(future, callback, request=None):
+    """
+    Runs ``callback`` with the result of ``future`` once it resolves, so the
+    pre-Future callback API keeps working. Errors that are not HTTP responses,
+    like refused connections, are handed to the callback as a 599 response.
+
+    :arg future:   Future to watch
+    :arg callback: Callback to run on completion, may be None
+    :arg request:  The tornado HTTPRequest, used for error responses
+    """
+    if callback is None:
+        return future
+
+    def on_done(f):
+        try:
+            response = f.result()
+        except Exception as e:
+            request_ = getattr(e, 'request', None) or request
+            response = HTTPResponse(
+                request_,
+                599,
+                effective_url = getattr(request_, 'url', ''),
+                error         = e,
+            )
+        callback(response)
+
+    # tornado runs done callbacks on the next IOLoop iteration; a Future
+    # that already failed, like a request shed by the circuit breaker, runs
+    # the callback now so it has run by the time the caller resumes
+    if future.done():
+        on_done(future)
+    else:
+        future.add_done_callback(on_done)
+    return future
+
+JSON_REQUEST_KEYS = ('query', 'filter', 'limit', 'offset', 'fields', 'sort', 'facet', 'params')
+
+JSON_REQUEST_PARAMS = {
+    'q':     'query',
+    'fq':    'filter',
+    'rows':  'limit',
+    'start': 'offset',
+    'fl':    'fields',
+    'sort':  'sort',
+}
+
+# JSON Request API keys that share a name with a classic parameter only move
+# into the body when the value has the JSON type, so ``facet=true`` with
+# ``facet.field`` stays a classic facet request
+JSON_REQUEST_TYPES = {
+    'facet':  dict,
+    'filter': (string_types, list, tuple),
+    'sort':   string_types,
+}
+
+def json_request_body(q):
+    """
+    Converts a query dictionary into a
+    `JSON Request API <https://cwiki.apache.org/confluence/display/solr/JSON+Request+API>`_
+    body. ``q``, ``fq``, ``rows``, ``start``, ``fl`` and ``sort`` map to their
+    JSON names, ``json.*`` keys lose their prefix, JSON Request API keys are
+    kept and everything else goes under ``params``. ``facet``, ``filter`` and
+    ``sort`` values of another type than the JSON Request API's, like
+    ``facet='true'``, stay under ``params``. ``q`` is not modified.
+
+    :arg q: Query dictionary
+    """
+    body   = {}
+    params = {}
+
+    for k, v in q.items():
+        if k.startswith('json.'):
+            name = k[5:]
+        elif k in JSON_REQUEST_PARAMS or k in JSON_REQUEST_KEYS:
+            name  = JSON_REQUEST_PARAMS.get(k, k)
+            types = JSON_REQUEST_TYPES.get(name)
+            if types is not None and not isinstance(v, types):
+                params[k] = v
+                continue
+        else:
+            params[k] = v
+            continue
+
+        if name == 'filter' and 'filter' in body:
+            filters = body['filter']
+            # copy, the first list may be the caller's
+            filters = list(filters) if isinstance(filters, list) else [filters]
+            filters.extend(v if isinstance(v, (list, tuple)) else [v])
+            body['filter'] = filters
+        elif name == 'params':
+            params.update(v)
+        else:
+            body[name] = v
+
+    if params:
+        body['params'] = params
+
+    return body
+
+def map_future(future, func):
+    """
+    Returns a Future resolving to ``func(result)`` once ``future`` resolves,
+    passing exceptions through.
+    """
+    mapped = Future()
+
+    def on_done(f):
+        try:
+            mapped.set_result(func(f.result()))
+        except Exception as e:
+            mapped.set_exception(e)
+
+    future.add_done_callback(on_done)
+    return mapped
+
+def node_of(url):
+    """
+    Returns the ``scheme://host:port`` part of ``url``.
+    """
+    parts = urlsplit(url)
+    return '%s://%s' % (parts.scheme, parts.netloc)
+
+# zlib window bits for each Content-Encoding, 31 adds the gzip wrapper
+ENCODINGS = {'gzip': 31, 'deflate': 15}
+
+def compress_body(body, encoding='gzip', level=6):
+    """
+    Compresses a request body for ``Content-Encoding: <encoding>``. The
+    output is deterministic, gzip headers carry no timestamp.
+
+    :arg body:     Bytes to compress
+    :arg encoding: 'gzip' or 'deflate'
+    :arg level:    zlib compression level, 1 to 9
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, ENCODINGS[encoding])
+    return compressor.compress(body) + compressor.flush()
+
+def compress_chunks(chunks, encoding='gzip', level=6):
+    """
+    Compresses an iterable of byte chunks as one stream, yielding compressed
+    chunks as the compressor produces them.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, ENCODINGS[encoding])
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+def commit_within(body):
+    """
+    Returns the largest ``commitWithin`` of the commands in an update body,
+    or None.
+
+    :arg body: Update body as passed to :meth:`SolrClient.update_json`
+    """
+    if not isinstance(body, dict):
+        return None
+
+    found = [
+        cmd.get('commitWithin') for cmd in body.values()
+        if isinstance(cmd, dict) and cmd.get('commitWithin')
+    ]
+    return max(found) if found else None
+
+def make_http_client(backend=None, max_clients=10, keep_alive=True,
+        connect_timeout=None, request_timeout=None, decompress=True):
+    """
+    Creates a dedicated tornado AsyncHTTPClient.
+
+    :arg backend:         'simple', 'curl', an AsyncHTTPClient subclass or
+                          None for tornado's configured default
+    :arg max_clients:     Requests in flight before tornado queues them
+    :arg keep_alive:      Reuse connections, only the curl backend does
+    :arg connect_timeout: Default connect timeout in seconds
+    :arg request_timeout: Default request timeout in seconds
+    :arg decompress:      Send ``Accept-Encoding`` and decompress responses
+    """
+    if backend is None:
+        cls = AsyncHTTPClient
+    elif backend == 'simple':
+        from tornado.simple_httpclient import SimpleAsyncHTTPClient as cls
+    elif backend == 'curl':
+        from tornado.curl_httpclient import CurlAsyncHTTPClient as cls
+    elif isinstance(backend, type) and issubclass(backend, AsyncHTTPClient):
+        cls = backend
+    else:
+        raise SolrConfigurationError('unknown http backend %r' % (backend,))
+
+    defaults = {'decompress_response': decompress}
+    if connect_timeout is not None:
+        defaults['connect_timeout'] = connect_timeout
+    if request_timeout is not None:
+        defaults['request_timeout'] = request_timeout
+    if not keep_alive:
+        defaults['prepare_curl_callback'] = _forbid_reuse
+
+    return cls(force_instance=True, max_clients=max_clients, defaults=defaults)
+
+def _forbid_reuse(curl):
+    import pycurl
+    curl.setopt(pycurl.FORBID_REUSE, 1)
+
+def iter_json_chunks(docs, fmt='json', chunk_size=64 * 1024, codec=None):
+    """
+    Encodes an iterable of documents lazily, yielding utf8 byte chunks of
+    roughly ``chunk_size`` bytes.
+
+    :arg docs:       Iterable or generator of dictionaries
+    :arg fmt:        'json' for a JSON array or 'jsonl' for JSON lines
+    :arg chunk_size: Approximate bytes per yielded chunk
+    :arg codec:      Codec used to encode each document
+    """
+    dumps = (codec or _default_codec).dumps
+    sep   = b',' if fmt == 'json' else b'\n'
+    buf   = [b'['] if fmt == 'json' else []
+    size  = len(buf)
+    first = True
+
+    for doc in docs:
+        s = dumps(doc)
+        if not first:
+            buf.append(sep)
+            size += 1
+        first = False
+        buf.append(s)
+        size += len(s)
+        if size >= chunk_size:
+            yield b''.join(buf)
+            buf  = []
+            size = 0
+
+    if fmt == 'json':
+        buf.append(b']')
+    elif not first:
+        buf.append(b'\n')
+
+    if buf:
+        yield b''.join(buf)
+
 class SolrClient(object):
+    """
+    Every request method returns a Future resolving to the tornado
+    HTTPResponse, so it can be yielded from a coroutine, or awaited on
+    Python 3.5+::
+
+        res = yield client.query('foo', {'q': '*:*'})
+
+    Passing ``callback`` still works and runs it with the response.
+    """
 
     __metaclass__ = ABCMeta
 
     def __init__(self,
-            host         = 'localhost',
-            port         = 8983,
-            prefix       = '',
-            method       = 'http',
-            ssl          = False,
-            verify_certs = True,
-            ca_certs     = '',
-            ioloop       = None,
+            host               = 'localhost',
+            port               = 8983,
+            prefix             = '',
+            method             = 'http',
+            ssl                = False,
+            verify_certs       = True,
+            ca_certs           = '',
+            ioloop             = None,
+            codec              = None,
+            add_window         = None,
+            add_window_max     = 500,
+            query_post_url     = 2048,
+            cache              = None,
+            coalesce           = True,
+            http_backend       = None,
+            max_clients        = 10,
+            keep_alive         = True,
+            connect_timeout    = None,
+            request_timeout    = None,
+            cluster            = None,
+            retry              = None,
+            circuit_breaker    = None,
+            compress           = None,
+            compress_level     = 1,
+            compress_min_size  = 1024,
+            compress_offload   = 256 * 1024,
+            compress_responses = True,
+            hedge              = None,
+            doc_cache          = None,
             *args,
             **kwargs
     ):
-        self.base_url = "%s://%s:%s%s" % (method, host, port, prefix)
-        self.certs    = ca_certs
-        self.client   = AsyncHTTPClient(
-            ioloop or tornado.ioloop.IOLoop.current()
+        """
+        :arg codec:              JSON codec name ('orjson', 'ujson',
+                                 'rapidjson', 'json'), codec object or None to
+                                 use the fastest one installed
+        :arg add_window:         Seconds to hold :meth:`add_json_document`
+                                 calls so they are sent together as one
+                                 multi-command body
+        :arg add_window_max:     Maximum documents held per window
+        :arg query_post_url:     URL length above which :meth:`query` switches
+                                 to a JSON Request API POST in 'auto' mode
+        :arg cache:              A :class:`solnado.cache.QueryCache` for
+                                 :meth:`query` results
+        :arg coalesce:           Share one in-flight request between identical
+                                 concurrent reads
+        :arg http_backend:       'simple', 'curl' (needs pycurl), an
+                                 AsyncHTTPClient subclass or None for tornado's
+                                 configured default
+        :arg max_clients:        Requests in flight before tornado queues them
+        :arg keep_alive:         Reuse connections, only the curl backend does
+        :arg connect_timeout:    Default connect timeout in seconds
+        :arg request_timeout:    Default request timeout in seconds
+        :arg cluster:            A :class:`solnado.cluster.ClusterState` used
+                                 to resolve aliases and send requests to nodes
+                                 with active replicas
+        :arg retry:              A :class:`solnado.retry.RetryPolicy` for
+                                 idempotent requests
+        :arg circuit_breaker:    A :class:`solnado.retry.CircuitBreaker` that
+                                 fails requests to unhealthy nodes at once,
+                                 without retrying them on the same node
+        :arg compress:           'gzip' or 'deflate' to compress request bodies
+        :arg compress_level:     zlib compression level
+        :arg compress_min_size:  Bodies smaller than this are sent as they are
+        :arg compress_offload:   Bodies this large are compressed on a thread
+                                 pool instead of the IOLoop thread
+        :arg compress_responses: Ask for gzip responses with
+                                 ``Accept-Encoding``
+        :arg hedge:              A :class:`solnado.hedge.HedgePolicy` sending
+                                 slow queries to a second replica, which
+                                 needs ``cluster`` or a
+                                 :class:`solnado.lb.LoadBalancedClient`
+        :arg doc_cache:          A :class:`solnado.cache.DocumentCache` for
+                                 :meth:`get_many`
+        """
+        if compress is not None and compress not in ENCODINGS:
+            raise SolrConfigurationError('unknown encoding %r' % (compress,))
+
+        self.base_url           = "%s://%s:%s%s" % (method, host, port, prefix)
+        self.certs              = ca_certs
+        self.codec              = get_codec(codec)
+        self.ioloop             = ioloop or tornado.ioloop.IOLoop.current()
+        self.add_window         = add_window
+        self.add_window_max     = add_window_max
+        self._pending_adds      = {}
+        self.query_post_url     = query_post_url
+        self.cache              = cache
+        self.coalesce           = coalesce
+        self._in_flight         = {}
+        self.stats              = {
+            'coalesced':  0,
+            'retries':    0,
+            'shed':       0,
+            'hedges':     0,
+            'hedge_wins': 0,
+        }
+        self.connect_timeout    = connect_timeout
+        self.request_timeout    = request_timeout
+        self.cluster            = cluster
+        self.retry              = retry
+        self.breaker            = circuit_breaker
+        self.compress           = compress
+        self.compress_level     = compress_level
+        self.compress_min_size  = compress_min_size
+        self.compress_offload   = compress_offload
+        self.compress_responses = compress_responses
+        self.hedge              = hedge
+        self.doc_cache          = doc_cache
+        self.client             = make_http_client(
+            http_backend,
+            max_clients     = max_clients,
+            keep_alive      = keep_alive,
+            connect_timeout = connect_timeout,
+            request_timeout = request_timeout,
+            decompress      = compress_responses,
         )
 
-    def mk_req(self, url, **kwargs):
+    @property
+    def pool_stats(self):
+        """
+        Requests in flight (``active``) and waiting for a free slot inside
+        tornado (``queued``), with the ``max_clients`` limit. These are read
+        from tornado's private client state, so a client that does not keep
+        it reports zeros.
+        """
+        client = self.client
+        if hasattr(client, '_curls'):
+            active = len(client._curls) - len(getattr(client, '_free_list', ()))
+            queued = len(getattr(client, '_requests', ()))
+        else:
+            active = len(getattr(client, 'active', ()))
+            queued = len(getattr(client, 'queue', ()))
+        return {
+            'active':      active,
+            'queued':      queued,
+            'max_clients': getattr(client, 'max_clients', None),
+        }
+
+    def mk_req(self, url, base_url=None, deadline=None, **kwargs):
         """
         Helper function to create a tornado HTTPRequest object, kwargs get passed in to
         create the HTTPRequest object. See:
         `Request Object <http://tornado.readthedocs.org/en/latest/httpclient.html#request-objects>`_
+
+        :arg base_url: Send to this base url instead of the client's
+        :arg deadline: IOLoop time the request must finish by, see
+                       :meth:`deadline`
         """
-        req_url = self.base_url + url
+        req_url = (base_url or self.base_url) + url
         req_kwargs = kwargs
         req_kwargs['ca_certs'] = req_kwargs.get('ca_certs', self.certs)
         # have to do this because tornado's HTTP client doesn't play nice
@@ -50,7 +448,46 @@ class SolrClient(object):
             'allow_nonstandard_methods',
             True
         )
-        return HTTPRequest(req_url, **req_kwargs)
+        request = HTTPRequest(req_url, **req_kwargs)
+        if deadline is not None:
+            request.deadline = deadline
+        return request
+
+    def deadline(self, timeout=None, deadline=None):
+        """
+        Returns the IOLoop time a call must finish by: ``timeout`` seconds
+        from now or ``deadline``, whichever is sooner, or None if neither
+        is given.
+
+        :arg timeout:  Seconds from now
+        :arg deadline: IOLoop time, as returned by ``ioloop.time()``
+        """
+        if timeout is not None:
+            expires = self.ioloop.time() + timeout
+            if deadline is None or expires < deadline:
+                deadline = expires
+        return deadline
+
+    def _apply_deadline(self, request):
+        """
+        Caps a request's timeouts, and any ``timeAllowed`` in its URL, to the
+        time left before its deadline. Returns False once it has passed.
+        """
+        remaining = request.deadline - self.ioloop.time()
+        if remaining <= 0:
+            return False
+
+        defaults = getattr(self.client, 'defaults', {})
+        for name in ('connect_timeout', 'request_timeout'):
+            limit = getattr(request, name) or defaults.get(name)
+            setattr(request, name, min(limit or remaining, remaining))
+
+        if 'timeAllowed=' in request.url:
+            ms = max(1, int(remaining * 1000))
+            request.url = _TIME_ALLOWED_RE.sub(
+                lambda m: m.group(1) + str(min(int(m.group(2)), ms)), request.url
+            )
+        return True
 
     def mk_url(self, *args, **kwargs):
         """
@@ -65,42 +502,942 @@ class SolrClient(object):
             url += '?' + params
         return url
 
-    def _post_json(self, url, body, callback=None, req_kwargs={}):
-        req_kwargs.update({'headers':{'Content-Type':'application/json'}})
+    def decode(self, response):
+        """
+        Decodes a JSON response body with the client's codec.
+
+        :arg response: tornado HTTPResponse
+        """
+        return self.codec.loads(response.body)
+
+    def _fetch(self, request, callback=None, coalesce=False, idempotent=False,
+            hedge=False):
+        """
+        Fetches a request, returning a Future that resolves to the response.
+        Non-200 responses resolve normally with ``response.error`` set.
+
+        With ``coalesce``, a request identical to one already in flight
+        (method, URL, body and headers) shares its Future instead of being
+        sent again. Only use it for reads.
+
+        Reads and ``idempotent`` requests are retried by the client's
+        :class:`solnado.retry.RetryPolicy`, if it has one. With ``hedge``,
+        the client's :class:`solnado.hedge.HedgePolicy` may also send the
+        request to a second replica.
+        """
+        if not (coalesce and self.coalesce):
+            future = self._dispatch(request, coalesce or idempotent, hedge)
+            return with_callback(future, callback, request)
+
+        key = (
+            request.method,
+            request.url,
+            request.body,
+            tuple(sorted(request.headers.items())),
+        )
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.stats['coalesced'] += 1
+            return with_callback(future, callback, request)
+
+        future = self._dispatch(request, True, hedge)
+        if not future.done():
+            self._in_flight[key] = future
+            future.add_done_callback(lambda f: self._in_flight.pop(key, None))
+        return with_callback(future, callback, request)
+
+    def _dispatch(self, request, idempotent, hedge=False):
+        if hedge and self.hedge is not None:
+            return self._send_hedged(request)
+        return self._retrying_send(request, idempotent)
+
+    def _send_hedged(self, request):
+        """
+        Sends ``request`` and, if it has not answered after the hedge policy's
+        delay, a copy to another replica. Resolves with the first response
+        that is not a failure, or the last one. The slower request cannot be
+        aborted through tornado's HTTP clients, so its response is dropped.
+        """
+        policy      = self.hedge
+        done        = Future()
+        outstanding = [1]
+        timer       = [None]
+        policy.deposit()
+
+        def on_done(hedged, started, f):
+            outstanding[0] -= 1
+            try:
+                failed = is_failure(f.result(), None)
+            except Exception:
+                failed = True
+            if not failed:
+                policy.record(self.ioloop.time() - started)
+            if done.done() or failed and outstanding[0]:
+                return
+            if timer[0] is not None:
+                self.ioloop.remove_timeout(timer[0])
+                timer[0] = None
+            if hedged:
+                self.stats['hedge_wins'] += 1
+            chain_future(f, done)
+
+        def send_hedge():
+            timer[0] = None
+            if done.done():
+                return
+            hedge = self._hedge_request(request)
+            if hedge is None or not policy.allow():
+                return
+            self.stats['hedges'] += 1
+            outstanding[0] += 1
+            self._retrying_send(hedge, True).add_done_callback(
+                partial(on_done, True, self.ioloop.time())
+            )
+
+        timer[0] = self.ioloop.call_later(policy.delay(), send_hedge)
+        self._retrying_send(request, True).add_done_callback(
+            partial(on_done, False, self.ioloop.time())
+        )
+        return done
+
+    def _hedge_request(self, request):
+        """
+        Returns a copy of ``request`` for another node with a replica of its
+        collection, or None if there is none. Needs a cluster state;
+        subclasses override this to pick nodes their own way.
+        """
+        if self.cluster is None:
+            return None
+        m = _COLLECTION_RE.search(request.url)
+        if m is None:
+            return None
+
+        # picked without node_url, so hedges leave the routing rotation alone
+        node = node_of(request.url)
+        urls = set(
+            r.node_url for r in self.cluster.active_replicas(m.group(1))
+        ) - set([node])
+        if not urls:
+            return None
+        hedge = copy.copy(request)
+        hedge.url = random.choice(sorted(urls)) + request.url[len(node):]
+        return hedge
+
+    def _reroute(self, request):
+        """
+        Returns a copy of ``request`` to retry on another node after its
+        node's circuit was found open, or None if it can only go back to the
+        same node. Subclasses that pick nodes per request override this.
+        """
+        return None
+
+    def _retrying_send(self, request, idempotent):
+        if self.retry is None or not idempotent:
+            return self._send(request)
+        return self._send_with_retry(request)
+
+    @gen.coroutine
+    def _send_with_retry(self, request):
+        policy  = self.retry
+        attempt = 1
+        if policy.budget is not None:
+            policy.budget.deposit()
+
+        while True:
+            try:
+                response = yield self._send(request)
+                error    = None
+            except Exception as e:
+                response = None
+                error    = e
+            # an open circuit fails at once, a retry is only worth it elsewhere
+            if isinstance(error, SolrCircuitOpenError):
+                request = self._reroute(request)
+                if request is None:
+                    break
+            if not policy.should_retry(response, error, attempt):
+                break
+            delay    = policy.delay(attempt)
+            deadline = getattr(request, 'deadline', None)
+            if deadline is not None and self.ioloop.time() + delay >= deadline:
+                break
+            self.stats['retries'] += 1
+            yield gen.sleep(delay)
+            attempt += 1
+
+        if error is not None:
+            raise error
+        raise gen.Return(response)
+
+    def _send(self, request):
+        """
+        Hands a request to the HTTP client. Subclasses override this to
+        change where requests go.
+
+        With a circuit breaker, requests to a node whose circuit is open fail
+        with :class:`solnado.retry.SolrCircuitOpenError` without being sent.
+        Requests past their deadline get a 599 response without being sent.
+        """
+        if getattr(request, 'deadline', None) is not None and \
+                not self._apply_deadline(request):
+            done = Future()
+            done.set_result(HTTPResponse(
+                request, 599, error=HTTPError(599, 'Deadline exceeded')
+            ))
+            return done
+
+        if self.breaker is None:
+            return self.client.fetch(request, raise_error=False)
+
+        node = node_of(request.url)
+        done = Future()
+        if not self.breaker.allow(node):
+            self.stats['shed'] += 1
+            done.set_exception(SolrCircuitOpenError(node))
+            return done
+
+        def on_done(f):
+            try:
+                self.breaker.record(node, f.result(), None)
+            except Exception as e:
+                self.breaker.record(node, None, e)
+            chain_future(f, done)
+
+        self.client.fetch(request, raise_error=False).add_done_callback(on_done)
+        return done
+
+    def _stream_headers(self, headers=None):
+        headers = dict(headers or {})
+        if self.compress_responses:
+            headers['Accept-Encoding'] = 'gzip'
+        return headers
+
+    def _start_stream(self, stream, url, **kwargs):
+        """
+        Starts a :class:`solnado.stream.DocumentStream` reading ``url``,
+        relative to the client's base url.
+        """
+        return stream.start(self.base_url + url, ca_certs=self.certs, **kwargs)
+
+    def _post_json(self, url, body, callback=None, req_kwargs={}, base_url=None,
+            coalesce=False, idempotent=False, hedge=False, deadline=None):
+        return self._post_body(
+            url,
+            self.codec.dumps(body),
+            base_url   = base_url,
+            callback   = callback,
+            deadline   = deadline,
+            coalesce   = coalesce,
+            idempotent = idempotent,
+            hedge      = hedge,
+            req_kwargs = req_kwargs,
+        )
+
+    def _post_body(self, url, body, callback=None, req_kwargs={}, base_url=None,
+            coalesce=False, idempotent=False, hedge=False,
+            content_type='application/json', deadline=None):
+        """
+        Posts a JSON, or ``content_type``, body. With ``compress`` set, bodies
+        of at least ``compress_min_size`` bytes are compressed, on the
+        IOLoop's executor once they reach ``compress_offload`` bytes.
+        """
+        fetch_kwargs = {
+            'coalesce':   coalesce,
+            'idempotent': idempotent,
+            'hedge':      hedge,
+        }
+        req_kwargs = dict(req_kwargs)
+        headers    = {'Content-Type':content_type}
+
+        if self.compress and len(body) >= self.compress_min_size:
+            headers['Content-Encoding'] = self.compress
+            if len(body) >= self.compress_offload:
+                future = self._post_offloaded(
+                    url, body, headers, req_kwargs, base_url, deadline,
+                    fetch_kwargs
+                )
+                return with_callback(future, callback)
+            body = compress_body(body, self.compress, self.compress_level)
+
+        req_kwargs['headers'] = headers
+        request = self.mk_req(
+            url,
+            base_url = base_url,
+            deadline = deadline,
+            method   = 'POST',
+            body     = body,
+            **req_kwargs
+        )
+
+        return self._fetch(request, callback=callback, **fetch_kwargs)
+
+    @gen.coroutine
+    def _post_offloaded(self, url, body, headers, req_kwargs, base_url, deadline,
+            fetch_kwargs):
+        body = yield self.ioloop.run_in_executor(
+            None, compress_body, body, self.compress, self.compress_level
+        )
+        req_kwargs['headers'] = headers
+        request = self.mk_req(
+            url,
+            base_url = base_url,
+            deadline = deadline,
+            method   = 'POST',
+            body     = body,
+            **req_kwargs
+        )
+        response = yield self._fetch(request, **fetch_kwargs)
+        raise gen.Return(response)
+
+    def stream_update(self,
+        collection,
+        docs,
+        callback     = None,
+        chunk_size   = 64 * 1024,
+        commitWithin = 1000,
+        fmt          = 'json',
+        indent       = 'off',
+        req_kwargs   = {},
+        wt           = 'json'
+    ):
+        """
+        Streams documents from an iterable to Solr using a chunked request body,
+        so only ``chunk_size`` bytes of encoded documents are held at a time.
+        `json api <https://cwiki.apache.org/confluence/display/solr/Uploading+Data+with+Index+Handlers#UploadingDatawithIndexHandlers-JSONFormattedIndexUpdates>`_
+
+        :arg collection:   The name of the collection
+        :arg docs:         Iterable or generator of dictionaries
+        :arg callback:     Callback to run on completion
+        :arg chunk_size:   Approximate bytes written per chunk
+        :arg CommitWithin: Commit within time (ms)
+        :arg fmt:          'json' for a JSON array or 'jsonl' for JSON lines
+        :arg indent:       Indent the response body
+        :arg req_kwargs:   Optional tornado HTTPRequest kwargs
+        :arg wt:           Response format: 'json' or 'xml'
+
+        Uploads can take much longer than tornado's 20 second default, so the
+        request has no timeout unless ``req_kwargs`` or the client's
+        ``request_timeout`` sets one.
+
+        tornado's curl client ignores ``body_producer`` and would send an
+        empty body, so this raises :class:`SolrConfigurationError` with
+        ``http_backend='curl'``.
+        """
+        if fmt not in ('json', 'jsonl'):
+            raise SolrConfigurationError()
+        if hasattr(self.client, '_curls'):
+            raise SolrConfigurationError(
+                'stream_update needs an http backend with body_producer support'
+            )
+
+        collection, base_url, _ = self._route(collection)
+        url = self.mk_url(
+            'solr', collection, 'update', None if fmt == 'json' else 'json/docs',
+            **{'commitWithin':commitWithin, 'indent':indent, 'wt':wt}
+        )
+        chunks = iter_json_chunks(
+            docs, fmt=fmt, chunk_size=chunk_size, codec=self.codec
+        )
+
+        headers = {'Content-Type':'application/json'}
+        if self.compress:
+            headers['Content-Encoding'] = self.compress
+            chunks = compress_chunks(chunks, self.compress, self.compress_level)
+
+        @gen.coroutine
+        def body_producer(write):
+            for chunk in chunks:
+                yield write(chunk)
+
+        req_kwargs = dict(req_kwargs)
+        req_kwargs.update({'headers':headers})
+        # 0 turns tornado's request timeout off
+        req_kwargs.setdefault('request_timeout', self.request_timeout or 0)
 
         request = self.mk_req(
             url,
-            method = 'POST',
-            body   = json.dumps(body),
+            base_url      = base_url,
+            method        = 'POST',
+            body_producer = body_producer,
             **req_kwargs
         )
 
-        self.client.fetch(request, callback=callback)
+        future = self._invalidate(collection, self._fetch(request), commitWithin)
+        return with_callback(future, callback)
 
     def query(self,
             collection,
             q,
             callback   = None,
             indent     = 'off',
+            mode       = 'auto',
             req_kwargs = {},
-            wt         = 'json'
+            wt         = 'json',
+            timeout    = None,
+            deadline   = None,
+            hydrate    = False
         ):
 
         """
         `Request api <https://cwiki.apache.org/confluence/display/solr/JSON+Request+API>`_
 
+        In 'get' mode the query dictionary is urlencoded into the URL. In
+        'post' mode it is sent as a JSON Request API body, see
+        :func:`json_request_body`. 'auto' uses GET, which keeps short queries
+        cacheable, unless the URL would be longer than ``query_post_url`` or
+        the query holds list or dict values.
+
+        For ``wt='json'`` and ``wt='javabin'`` the Future resolves to a
+        :class:`solnado.results.QueryResult` wrapping the response.
+
+        With a ``timeout`` or ``deadline`` the time left is sent as Solr's
+        ``timeAllowed`` and caps tornado's connect and request timeouts, for
+        retries and hedges too. Once it has passed the response is a 599.
+        Check :attr:`solnado.results.QueryResult.partial` for results Solr
+        cut short.
+
+        With ``hydrate`` the search only asks Solr for the uniqueKey, the
+        document cache's or 'id', and ``score``. The documents are then
+        filled in from the client's :class:`solnado.cache.DocumentCache`
+        and the rest fetched in one :meth:`get_many` call. A query ``fl``
+        other than ``*`` is used for that call, bypassing the cache.
+
+        Queries to an alias over several collections are not cached.
+
         :arg collection: The name of the collection
         :arg q:          Query dictionary
         :arg callback:   Callback to run on completion
         :arg indent:     Indent the response body
+        :arg mode:       'get', 'post' or 'auto'
         :arg req_kwargs: Optional tornado HTTPRequest kwargs
-        :arg wt:         Response format: 'json' or 'xml'
+        :arg wt:         Response format: 'json', 'javabin' or 'xml'
+        :arg timeout:    Seconds the call may take
+        :arg deadline:   IOLoop time the call must finish by
+        :arg hydrate:    Search for ids only and fetch the documents by id
         """
-        q.update({'indent':indent, 'wt':wt})
-        url = self.mk_url('solr', collection, 'query', **q)
+        if mode not in ('auto', 'get', 'post'):
+            raise SolrConfigurationError()
+        if hydrate and wt not in ('json', 'javabin'):
+            raise SolrConfigurationError('hydrate needs wt json or javabin')
 
-        request = self.mk_req(url, **req_kwargs)
-        self.client.fetch(request, callback=callback)
+        name = collection
+        collection, base_url, params = self._route(collection)
+        if params:
+            q = dict(q, **params)
+        if hydrate:
+            unique_key = getattr(self.doc_cache, 'unique_key', 'id')
+            fl         = q.get('fl')
+            q          = dict(q, fl='%s,score' % unique_key)
+            if fl == '*':
+                fl = None
+
+        # results for an alias over several collections would only be
+        # dropped on writes to the first of them, so they are not cached
+        key = None
+        if self.cache is not None and not req_kwargs and not params:
+            key = self.cache.key(collection, q, indent, wt, hydrate)
+            result = self.cache.get(key)
+            if result is not None:
+                future = Future()
+                future.set_result(result)
+                return with_callback(future, callback)
+            generation = self.cache.generation(collection)
+
+        if mode == 'auto' and any(
+            isinstance(v, (list, tuple, dict)) for v in q.values()
+        ):
+            mode = 'post'
+
+        url_params = {'indent':indent, 'wt':wt}
+        deadline   = self.deadline(timeout, deadline)
+        if deadline is not None and 'timeAllowed' not in q:
+            url_params['timeAllowed'] = max(
+                1, int((deadline - self.ioloop.time()) * 1000)
+            )
+
+        if mode != 'post':
+            params = dict(q)
+            params.update(url_params)
+            url = self.mk_url('solr', collection, 'query', **params)
+
+            if mode == 'get' or len(url) <= self.query_post_url:
+                request = self.mk_req(
+                    url, base_url=base_url, deadline=deadline, **req_kwargs
+                )
+                future  = self._fetch(request, coalesce=True, hedge=True)
+                mode    = 'get'
+
+        if mode != 'get':
+            url = self.mk_url('solr', collection, 'query', **url_params)
+            future = self._post_json(
+                url,
+                json_request_body(q),
+                base_url   = base_url,
+                coalesce   = True,
+                deadline   = deadline,
+                hedge      = True,
+                req_kwargs = req_kwargs,
+            )
+
+        future = self._query_result(future, wt)
+
+        if hydrate:
+            future = self._hydrate(
+                name, future, fl, unique_key, deadline, req_kwargs
+            )
+
+        if key is not None:
+            future = map_future(
+                future, partial(self._cache_result, key, generation)
+            )
+
+        return with_callback(future, callback)
+
+    def _query_result(self, future, wt):
+        """
+        Wraps the response of a query in a :class:`solnado.results.QueryResult`
+        for the formats it reads.
+        """
+        if wt == 'json':
+            return map_future(future, partial(QueryResult, codec=self.codec))
+        if wt == 'javabin':
+            return map_future(future, partial(QueryResult, codec=_javabin_codec))
+        return future
+
+    @gen.coroutine
+    def _hydrate(self, collection, future, fl, unique_key, deadline,
+            req_kwargs):
+        """
+        Fills in the documents of an ids-only query result with
+        :meth:`get_many`.
+        """
+        result = yield future
+        if result.code != 200 or result.error is not None:
+            raise gen.Return(result)
+
+        docs = yield self.get_many(
+            collection,
+            [doc[unique_key] for doc in result],
+            fl         = fl,
+            unique_key = unique_key,
+            deadline   = deadline,
+            req_kwargs = req_kwargs,
+        )
+        result.hydrate(docs)
+        raise gen.Return(result)
+
+    def _route(self, collection):
+        """
+        Resolves ``collection`` through the cluster state. Returns the
+        collection to use in the path, the base url of a node with an
+        active replica or None, and extra query params for aliases over
+        several collections.
+        """
+        if self.cluster is None:
+            return collection, None, None
+
+        targets = self.cluster.resolve(collection)
+        params  = None
+        if len(targets) > 1:
+            params = {'collection': ','.join(targets)}
+        return targets[0], self.cluster.node_url(targets[0]), params
+
+    def _cluster_changed(self, future, method, *args):
+        """
+        Calls ``method`` of the cluster state with ``args`` once a
+        Collections API request succeeds. Returns a Future resolving after
+        it.
+        """
+        if self.cluster is None:
+            return future
+
+        done = Future()
+
+        def on_done(f):
+            try:
+                ok = f.result().code == 200
+            except Exception:
+                ok = False
+            if ok:
+                getattr(self.cluster, method)(*args)
+            chain_future(f, done)
+
+        future.add_done_callback(on_done)
+        return done
+
+    def _keyed(self, docs):
+        """
+        Returns True if adding ``docs`` is idempotent, because every document
+        carries the retry policy's uniqueKey.
+        """
+        if self.retry is None:
+            return False
+        if not isinstance(docs, (list, tuple)):
+            docs = [docs]
+        return self.retry.keyed(docs)
+
+    def _cache_result(self, key, generation, result):
+        if result.code == 200 and result.error is None and \
+                not getattr(result, 'partial', False):
+            self.cache.put(
+                key, result, nbytes=len(result.body or b''), generation=generation
+            )
+        return result
+
+    def _invalidate(self, collection, future, commitWithin=None, ids=None):
+        """
+        Drops cached results for ``collection`` now, once ``future`` resolves
+        and again after ``commitWithin`` ms, when the update becomes visible.
+        Cached documents are dropped now and once ``future`` resolves, only
+        those with ``ids`` if given. Returns a Future that resolves after the
+        second invalidation.
+        """
+        if self.cache is None and self.doc_cache is None:
+            return future
+
+        self._drop_cached(collection, ids)
+        done = Future()
+
+        def on_done(f):
+            self._drop_cached(collection, ids)
+            if commitWithin and self.cache is not None:
+                self.ioloop.add_timeout(
+                    self.ioloop.time() + commitWithin / 1000.0,
+                    partial(self.cache.invalidate, collection)
+                )
+            chain_future(f, done)
+
+        future.add_done_callback(on_done)
+        return done
+
+    def _drop_cached(self, collection, ids=None):
+        if self.cache is not None:
+            self.cache.invalidate(collection)
+        if self.doc_cache is not None:
+            self.doc_cache.invalidate(collection, ids)
+
+    def _cached_ids(self, docs, field):
+        """
+        Returns the ids of ``docs``, documents or ids, or None if one has no
+        ``field`` so the whole collection has to be dropped.
+        """
+        if self.doc_cache is None:
+            return None
+        if not isinstance(docs, (list, tuple)):
+            docs = [docs]
+
+        ids = []
+        for doc in docs:
+            if isinstance(doc, dict):
+                if field not in doc:
+                    return None
+                doc = doc[field]
+            ids.append(doc)
+        return ids
+
+    def query_many(self,
+            requests,
+            concurrency  = 10,
+            timeout      = None,
+            as_completed = False
+        ):
+        """
+        Runs many queries in parallel with at most ``concurrency`` in flight.
+
+        Each request is a ``(collection, q)`` pair, or ``(collection, q,
+        kwargs)`` with extra kwargs for :meth:`query`. A request that fails
+        or takes longer than ``timeout`` seconds yields its exception, like
+        ``tornado.gen.TimeoutError``, in place of a result, so one slow query
+        does not lose the others. A ``timeout`` in a request's kwargs
+        overrides the one given here.
+
+        Returns a Future resolving to the results in request order, or with
+        ``as_completed`` a ``tornado.gen.WaitIterator`` yielding results as
+        they finish, with ``current_index`` giving the request position::
+
+            it = client.query_many(reqs, as_completed=True)
+            while not it.done():
+                res = yield it.next()
+                render(it.current_index, res)
+
+        :arg requests:     List of ``(collection, q[, kwargs])`` tuples
+        :arg concurrency:  Maximum queries in flight
+        :arg timeout:      Seconds before a query is given up on, also sent
+                           to Solr as ``timeAllowed``
+        :arg as_completed: Return a WaitIterator instead of a list
+        """
+        semaphore = Semaphore(concurrency)
+
+        @gen.coroutine
+        def run(request):
+            collection, q = request[:2]
+            kwargs = dict(request[2]) if len(request) > 2 else {}
+            if timeout is not None:
+                kwargs.setdefault('timeout', timeout)
+            seconds = kwargs.get('timeout')
+
+            yield semaphore.acquire()
+            try:
+                future = self.query(collection, q, **kwargs)
+            except Exception as e:
+                semaphore.release()
+                raise gen.Return(e)
+            # the slot is held until the request ends, even after a timeout,
+            # so at most concurrency requests reach Solr
+            future.add_done_callback(lambda f: semaphore.release())
+
+            if seconds is not None:
+                future = gen.with_timeout(
+                    timedelta(seconds=seconds),
+                    future,
+                    quiet_exceptions = (Exception,),
+                )
+            try:
+                result = yield future
+            except Exception as e:
+                result = e
+            raise gen.Return(result)
+
+        futures = [run(request) for request in requests]
+        if as_completed:
+            return gen.WaitIterator(*futures)
+        return gen.multi(futures)
+
+    def get_many(self,
+            collection,
+            ids,
+            callback   = None,
+            fl         = None,
+            unique_key = None,
+            max_url    = None,
+            req_kwargs = {},
+            timeout    = None,
+            deadline   = None
+        ):
+        """
+        Fetches documents by id with the `real-time get
+        <https://solr.apache.org/guide/solr/latest/configuration-guide/realtime-get.html>`_
+        handler, which sees updates before they are committed.
+
+        Ids are split into chunks whose URLs stay under ``max_url`` and the
+        chunks are fetched concurrently. Resolves to a list with the document
+        for each id, in the order of ``ids``, or None for ids that were not
+        found. A failed chunk raises its HTTP error.
+
+        Without ``fl``, documents are looked up in and added to the client's
+        :class:`solnado.cache.DocumentCache`, if it has one.
+
+        :arg collection: The name of the collection
+        :arg ids:        List of uniqueKey values
+        :arg callback:   Callback to run on completion
+        :arg fl:         Comma separated fields to return, the uniqueKey
+                         is always added
+        :arg unique_key: The uniqueKey field name, by default the document
+                         cache's or 'id'
+        :arg max_url:    Maximum URL length, by default ``query_post_url``
+        :arg req_kwargs: Optional tornado HTTPRequest kwargs
+        :arg timeout:    Seconds the call may take
+        :arg deadline:   IOLoop time the call must finish by
+        """
+        if unique_key is None:
+            unique_key = getattr(self.doc_cache, 'unique_key', 'id')
+        cache = self.doc_cache if fl is None and not req_kwargs else None
+
+        collection, base_url, params = self._route(collection)
+        found   = {}
+        missing = []
+        for id in ids:
+            key = u'%s' % (id,)
+            if key in found:
+                continue
+            doc = None if cache is None else cache.get(cache.key(collection, id))
+            found[key] = doc
+            if doc is None:
+                missing.append(id)
+
+        # documents fetched while this client updates the collection are
+        # not cached
+        generation = None if cache is None else cache.generation(collection)
+        future     = self._get_chunks(
+            collection,
+            missing,
+            unique_key,
+            fl,
+            params,
+            base_url,
+            max_url or self.query_post_url,
+            self.deadline(timeout, deadline),
+            req_kwargs,
+        )
+
+        def merge(docs):
+            for doc in docs:
+                key = u'%s' % (doc[unique_key],)
+                found[key] = doc
+                if cache is not None:
+                    cache.put(cache.key(collection, key), doc, generation=generation)
+            return [found[u'%s' % (id,)] for id in ids]
+
+        return with_callback(map_future(future, merge), callback)
+
+    @gen.coroutine
+    def _get_chunks(self, collection, ids, unique_key, fl, params, base_url,
+            max_url, deadline, req_kwargs):
+        """
+        Fetches ``ids`` from the real-time get handler in chunks of at most
+        ``max_url`` characters and resolves to the documents found.
+        """
+        if not ids:
+            raise gen.Return([])
+
+        fixed = {'wt': 'json'}
+        if fl is not None:
+            fields = fl.split(',')
+            if unique_key not in fields:
+                fields.append(unique_key)
+            fixed['fl'] = ','.join(fields)
+        if params:
+            fixed.update(params)
+        prefix = self.mk_url('solr', collection, 'get', **fixed)
+        budget = max_url - len(base_url or self.base_url) - len(prefix)
+
+        chunks = [[]]
+        size   = 0
+        for id in ids:
+            part = urlencode({'id': id})
+            if chunks[-1] and size + len(part) + 1 > budget:
+                chunks.append([])
+                size = 0
+            chunks[-1].append(part)
+            size += len(part) + 1
+
+        futures = [
+            self._fetch(
+                self.mk_req(
+                    prefix + '&' + '&'.join(chunk),
+                    base_url = base_url,
+                    deadline = deadline,
+                    **req_kwargs
+                ),
+                coalesce = True,
+                hedge    = True,
+            )
+            for chunk in chunks
+        ]
+        responses = yield gen.multi(futures)
+
+        docs = []
+        for response in responses:
+            if response.error:
+                raise response.error
+            data = self.decode(response)
+            if 'doc' in data:
+                if data['doc'] is not None:
+                    docs.append(data['doc'])
+            else:
+                docs.extend(data['response']['docs'])
+        raise gen.Return(docs)
+
+    def cursor(self,
+            collection,
+            q,
+            rows       = 100,
+            unique_key = 'id',
+            prefetch   = True,
+            **kwargs
+        ):
+        """
+        Returns a :class:`solnado.cursor.Cursor` paging through every match
+        of ``q`` with cursorMark. A sort on ``unique_key`` is added if missing.
+
+        :arg collection: The name of the collection
+        :arg q:          Query dictionary
+        :arg rows:       Documents per page
+        :arg unique_key: The uniqueKey field name
+        :arg prefetch:   Fetch the next page while the current one is consumed
+        :arg kwargs:     Extra kwargs for :meth:`query`
+        """
+        return Cursor(
+            self,
+            collection,
+            q,
+            rows         = rows,
+            unique_key   = unique_key,
+            prefetch     = prefetch,
+            query_kwargs = kwargs,
+        )
+
+    def export(self,
+            collection,
+            q,
+            fl              = None,
+            sort            = None,
+            connect_timeout = None,
+            handler         = 'export',
+            max_buffer      = 1000
+        ):
+        """
+        `Exporting result sets <https://cwiki.apache.org/confluence/display/solr/Exporting+Result+Sets>`_
+
+        Returns a :class:`solnado.stream.DocumentStream` yielding documents
+        as they are read off the socket, without holding the response body.
+        The /export handler needs ``fl`` and ``sort`` on docValues fields,
+        either as arguments or in ``q``.
+
+        :arg collection:      The name of the collection
+        :arg q:               Query dictionary
+        :arg fl:              Fields to export
+        :arg sort:            Sort clause
+        :arg connect_timeout: Seconds to wait for the connection
+        :arg handler:         Request handler path
+        :arg max_buffer:      Parsed documents held before reading pauses
+        """
+        params = dict(q)
+        if fl is not None:
+            params['fl'] = fl
+        if sort is not None:
+            params['sort'] = sort
+        params['wt'] = 'json'
+
+        stream = DocumentStream(max_buffer=max_buffer)
+        self._start_stream(
+            stream,
+            self.mk_url('solr', collection, handler, **params),
+            headers         = self._stream_headers(),
+            connect_timeout = connect_timeout or self.connect_timeout,
+        )
+        return stream
+
+    def stream(self,
+            collection,
+            expr,
+            connect_timeout = None,
+            max_buffer      = 1000
+        ):
+        """
+        `Streaming expressions <https://cwiki.apache.org/confluence/display/solr/Streaming+Expressions>`_
+
+        Posts ``expr`` to the collection's /stream handler and returns a
+        :class:`solnado.stream.TupleStream` yielding tuples as they arrive.
+        See :mod:`solnado.expressions` for a builder.
+
+        :arg collection:      The name of the collection
+        :arg expr:            Expression string or :class:`solnado.expressions.Expr`
+        :arg connect_timeout: Seconds to wait for the connection
+        :arg max_buffer:      Parsed tuples held before reading pauses
+        """
+        stream = TupleStream(max_buffer=max_buffer)
+        self._start_stream(
+            stream,
+            self.mk_url('solr', collection, 'stream'),
+            method          = 'POST',
+            body            = urlencode({'expr': str(expr)}).encode('utf8'),
+            headers         = self._stream_headers(
+                {'Content-Type': 'application/x-www-form-urlencoded'}
+            ),
+            connect_timeout = connect_timeout or self.connect_timeout,
+        )
+        return stream
 
     def add_json_document(self,
         collection,
@@ -111,11 +1448,17 @@ class SolrClient(object):
         overwrite    = True,
         commitWithin = 1000,
         req_kwargs   = {},
-        wt           = 'json'
+        wt           = 'json',
+        timeout      = None,
+        deadline     = None
     ):
         """
         `json api <https://cwiki.apache.org/confluence/display/solr/Uploading+Data+with+Index+Handlers#UploadingDatawithIndexHandlers-JSONFormattedIndexUpdates>`_
 
+        When the client has an ``add_window`` and no ``req_kwargs`` are given,
+        documents added within the window are sent together as one
+        multi-command request and every callback gets the shared response.
+
         :arg collection:   The name of the collection
         :arg boost:        Boosted weight
         :arg CommitWithin: Commit within time (ms)
@@ -124,23 +1467,167 @@ class SolrClient(object):
         :arg indent:       Indent the response body
         :arg req_kwargs:   Optional tornado HTTPRequest kwargs
         :arg wt:           Response format: 'json' or 'xml'
+        :arg timeout:      Seconds the call may take
+        :arg deadline:     IOLoop time the call must finish by
         """
 
+        collection, base_url, _ = self._route(collection)
+
+        if self.add_window and not req_kwargs and timeout is None and \
+                deadline is None:
+            key = (collection, boost, commitWithin, indent, overwrite, wt)
+            return self._coalesce_add(key, doc, callback, base_url)
+
         url = self.mk_url(
             'solr', collection, 'update',
             **{'indent':indent, 'wt':wt}
         )
 
-        j = json.dumps({
+        body = {
             'add': {
                 'boost':        boost,
                 'commitWithin': commitWithin,
                 'doc':          doc,
                 'overwrite':    overwrite,
             }
+        }
+
+        future = self._invalidate(
+            collection,
+            self._post_json(
+                url,
+                body,
+                base_url   = base_url,
+                deadline   = self.deadline(timeout, deadline),
+                idempotent = overwrite and self._keyed(doc),
+                req_kwargs = req_kwargs,
+            ),
+            commitWithin
+        )
+        return with_callback(future, callback)
+
+    def add_json_commands(self,
+        collection,
+        docs,
+        boost        = 1,
+        callback     = None,
+        commitWithin = 1000,
+        indent       = 'off',
+        overwrite    = True,
+        req_kwargs   = {},
+        wt           = 'json',
+        timeout      = None,
+        deadline     = None
+    ):
+        """
+        Sends one ``add`` command per document in a single multi-command body,
+        ie: ``{"add": {...}, "add": {...}}``.
+        `json api <https://cwiki.apache.org/confluence/display/solr/Uploading+Data+with+Index+Handlers#UploadingDatawithIndexHandlers-JSONFormattedIndexUpdates>`_
+
+        :arg collection:   The name of the collection
+        :arg docs:         List of dictionaries to be uploaded
+        :arg boost:        Boosted weight
+        :arg callback:     Callback to run on completion
+        :arg CommitWithin: Commit within time (ms)
+        :arg indent:       Indent the response body
+        :arg overwrite:    Overwrite documents with the same uniqueKey
+        :arg req_kwargs:   Optional tornado HTTPRequest kwargs
+        :arg wt:           Response format: 'json' or 'xml'
+        :arg timeout:      Seconds the call may take
+        :arg deadline:     IOLoop time the call must finish by
+        """
+        collection, base_url, _ = self._route(collection)
+
+        url = self.mk_url(
+            'solr', collection, 'update',
+            **{'indent':indent, 'wt':wt}
+        )
+
+        body = self._encode_add_commands([
+            self._encode_add(doc, boost, commitWithin, overwrite)
+            for doc in docs
+        ])
+
+        future = self._invalidate(
+            collection,
+            self._post_body(
+                url,
+                body,
+                base_url   = base_url,
+                deadline   = self.deadline(timeout, deadline),
+                idempotent = overwrite and self._keyed(docs),
+                req_kwargs = req_kwargs,
+            ),
+            commitWithin
+        )
+        return with_callback(future, callback)
+
+    def _encode_add(self, doc, boost, commitWithin, overwrite):
+        return b'"add":' + self.codec.dumps({
+            'boost':        boost,
+            'commitWithin': commitWithin,
+            'doc':          doc,
+            'overwrite':    overwrite,
         })
 
-        self._post_json(url, j, req_kwargs=req_kwargs, callback=callback)
+    def _encode_add_commands(self, commands):
+        return b'{' + b','.join(commands) + b'}'
+
+    def _coalesce_add(self, key, doc, callback, base_url=None):
+        """
+        Queues ``doc`` for the next windowed request for ``key``. The window
+        is sent to the ``base_url`` of its first document, and retried only
+        if every document in it is keyed.
+        """
+        pending = self._pending_adds.get(key)
+        if pending is None:
+            timeout = self.ioloop.add_timeout(
+                self.ioloop.time() + self.add_window,
+                partial(self._flush_adds, key)
+            )
+            request = self.mk_req(self._update_url(key), base_url=base_url)
+            pending = self._pending_adds[key] = [
+                [], [], timeout, request, base_url, bool(key[4])
+            ]
+
+        commands, futures, _, request, _, _ = pending
+        commands.append(self._encode_add(doc, key[1], key[2], key[4]))
+        pending[5] = pending[5] and self._keyed(doc)
+        future = Future()
+        futures.append(future)
+
+        if len(commands) >= self.add_window_max:
+            self._flush_adds(key)
+
+        return with_callback(future, callback, request)
+
+    def _update_url(self, key):
+        collection, _, _, indent, _, wt = key
+        return self.mk_url(
+            'solr', collection, 'update',
+            **{'indent':indent, 'wt':wt}
+        )
+
+    def _flush_adds(self, key):
+        pending = self._pending_adds.pop(key, None)
+        if pending is None:
+            return
+
+        commands, futures, timeout, _, base_url, idempotent = pending
+        self.ioloop.remove_timeout(timeout)
+
+        sent = self._invalidate(
+            key[0],
+            self._post_body(
+                self._update_url(key),
+                self._encode_add_commands(commands),
+                base_url   = base_url,
+                idempotent = idempotent,
+            ),
+            key[2]
+        )
+        for future in futures:
+            chain_future(sent, future)
 
     def add_json_documents(self,
         collection,
@@ -150,7 +1637,10 @@ class SolrClient(object):
         commitWithin = 1000,
         indent       = 'off',
         req_kwargs   = {},
-        wt           = 'json'
+        wt           = 'json',
+        timeout      = None,
+        deadline     = None,
+        body         = None
     ):
         """
         `json api <https://cwiki.apache.org/confluence/display/solr/Uploading+Data+with+Index+Handlers#UploadingDatawithIndexHandlers-JSONFormattedIndexUpdates>`_
@@ -163,13 +1653,129 @@ class SolrClient(object):
         :arg indent:       Indent the response body
         :arg req_kwargs:   Optional tornado HTTPRequest kwargs
         :arg wt:           Response format: 'json' or 'xml'
-        """
-        url = self.mk_url('solr', collection, 'update',
-            **{'indent':indent, 'wt':wt}
+        :arg timeout:      Seconds the call may take
+        :arg deadline:     IOLoop time the call must finish by
+        :arg body:         ``docs`` already encoded as JSON, sent as it is
+        """
+        collection, base_url, _ = self._route(collection)
+
+        url_params = {'indent':indent, 'wt':wt}
+        if commitWithin:
+            url_params['commitWithin'] = commitWithin
+        url = self.mk_url('solr', collection, 'update', **url_params)
+        if body is None:
+            body = self.codec.dumps(docs)
+        future = self._invalidate(
+            collection,
+            self._post_body(
+                url,
+                body,
+                base_url   = base_url,
+                deadline   = self.deadline(timeout, deadline),
+                idempotent = self._keyed(docs),
+                req_kwargs = req_kwargs,
+            ),
+            commitWithin,
+            self._cached_ids(docs, getattr(self.doc_cache, 'unique_key', 'id'))
         )
-        self._post_json(url, docs, req_kwargs=req_kwargs,
-            callback=callback
+        return with_callback(future, callback)
+
+    def add_javabin_documents(self,
+        collection,
+        docs,
+        callback     = None,
+        commitWithin = 1000,
+        overwrite    = True,
+        req_kwargs   = {},
+        wt           = 'json',
+        timeout      = None,
+        deadline     = None
+    ):
+        """
+        Adds documents with an ``application/javabin`` update request, which
+        is smaller than JSON and cheaper for Solr to parse. Dictionary field
+        values are sent as atomic updates and ``_childDocuments_`` as child
+        documents, as with the JSON api.
+
+        :arg collection:   The name of the collection
+        :arg docs:         List of dictionaries to be uploaded
+        :arg callback:     Callback to run on completion
+        :arg CommitWithin: Commit within time (ms)
+        :arg overwrite:    Overwrite documents with the same uniqueKey
+        :arg req_kwargs:   Optional tornado HTTPRequest kwargs
+        :arg wt:           Response format: 'json', 'javabin' or 'xml'
+        :arg timeout:      Seconds the call may take
+        :arg deadline:     IOLoop time the call must finish by
+        """
+        collection, base_url, _ = self._route(collection)
+
+        url  = self.mk_url('solr', collection, 'update', wt=wt)
+        body = update_request(docs, params={
+            'commitWithin': commitWithin,
+            'overwrite':    'true' if overwrite else 'false',
+        })
+
+        future = self._invalidate(
+            collection,
+            self._post_body(
+                url,
+                body,
+                base_url     = base_url,
+                content_type = _javabin_codec.content_type,
+                deadline     = self.deadline(timeout, deadline),
+                idempotent   = overwrite and self._keyed(docs),
+                req_kwargs   = req_kwargs,
+            ),
+            commitWithin
         )
+        return with_callback(future, callback)
+
+    def add_json_documents_routed(self,
+        collection,
+        docs,
+        router,
+        callback     = None,
+        commitWithin = 1000,
+        id_field     = 'id',
+        indent       = 'off',
+        req_kwargs   = {},
+        wt           = 'json'
+    ):
+        """
+        Groups documents by shard with a :class:`solnado.routing.CompositeIdRouter`
+        and posts each group directly to its shard leader. Resolves to a list
+        with one response per shard, in the router's shard order.
+
+        :arg collection:   The name of the collection
+        :arg docs:         List of dictionaries to be uploaded
+        :arg router:       A :class:`solnado.routing.CompositeIdRouter`
+        :arg callback:     Callback to run once every shard has responded
+        :arg CommitWithin: Commit within time (ms)
+        :arg id_field:     The uniqueKey field name
+        :arg indent:       Indent the response body
+        :arg req_kwargs:   Optional tornado HTTPRequest kwargs
+        :arg wt:           Response format: 'json' or 'xml'
+        """
+        groups  = router.group(docs, id_field=id_field)
+        futures = []
+
+        for shard, shard_docs in groups.items():
+            kw = {'commitWithin':commitWithin, 'indent':indent, 'wt':wt}
+            if shard.leader_url:
+                url = self.mk_url('update', **kw)
+            else:
+                url = self.mk_url('solr', collection, 'update', **kw)
+
+            futures.append(self._post_json(
+                url,
+                shard_docs,
+                base_url   = shard.leader_url,
+                idempotent = self._keyed(shard_docs),
+                req_kwargs = req_kwargs,
+            ))
+
+        future = self._invalidate(collection, gen.multi(futures), commitWithin)
+        return with_callback(future, callback)
 
     def update_json(self,
         collection,
@@ -177,7 +1783,9 @@ class SolrClient(object):
         callback    = None,
         indent      = 'off',
         req_kwargs  = {},
-        wt          = 'json'
+        wt          = 'json',
+        timeout     = None,
+        deadline    = None
     ):
         """
         `json api <https://cwiki.apache.org/confluence/display/solr/Uploading+Data+with+Index+Handlers#UploadingDatawithIndexHandlers-JSONFormattedIndexUpdates>`_
@@ -188,9 +1796,24 @@ class SolrClient(object):
         :arg indent:     Indent the response body
         :arg req_kwargs: Optional tornado HTTPRequest kwargs
         :arg wt:         Response format: 'json' or 'xml'
+        :arg timeout:    Seconds the call may take
+        :arg deadline:   IOLoop time the call must finish by
         """
+        collection, base_url, _ = self._route(collection)
+
         url = self.mk_url('solr', collection, 'update', **{'indent':indent, 'wt':wt})
-        self._post_json(url, upjson, req_kwargs=req_kwargs, callback=callback)
+        future = self._invalidate(
+            collection,
+            self._post_json(
+                url,
+                upjson,
+                base_url   = base_url,
+                deadline   = self.deadline(timeout, deadline),
+                req_kwargs = req_kwargs,
+            ),
+            commit_within(upjson)
+        )
+        return with_callback(future, callback)
 
     def delete(self,
         collection,
@@ -198,7 +1821,9 @@ class SolrClient(object):
         callback   = None,
         indent     = 'off',
         req_kwargs = {},
-        wt         = 'json'
+        wt         = 'json',
+        timeout    = None,
+        deadline   = None
     ):
         """
         :arg collection: The name of the collection
@@ -207,11 +1832,27 @@ class SolrClient(object):
         :arg indent:     Indent the response body
         :arg req_kwargs: Optional tornado HTTPRequest kwargs
         :arg wt:         Response format: 'json' or 'xml'
+        :arg timeout:    Seconds the call may take
+        :arg deadline:   IOLoop time the call must finish by
         """
+        collection, base_url, _ = self._route(collection)
 
         url = self.mk_url('solr', collection, 'update', **{'indent':indent, 'wt':wt})
-        j   = json.dumps({'delete': [docs]})
-        self._post_json(url, j, req_kwargs=req_kwargs, callback=callback)
+        if not isinstance(docs, (list, tuple)):
+            docs = [docs]
+        future = self._invalidate(
+            collection,
+            self._post_json(
+                url,
+                {'delete': list(docs)},
+                base_url   = base_url,
+                deadline   = self.deadline(timeout, deadline),
+                idempotent = True,
+                req_kwargs = req_kwargs,
+            ),
+            ids = self._cached_ids(docs, 'id')
+        )
+        return with_callback(future, callback)
 
     def core_status(self,
         callback   = None,
@@ -238,7 +1879,7 @@ class SolrClient(object):
         url     = self.mk_url('solr', 'admin', 'cores', **kw)
         request = self.mk_req(url, **req_kwargs)
 
-        self.client.fetch(request, callback=callback)
+        return self._fetch(request, callback=callback, coalesce=True)
 
     def core_create(self,
         name,
@@ -275,9 +1916,9 @@ class SolrClient(object):
             kw.update({'instanceDir':instance_dir})
 
         url     = self.mk_url('solr', 'admin', 'cores', **kw)
-        request = self.mk_req(url, **req_kwargs)
+        request = self.mk_req(url, method='POST', **req_kwargs)
 
-        self.client.fetch(request, method='POST', callback=callback)
+        return self._fetch(request, callback=callback)
 
     def core_reload(self,
         core,
@@ -305,9 +1946,9 @@ class SolrClient(object):
         }
 
         url     = self.mk_url('solr', 'admin', 'cores', **kw)
-        request = self.mk_req(url, **req_kwargs)
+        request = self.mk_req(url, method='POST', **req_kwargs)
 
-        self.client.fetch(request, method='POST', callback=callback)
+        return self._fetch(request, callback=callback)
 
     def core_rename(self,
         core,
@@ -337,9 +1978,9 @@ class SolrClient(object):
         }
 
         url     = self.mk_url('solr', 'admin', 'cores', **kw)
-        request = self.mk_req(url, **req_kwargs)
+        request = self.mk_req(url, method='POST', **req_kwargs)
 
-        self.client.fetch(request, method='POST', callback=callback)
+        return self._fetch(request, callback=callback)
 
     def core_swap(self,
         core,
@@ -371,7 +2012,7 @@ class SolrClient(object):
         url     = self.mk_url('solr', 'admin', 'cores', **kw)
         request = self.mk_req(url, **req_kwargs)
 
-        self.client.fetch(request, callback=callback)
+        return self._fetch(request, callback=callback)
 
     def core_unload(self,
         core,
@@ -416,7 +2057,7 @@ class SolrClient(object):
         url     = self.mk_url('solr', 'admin', 'cores', **kw)
         request = self.mk_req(url, **req_kwargs)
 
-        self.client.fetch(request, callback=callback)
+        return self._fetch(request, callback=callback)
 
     # XXX: CORE API -> MERGEINDEXES, SPLIT, REQUESTSTATUS
 
@@ -452,7 +2093,7 @@ class SolrClient(object):
         )
 
         request = self.mk_req(url, **req_kwargs)
-        self.client.fetch(request, callback=callback)
+        return self._fetch(request, callback=callback)
 
     def delete_configset(self,
         name,
@@ -481,7 +2122,7 @@ class SolrClient(object):
         )
 
         request = self.mk_req(url, **req_kwargs)
-        self.client.fetch(request, callback=callback)
+        return self._fetch(request, callback=callback)
 
     def list_configset(self,
         callback      = None,
@@ -507,7 +2148,7 @@ class SolrClient(object):
         )
 
         request = self.mk_req(url, **req_kwargs)
-        self.client.fetch(request, callback=callback)
+        return self._fetch(request, callback=callback)
 
     def schema(self,
         collection,
@@ -531,7 +2172,7 @@ class SolrClient(object):
         )
 
         request = self.mk_req(url, **req_kwargs)
-        self.client.fetch(request, callback=callback)
+        return self._fetch(request, callback=callback, coalesce=True)
 
     def schema_fields(self,
         collection,
@@ -557,7 +2198,7 @@ class SolrClient(object):
         )
 
         request = self.mk_req(url, **req_kwargs)
-        self.client.fetch(request, callback=callback)
+        return self._fetch(request, callback=callback, coalesce=True)
 
     def schema_dynamic_fields(self,
         collection,
@@ -583,7 +2224,7 @@ class SolrClient(object):
         )
 
         request = self.mk_req(url, **req_kwargs)
-        self.client.fetch(request, callback=callback)
+        return self._fetch(request, callback=callback, coalesce=True)
 
     def schema_field_types(self,
         collection,
@@ -609,7 +2250,7 @@ class SolrClient(object):
         )
 
         request = self.mk_req(url, **req_kwargs)
-        self.client.fetch(request, callback=callback)
+        return self._fetch(request, callback=callback, coalesce=True)
 
     def schema_copy_fields(self,
         collection,
@@ -633,7 +2274,7 @@ class SolrClient(object):
         )
 
         request = self.mk_req(url, **req_kwargs)
-        self.client.fetch(request, callback=callback)
+        return self._fetch(request, callback=callback, coalesce=True)
 
     def schema_name(self,
         collection,
@@ -657,7 +2298,7 @@ class SolrClient(object):
         )
 
         request = self.mk_req(url, **req_kwargs)
-        self.client.fetch(request, callback=callback)
+        return self._fetch(request, callback=callback, coalesce=True)
 
     def schema_version(self,
         collection,
@@ -681,7 +2322,7 @@ class SolrClient(object):
         )
 
         request = self.mk_req(url, **req_kwargs)
-        self.client.fetch(request, callback=callback)
+        return self._fetch(request, callback=callback, coalesce=True)
 
     def schema_unique_key(self,
         collection,
@@ -705,7 +2346,7 @@ class SolrClient(object):
         )
 
         request = self.mk_req(url, **req_kwargs)
-        self.client.fetch(request, callback=callback)
+        return self._fetch(request, callback=callback, coalesce=True)
 
     def schema_similarity(self,
         collection,
@@ -729,7 +2370,7 @@ class SolrClient(object):
         )
 
         request = self.mk_req(url, **req_kwargs)
-        self.client.fetch(request, callback=callback)
+        return self._fetch(request, callback=callback, coalesce=True)
 
     def schema_default_operator(self,
         collection,
@@ -753,7 +2394,7 @@ class SolrClient(object):
         )
 
         request = self.mk_req(url, **req_kwargs)
-        self.client.fetch(request, callback=callback)
+        return self._fetch(request, callback=callback, coalesce=True)
 
     def add_field(self,
         collection,
@@ -792,7 +2433,7 @@ class SolrClient(object):
         }
         body['add-field'].update(field_kwargs)
 
-        self._post_json(url, body, req_kwargs=req_kwargs, callback=callback)
+        return self._post_json(url, body, req_kwargs=req_kwargs, callback=callback)
 
     def delete_field(self,
         collection,
@@ -819,7 +2460,7 @@ class SolrClient(object):
         )
         body = {"delete-field": { "name": name }}
 
-        self._post_json(url, body, req_kwargs=req_kwargs, callback=callback)
+        return self._post_json(url, body, req_kwargs=req_kwargs, callback=callback)
 
     def replace_field(self,
         collection,
@@ -850,7 +2491,7 @@ class SolrClient(object):
         body = {"replace-field": {"name": name} }
         body['replace-field'].update(field_kwargs)
 
-        self._post_json(url, body, req_kwargs=req_kwargs, callback=callback)
+        return self._post_json(url, body, req_kwargs=req_kwargs, callback=callback)
 
     def add_dynamic_field(self,
         collection,
@@ -888,7 +2529,7 @@ class SolrClient(object):
         }
         body['add-dynamic-field'].update(field_kwargs)
 
-        self._post_json(url, body, req_kwargs=req_kwargs, callback=callback)
+        return self._post_json(url, body, req_kwargs=req_kwargs, callback=callback)
 
     def delete_dynamic_field(self,
         collection,
@@ -915,7 +2556,7 @@ class SolrClient(object):
         )
         body = {"delete-dynamic-field": { "name": name }}
 
-        self._post_json(url, body, req_kwargs=req_kwargs, callback=callback)
+        return self._post_json(url, body, req_kwargs=req_kwargs, callback=callback)
 
     def replace_dynamic_field(self,
         collection,
@@ -946,7 +2587,7 @@ class SolrClient(object):
         body = {"replace-dynamic-field": { "name": name} }
         body['replace-dynamic-field'].update(field_kwargs)
 
-        self._post_json(url, body, req_kwargs=req_kwargs, callback=callback)
+        return self._post_json(url, body, req_kwargs=req_kwargs, callback=callback)
 
     def add_field_type(self,
         collection,
@@ -981,7 +2622,7 @@ class SolrClient(object):
         }
         body['add-field-type'].update(field_kwargs)
 
-        self._post_json(url, body, req_kwargs=req_kwargs, callback=callback)
+        return self._post_json(url, body, req_kwargs=req_kwargs, callback=callback)
 
     def delete_field_type(self,
         collection,
@@ -1008,7 +2649,7 @@ class SolrClient(object):
         )
         body = {"delete-field-type": { "name": name }}
 
-        self._post_json(url, body, req_kwargs=req_kwargs, callback=callback)
+        return self._post_json(url, body, req_kwargs=req_kwargs, callback=callback)
 
     def replace_field_type(self,
         collection,
@@ -1039,7 +2680,7 @@ class SolrClient(object):
         body = {"replace-field-type": {"name": name} }
         body['replace-field-type'].update(field_kwargs)
 
-        self._post_json(url, body, req_kwargs=req_kwargs, callback=callback)
+        return self._post_json(url, body, req_kwargs=req_kwargs, callback=callback)
 
     def add_copy_field(self,
         collection,
@@ -1074,7 +2715,7 @@ class SolrClient(object):
             }
         }
 
-        self._post_json(url, body, req_kwargs=req_kwargs, callback=callback)
+        return self._post_json(url, body, req_kwargs=req_kwargs, callback=callback)
 
     def delete_copy_field(self,
         collection,
@@ -1109,7 +2750,7 @@ class SolrClient(object):
             }
         }
 
-        self._post_json(url, body, req_kwargs=req_kwargs, callback=callback)
+        return self._post_json(url, body, req_kwargs=req_kwargs, callback=callback)
 
     def create_collection(self,
         collection,
@@ -1158,7 +2799,11 @@ class SolrClient(object):
         )
 
         request = self.mk_req(url, method='POST', **req_kwargs)
-        self.client.fetch(request, callback=callback)
+        future = self._cluster_changed(
+            self._fetch(request),
+            'changed', collection
+        )
+        return with_callback(future, callback)
 
     def reload_collection(self,
         collection,
@@ -1189,7 +2834,11 @@ class SolrClient(object):
         )
 
         request = self.mk_req(url, method='POST', **req_kwargs)
-        self.client.fetch(request, callback=callback)
+        future = self._cluster_changed(
+            self._fetch(request),
+            'changed', collection
+        )
+        return with_callback(future, callback)
 
     def split_shard_collection(self,
         collection,
@@ -1225,7 +2874,11 @@ class SolrClient(object):
         )
 
         request = self.mk_req(url, method='POST', **req_kwargs)
-        self.client.fetch(request, callback=callback)
+        future = self._cluster_changed(
+            self._fetch(request),
+            'changed', collection
+        )
+        return with_callback(future, callback)
 
     def shard_collection(self,
         collection,
@@ -1261,7 +2914,11 @@ class SolrClient(object):
         )
 
         request = self.mk_req(url, method='POST', **req_kwargs)
-        self.client.fetch(request, callback=callback)
+        future = self._cluster_changed(
+            self._fetch(request),
+            'changed', collection
+        )
+        return with_callback(future, callback)
 
     def delete_shard_collection(self,
         collection,
@@ -1295,7 +2952,11 @@ class SolrClient(object):
         )
 
         request = self.mk_req(url, method='POST', **req_kwargs)
-        self.client.fetch(request, callback=callback)
+        future = self._cluster_changed(
+            self._fetch(request),
+            'changed', collection
+        )
+        return with_callback(future, callback)
 
     def alias_collection(self,
         collections,
@@ -1329,7 +2990,11 @@ class SolrClient(object):
         )
 
         request = self.mk_req(url, method='POST', **req_kwargs)
-        self.client.fetch(request, callback=callback)
+        future = self._cluster_changed(
+            self._fetch(request),
+            'set_alias', name, collections
+        )
+        return with_callback(future, callback)
 
     def delete_alias_collection(self,
         name,
@@ -1360,7 +3025,11 @@ class SolrClient(object):
         )
 
         request = self.mk_req(url, method='POST', **req_kwargs)
-        self.client.fetch(request, callback=callback)
+        future = self._cluster_changed(
+            self._fetch(request),
+            'delete_alias', name
+        )
+        return with_callback(future, callback)
 
     def delete_collection(self,
         name,
@@ -1393,7 +3062,49 @@ class SolrClient(object):
         )
 
         request = self.mk_req(url, method='POST', **req_kwargs)
-        self.client.fetch(request, callback=callback)
+        future = self._cluster_changed(
+            self._fetch(request),
+            'drop', name
+        )
+        return with_callback(future, callback)
+
+    def cluster_status(self,
+        callback   = None,
+        collection = None,
+        indent     = 'off',
+        req_kwargs = {},
+        shard      = None,
+        wt         = 'json'
+    ):
+        """
+        `Cluster Status <https://cwiki.apache.org/confluence/display/solr/Collections+API#CollectionsAPI-api18>`_
+
+        :arg callback:   Callback to run on completion
+        :arg collection: Limit status to a collection
+        :arg indent:     Indent the response body
+        :arg req_kwargs: Optional tornado HTTPRequest kwargs
+        :arg shard:      Limit status to shard(s) of the collection
+        :arg wt:         Response format: 'json' or 'xml'
+        """
+        collection_kwargs = {
+            'action': 'CLUSTERSTATUS',
+            'indent': indent,
+            'wt':     wt
+        }
+
+        if collection:
+            collection_kwargs.update({'collection':collection})
+
+        if shard:
+            collection_kwargs.update({'shard':shard})
+
+        url  = self.mk_url(
+            'solr', 'admin', 'collections',
+            **collection_kwargs
+        )
+
+        request = self.mk_req(url, **req_kwargs)
+        return self._fetch(request, callback=callback, coalesce=True)
 
     def delete_replica_collection(self,
         collection,
@@ -1430,4 +3141,8 @@ class SolrClient(object):
         )
 
         request = self.mk_req(url, method='POST', **req_kwargs)
-        self.client.fetch(request, callback=callback)
+        future = self._cluster_changed(
+            self._fetch(request),
+            'changed', collection
+        )
+        return with_callback(future, callback)
@@ -0,0 +1,319 @@
+from   tornado import gen
+from   tornado.ioloop import IOLoop, PeriodicCallback
+from   .routing import CompositeIdRouter, Shard, parse_range
+
+
+class SolrClusterError(Exception):
+    pass
+
+
+class Replica(object):
+
+    def __init__(self, name, core, base_url, node_name, state, leader, type_):
+        self.name      = name
+        self.core      = core
+        self.base_url  = base_url
+        self.node_name = node_name
+        self.state     = state
+        self.leader    = leader
+        self.type      = type_
+
+    def __repr__(self):
+        return '<Replica %s %s %s%s>' % (
+            self.core, self.node_name, self.state, ' leader' if self.leader else ''
+        )
+
+    @property
+    def core_url(self):
+        return '%s/%s' % (self.base_url.rstrip('/'), self.core)
+
+    @property
+    def node_url(self):
+        """
+        The node's url without the ``/solr`` context, matching
+        :attr:`SolrClient.base_url`.
+        """
+        url = self.base_url.rstrip('/')
+        if url.endswith('/solr'):
+            url = url[:-5]
+        return url
+
+
+class ShardState(object):
+
+    def __init__(self, name, range_, state, replicas):
+        self.name     = name
+        self.range    = range_
+        self.state    = state
+        self.replicas = replicas
+
+    def __repr__(self):
+        return '<ShardState %s %s %s>' % (self.name, self.range, self.state)
+
+    @property
+    def leader(self):
+        for replica in self.replicas:
+            if replica.leader:
+                return replica
+        return None
+
+
+class CollectionState(object):
+
+    def __init__(self, name, shards, router, version, config=None):
+        self.name    = name
+        self.shards  = shards
+        self.router  = router
+        self.version = version
+        self.config  = config
+
+    def __repr__(self):
+        return '<CollectionState %s shards=%d version=%s>' % (
+            self.name, len(self.shards), self.version
+        )
+
+    @classmethod
+    def from_status(cls, name, data):
+        """
+        Builds a collection from its entry in a CLUSTERSTATUS response.
+        """
+        shards = []
+        for shard_name, shard in sorted(data.get('shards', {}).items()):
+            replicas = [
+                Replica(
+                    replica_name,
+                    replica.get('core'),
+                    replica.get('base_url', ''),
+                    replica.get('node_name'),
+                    replica.get('state'),
+                    replica.get('leader') == 'true',
+                    replica.get('type', 'NRT'),
+                )
+                for replica_name, replica in sorted(shard.get('replicas', {}).items())
+            ]
+            shards.append(ShardState(
+                shard_name, shard.get('range'), shard.get('state', 'active'), replicas
+            ))
+
+        return cls(
+            name,
+            shards,
+            data.get('router', {}).get('name', 'compositeId'),
+            data.get('znodeVersion'),
+            data.get('configName'),
+        )
+
+
+class ClusterState(object):
+    """
+    Cached view of a SolrCloud cluster built from
+    `CLUSTERSTATUS <https://cwiki.apache.org/confluence/display/solr/Collections+API#CollectionsAPI-api18>`_:
+    collections, shards, replicas and their states, leaders, aliases and
+    live nodes.
+
+    Give it to :class:`SolrClient` as ``cluster`` and queries and updates go
+    to nodes holding an active replica of the collection, with aliases
+    resolved on the client. Collections API calls made through the client
+    refresh the affected collection, and aliases made with
+    :meth:`SolrClient.alias_collection` apply as soon as Solr confirms them.
+
+    :meth:`start` refreshes in the background every ``refresh_interval``
+    seconds. Collections whose ``znodeVersion`` has not changed are kept
+    as they are.
+
+    :arg client:           A :class:`SolrClient` used to fetch the status
+    :arg refresh_interval: Seconds between background refreshes
+    """
+
+    def __init__(self, client, refresh_interval=30.0):
+        self.client           = client
+        self.refresh_interval = refresh_interval
+        self.collections      = {}
+        self.aliases          = {}
+        self.live_nodes       = set()
+        self.loaded           = False
+
+        self.stats = {
+            'refreshes': 0,
+            'changed':   0,
+            'errors':    0,
+        }
+
+        self._next    = {}
+        self._refresh = None
+
+    def start(self):
+        """
+        Starts refreshing in the background and returns the first refresh.
+        """
+        if self._refresh is None:
+            self._refresh = PeriodicCallback(
+                self.refresh, self.refresh_interval * 1000
+            )
+            self._refresh.start()
+        return self.refresh()
+
+    def close(self):
+        if self._refresh is not None:
+            self._refresh.stop()
+            self._refresh = None
+
+    @gen.coroutine
+    def refresh(self, collection=None):
+        """
+        Fetches CLUSTERSTATUS for the whole cluster or one collection and
+        updates the cached state. A collection Solr no longer knows about is
+        dropped.
+
+        :arg collection: Refresh only this collection
+        """
+        kw = {'collection': collection} if collection else {}
+        response = yield self.client.cluster_status(**kw)
+        self.stats['refreshes'] += 1
+
+        if collection and response.code == 400:
+            self.drop(collection)
+            return
+        if response.error:
+            self.stats['errors'] += 1
+            raise SolrClusterError(response.error)
+
+        self.load(self.client.decode(response), partial=bool(collection))
+
+    def load(self, status, partial=False):
+        """
+        Updates the state from a decoded CLUSTERSTATUS response.
+
+        :arg status:  Decoded response
+        :arg partial: The response covers some collections only
+        """
+        cluster = status.get('cluster', {})
+
+        if 'live_nodes' in cluster:
+            self.live_nodes = set(cluster['live_nodes'])
+        if 'aliases' in cluster:
+            self.aliases = dict(
+                (name, split_collections(targets))
+                for name, targets in cluster['aliases'].items()
+            )
+
+        collections = cluster.get('collections', {})
+        if not partial:
+            for name in list(self.collections):
+                if name not in collections:
+                    self.drop(name)
+
+        for name, data in collections.items():
+            current = self.collections.get(name)
+            version = data.get('znodeVersion')
+            if current is not None and version is not None and \
+                    current.version == version:
+                continue
+            self.collections[name] = CollectionState.from_status(name, data)
+            self.stats['changed'] += 1
+
+        self.loaded = True
+
+    def changed(self, collection=None):
+        """
+        Refreshes ``collection`` in the background after it was changed
+        through the client. Errors are left to the next refresh.
+        """
+        IOLoop.current().add_future(
+            self.refresh(collection), lambda f: f.exception()
+        )
+
+    def drop(self, collection):
+        self.collections.pop(collection, None)
+        self._next.pop(collection, None)
+
+    def set_alias(self, name, collections):
+        """
+        Records an alias, as :meth:`SolrClient.alias_collection` does on
+        success.
+        """
+        self.aliases[name] = split_collections(collections)
+
+    def delete_alias(self, name):
+        self.aliases.pop(name, None)
+
+    def resolve(self, name):
+        """
+        Returns the list of collections ``name`` stands for.
+        """
+        seen = set()
+        while name in self.aliases and name not in seen:
+            seen.add(name)
+            targets = self.aliases[name]
+            if len(targets) != 1:
+                return list(targets)
+            name = targets[0]
+        return [name]
+
+    def active_replicas(self, collection, leaders_only=False):
+        """
+        Returns the replicas of ``collection`` that are active and on a live
+        node.
+
+        :arg collection:   The name of the collection
+        :arg leaders_only: Only return shard leaders
+        """
+        state = self.collections.get(collection)
+        if state is None:
+            return []
+
+        replicas = []
+        for shard in state.shards:
+            if shard.state != 'active':
+                continue
+            for replica in shard.replicas:
+                if leaders_only and not replica.leader:
+                    continue
+                if self._available(replica):
+                    replicas.append(replica)
+        return replicas
+
+    def _available(self, replica):
+        if replica.state != 'active':
+            return False
+        return not self.live_nodes or replica.node_name in self.live_nodes
+
+    def node_url(self, collection):
+        """
+        Returns the url of a live node holding an active replica of
+        ``collection``, rotating between them, or None if there is none.
+        """
+        urls = sorted(set(r.node_url for r in self.active_replicas(collection)))
+        if not urls:
+            return None
+        i = self._next.get(collection, 0)
+        self._next[collection] = i + 1
+        return urls[i % len(urls)]
+
+    def router(self, collection):
+        """
+        Returns a :class:`solnado.routing.CompositeIdRouter` whose shards
+        point at their active, live leaders.
+        """
+        state = self.collections.get(collection)
+        if state is None:
+            raise SolrClusterError('unknown collection %s' % collection)
+
+        shards = []
+        for shard in state.shards:
+            if shard.state != 'active' or not shard.range:
+                continue
+            leader = shard.leader
+            if leader is not None and not self._available(leader):
+                leader = None
+            lo, hi = parse_range(shard.range)
+            shards.append(Shard(
+                shard.name, lo, hi, leader.core_url if leader else None
+            ))
+        return CompositeIdRouter(shards)
+
+
+def split_collections(collections):
+    if isinstance(collections, (list, tuple)):
+        return list(collections)
+    return [c.strip() for c in collections.split(',') if c.strip()]
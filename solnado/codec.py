@@ -0,0 +1,109 @@
+import json
+
+
+class JSONCodec(object):
+    """
+    Standard library JSON codec. Codecs encode to utf8 bytes and decode from
+    bytes or text.
+    """
+
+    name = 'json'
+
+    def dumps(self, obj):
+        return json.dumps(obj).encode('utf8')
+
+    def loads(self, data):
+        if isinstance(data, bytes):
+            data = data.decode('utf8')
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    `orjson <https://github.com/ijl/orjson>`_ codec. Note orjson only accepts
+    string dictionary keys and 64 bit integers.
+    """
+
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self.dumps = orjson.dumps
+        self.loads = orjson.loads
+
+
+class UjsonCodec(JSONCodec):
+    """
+    `ujson <https://github.com/ultrajson/ultrajson>`_ codec.
+    """
+
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+        self._ujson = ujson
+        self.loads  = ujson.loads
+
+    def dumps(self, obj):
+        return self._ujson.dumps(obj, ensure_ascii=False).encode('utf8')
+
+
+class RapidjsonCodec(JSONCodec):
+    """
+    `python-rapidjson <https://github.com/python-rapidjson/python-rapidjson>`_
+    codec.
+    """
+
+    name = 'rapidjson'
+
+    def __init__(self):
+        import rapidjson
+        self._rapidjson = rapidjson
+        self.loads      = rapidjson.loads
+
+    def dumps(self, obj):
+        return self._rapidjson.dumps(obj, ensure_ascii=False).encode('utf8')
+
+
+CODECS = [
+    ('orjson',    OrjsonCodec),
+    ('ujson',     UjsonCodec),
+    ('rapidjson', RapidjsonCodec),
+    ('json',      JSONCodec),
+]
+
+
+def available_codecs():
+    """
+    Returns the names of the codecs that can be loaded, fastest first.
+    """
+    names = []
+    for name, cls in CODECS:
+        try:
+            cls()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def get_codec(codec=None):
+    """
+    Returns a codec instance. ``codec`` may be a codec name, an object with
+    ``dumps``/``loads`` methods or None to pick the fastest installed codec.
+
+    :arg codec: Codec name, codec object or None
+    """
+    if codec is not None and not isinstance(codec, str):
+        return codec
+
+    for name, cls in CODECS:
+        if codec is not None and name != codec:
+            continue
+        try:
+            return cls()
+        except ImportError:
+            if codec is not None:
+                raise
+
+    raise ValueError('unknown codec %r' % codec)
@@ -0,0 +1,130 @@
+from   tornado import gen
+
+try:
+    StopAsyncIteration = StopAsyncIteration
+except NameError:
+    # python < 3.5, only raised when __anext__ is called directly
+    class StopAsyncIteration(Exception):
+        pass
+
+
+class SolrCursorError(Exception):
+    pass
+
+
+def ensure_sort(sort, unique_key):
+    """
+    Returns ``sort`` with a tie break on ``unique_key`` appended, which
+    cursorMark requires.
+
+    :arg sort:       Sort clause or None
+    :arg unique_key: The uniqueKey field name
+    """
+    if not sort:
+        return '%s asc' % unique_key
+
+    for clause in sort.split(','):
+        if clause.split()[0] == unique_key:
+            return sort
+
+    return '%s,%s asc' % (sort, unique_key)
+
+
+class Cursor(object):
+    """
+    Pages through every match of a query with
+    `cursorMark <https://cwiki.apache.org/confluence/display/solr/Pagination+of+Results>`_,
+    yielding one document at a time. While a page is consumed the next one
+    is already being fetched, and at most two pages are held in memory.
+
+    Use with ``async for``, or call :meth:`next` from a coroutine until it
+    resolves to None.
+
+    :arg client:       A :class:`SolrClient`
+    :arg collection:   The name of the collection
+    :arg q:            Query dictionary, as for :meth:`SolrClient.query`
+    :arg rows:         Documents per page
+    :arg unique_key:   The uniqueKey field name
+    :arg prefetch:     Fetch the next page while the current one is consumed
+    :arg query_kwargs: Extra kwargs for :meth:`SolrClient.query`
+    """
+
+    def __init__(self,
+            client,
+            collection,
+            q,
+            rows         = 100,
+            unique_key   = 'id',
+            prefetch     = True,
+            query_kwargs = None
+    ):
+        self.client       = client
+        self.collection   = collection
+        self.prefetch     = prefetch
+        self.query_kwargs = query_kwargs or {}
+        self.num_found    = None
+        self.pages        = 0
+
+        self._q = dict(q)
+        self._q.pop('start', None)
+        self._q['rows'] = rows
+        self._q['sort'] = ensure_sort(self._q.get('sort'), unique_key)
+
+        self._mark = '*'
+        self._page = None
+        self._next = None
+        self._done = False
+
+    def __aiter__(self):
+        return self
+
+    @gen.coroutine
+    def __anext__(self):
+        doc = yield self.next()
+        if doc is None:
+            raise StopAsyncIteration()
+        raise gen.Return(doc)
+
+    def _fetch(self, mark):
+        q = dict(self._q)
+        q['cursorMark'] = mark
+        return self.client.query(self.collection, q, **self.query_kwargs)
+
+    @gen.coroutine
+    def next(self):
+        """
+        Resolves to the next document, or None once every page is read.
+        """
+        while True:
+            if self._page is not None:
+                doc = next(self._page, None)
+                if doc is not None:
+                    raise gen.Return(doc)
+                self._page = None
+
+            if self._next is None:
+                if self._done:
+                    raise gen.Return(None)
+                self._next = self._fetch(self._mark)
+
+            res = yield self._next
+            self._next = None
+
+            if res.error:
+                raise res.error
+
+            mark = res.next_cursor_mark
+            if mark is None:
+                raise SolrCursorError('response has no nextCursorMark')
+
+            self.num_found = res.num_found
+            self.pages    += 1
+
+            if mark == self._mark:
+                self._done = True
+            else:
+                self._mark = mark
+                if self.prefetch:
+                    self._next = self._fetch(mark)
+
+            self._page = iter(res)
@@ -0,0 +1,105 @@
+class Expr(object):
+    """
+    A `streaming expression <https://cwiki.apache.org/confluence/display/solr/Streaming+Expressions>`_
+    function call. Positional arguments are written as is, so collection
+    names, field names and nested expressions go there. Named parameters are
+    quoted when they are strings::
+
+        >>> str(Expr('search', 'foo', q='*:*', fl='id', sort='id asc'))
+        'search(foo,fl="id",q="*:*",sort="id asc")'
+
+    :arg name:   Function name
+    :arg args:   Positional arguments
+    :arg params: Named parameters
+    """
+
+    def __init__(self, name, *args, **params):
+        self.name   = name
+        self.args   = args
+        self.params = params
+
+    def __str__(self):
+        parts = [str(arg) for arg in self.args]
+        parts.extend(
+            '%s=%s' % (k, quote(v)) for k, v in sorted(self.params.items())
+        )
+        return '%s(%s)' % (self.name, ','.join(parts))
+
+    def __repr__(self):
+        return 'Expr(%r)' % str(self)
+
+    def __eq__(self, other):
+        return str(self) == str(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+
+def quote(value):
+    """
+    Renders a named parameter value, quoting strings and lists of strings.
+    Only double quotes are escaped, other text is written as it is.
+    """
+    if isinstance(value, Expr):
+        return str(value)
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (list, tuple)):
+        value = ','.join(str(v) for v in value)
+    if isinstance(value, (int, float)):
+        return str(value)
+    # Solr's StreamExpressionParser only unescapes \", the rest is sent as is
+    return '"%s"' % value.replace('"', '\\"')
+
+
+def search(collection, q='*:*', fl='id', sort='id asc', qt='/export', **params):
+    """
+    Streams matching documents from a collection. The default ``qt`` reads
+    the full result set through /export, which needs docValues on ``fl``
+    and ``sort`` fields.
+    """
+    return Expr('search', collection, q=q, fl=fl, sort=sort, qt=qt, **params)
+
+
+def rollup(stream, over, *metrics):
+    """
+    Groups tuples of ``stream``, sorted on ``over``, and computes
+    ``metrics`` per group.
+    """
+    return Expr('rollup', stream, *metrics, over=over)
+
+
+def top(stream, n, sort):
+    """
+    Keeps the ``n`` first tuples of ``stream`` by ``sort``.
+    """
+    return Expr('top', stream, n=n, sort=sort)
+
+
+def inner_join(left, right, on):
+    """
+    Joins two streams sorted on the ``on`` fields, ie: ``'a_s=b_s'``.
+    """
+    return Expr('innerJoin', left, right, on=on)
+
+
+def parallel(collection, stream, workers, sort, **params):
+    """
+    Runs ``stream`` on ``workers`` nodes, merging results by ``sort``. The
+    inner stream should partition its input with ``partitionKeys``.
+    """
+    return Expr('parallel', collection, stream, workers=workers, sort=sort, **params)
+
+
+def metric(name, field):
+    """
+    A rollup metric, ie: ``metric('sum', 'price_f')``.
+    """
+    return Expr(name, field)
+
+
+def count():
+    """
+    The ``count(*)`` rollup metric.
+    """
+    return Expr('count', '*')
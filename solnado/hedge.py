@@ -0,0 +1,67 @@
+from   collections import deque
+from   .retry import RetryBudget
+
+
+class HedgePolicy(object):
+    """
+    When to send a hedge: a second copy of a query to a different replica,
+    sent if the first has not answered in time. Whichever answers first is
+    used.
+
+    The delay is ``delay`` seconds if given, otherwise the ``percentile`` of
+    the last ``window`` query latencies, or ``initial_delay`` until
+    ``min_samples`` latencies are known. Hedges are capped by ``budget``, by
+    default to 5% of queries plus 5 per 10 seconds.
+
+    :arg delay:         Fixed delay in seconds, None to track latencies
+    :arg percentile:    Latency percentile used as the delay
+    :arg window:        Latencies kept
+    :arg min_samples:   Latencies needed before the percentile is used
+    :arg initial_delay: Delay until then, in seconds
+    :arg budget:        A :class:`solnado.retry.RetryBudget`, None for the
+                        default one or False for no budget
+    """
+
+    def __init__(self,
+            delay         = None,
+            percentile    = 95.0,
+            window        = 500,
+            min_samples   = 20,
+            initial_delay = 0.1,
+            budget        = None
+    ):
+        self.fixed_delay   = delay
+        self.percentile    = percentile
+        self.min_samples   = min_samples
+        self.initial_delay = initial_delay
+        self.latencies     = deque(maxlen=window)
+
+        if budget is None:
+            budget = RetryBudget(ratio=0.05, min_retries=5)
+        self.budget = budget or None
+
+    def delay(self):
+        """
+        Returns the seconds to wait for the first response before hedging.
+        """
+        if self.fixed_delay is not None:
+            return self.fixed_delay
+        if len(self.latencies) < self.min_samples:
+            return self.initial_delay
+
+        ordered = sorted(self.latencies)
+        i = int(round(self.percentile / 100.0 * (len(ordered) - 1)))
+        return ordered[i]
+
+    def record(self, latency):
+        self.latencies.append(latency)
+
+    def deposit(self):
+        if self.budget is not None:
+            self.budget.deposit()
+
+    def allow(self):
+        """
+        Returns True if the budget allows another hedge.
+        """
+        return self.budget is None or self.budget.withdraw()
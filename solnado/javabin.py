@@ -0,0 +1,504 @@
+import struct
+import sys
+from   datetime import datetime, timedelta
+
+
+PY2 = sys.version_info[0] == 2
+if PY2:
+    string_types = (str, unicode)
+    binary_types = (bytearray,)
+else:
+    string_types = (str,)
+    binary_types = (bytes, bytearray)
+
+CONTENT_TYPE = 'application/javabin'
+
+VERSION = 2
+
+# tags with the value in the following bytes
+NULL             = 0
+BOOL_TRUE        = 1
+BOOL_FALSE       = 2
+BYTE             = 3
+SHORT            = 4
+DOUBLE           = 5
+INT              = 6
+LONG             = 7
+FLOAT            = 8
+DATE             = 9
+MAP              = 10
+SOLRDOC          = 11
+SOLRDOCLST       = 12
+BYTEARR          = 13
+ITERATOR         = 14
+END              = 15
+SOLRINPUTDOC     = 16
+MAP_ENTRY_ITER   = 17
+ENUM_FIELD_VALUE = 18
+MAP_ENTRY        = 19
+
+# tags carrying a size or small value in their low 5 bits
+STR           = 1 << 5
+SINT          = 2 << 5
+SLONG         = 3 << 5
+ARR           = 4 << 5
+ORDERED_MAP   = 5 << 5
+NAMED_LST     = 6 << 5
+EXTERN_STRING = 7 << 5
+
+EPOCH = datetime(1970, 1, 1)
+
+_float  = struct.Struct('>f')
+_double = struct.Struct('>d')
+_short  = struct.Struct('>h')
+_int    = struct.Struct('>i')
+_long   = struct.Struct('>q')
+
+
+class JavabinError(ValueError):
+    pass
+
+
+class NamedList(object):
+    """
+    Ordered name/value pairs, written as a NamedList or, with ``ordered``, a
+    SimpleOrderedMap. Decoding gives back a flat ``[name, value, ...]`` list
+    or a dict, as Solr's JSON writer does by default.
+
+    :arg pairs:   List of ``(name, value)`` tuples
+    :arg ordered: Write a SimpleOrderedMap
+    """
+
+    def __init__(self, pairs, ordered=False):
+        self.pairs   = list(pairs)
+        self.ordered = ordered
+
+
+class DocumentList(object):
+    """
+    A page of result documents, written as a SolrDocumentList. Decodes to
+    the dict Solr's JSON writer gives for ``response``.
+    """
+
+    def __init__(self, docs, num_found=None, start=0, max_score=None):
+        self.docs      = docs
+        self.num_found = len(docs) if num_found is None else num_found
+        self.start     = start
+        self.max_score = max_score
+
+
+def format_date(ms):
+    """
+    Formats milliseconds since the epoch the way Solr's JSON writer does.
+    """
+    dt = EPOCH + timedelta(milliseconds=ms)
+    text = dt.strftime('%Y-%m-%dT%H:%M:%S')
+    if dt.microsecond:
+        text += '.%03d' % (dt.microsecond // 1000)
+    return text + 'Z'
+
+
+def _short_float(value):
+    # the shortest repr that reads back as the same 32 bit float, like Java
+    for precision in (6, 7, 8):
+        text = '%.*g' % (precision, value)
+        if _float.unpack(_float.pack(float(text)))[0] == value:
+            return float(text)
+    return value
+
+
+class JavabinDecoder(object):
+    """
+    Decodes a javabin body into the dicts, lists and scalars Solr's JSON
+    writer would give: SimpleOrderedMaps and Maps become dicts, NamedLists
+    flat lists, dates ISO 8601 strings and document lists the ``response``
+    dict with its ``docs``.
+    """
+
+    def __init__(self, data):
+        self.buf     = bytearray(data)
+        self.pos     = 0
+        self.strings = []
+
+    def decode(self):
+        if len(self.buf) < 2 or self.buf[0] != VERSION:
+            raise JavabinError('not a javabin version %d body' % VERSION)
+        self.pos = 1
+        try:
+            # the top level response is a NamedList written as an object
+            if self.buf[1] >> 5 == NAMED_LST >> 5:
+                return dict(self._pairs(self._size(self._tag())))
+            return self.read_val()
+        except (IndexError, struct.error):
+            raise JavabinError('truncated javabin body')
+
+    def _tag(self):
+        tag = self.buf[self.pos]
+        self.pos += 1
+        return tag
+
+    def _size(self, tag):
+        size = tag & 0x1f
+        if size == 0x1f:
+            size += self.read_vint()
+        return size
+
+    def read_vint(self):
+        buf = self.buf
+        b = buf[self.pos]
+        self.pos += 1
+        value = b & 0x7f
+        shift = 7
+        while b & 0x80:
+            b = buf[self.pos]
+            self.pos += 1
+            value |= (b & 0x7f) << shift
+            shift += 7
+        return value
+
+    def _unpack(self, fmt):
+        value = fmt.unpack_from(self.buf, self.pos)[0]
+        self.pos += fmt.size
+        return value
+
+    def _pairs(self, size):
+        read = self.read_val
+        return [(read(), read()) for _ in range(size)]
+
+    def read_val(self):
+        buf  = self.buf
+        tag  = buf[self.pos]
+        kind = tag >> 5
+        self.pos += 1
+
+        if kind:
+            if kind == 1:
+                size = tag & 0x1f
+                if size == 0x1f:
+                    size += self.read_vint()
+                start = self.pos
+                self.pos += size
+                return buf[start:self.pos].decode('utf8')
+            if kind == 2 or kind == 3:
+                value = tag & 0x0f
+                if tag & 0x10:
+                    value |= self.read_vint() << 4
+                return value
+            if kind == 4:
+                read = self.read_val
+                return [read() for _ in range(self._size(tag))]
+            if kind == 5:
+                return dict(self._pairs(self._size(tag)))
+            if kind == 6:
+                flat = []
+                for name, value in self._pairs(self._size(tag)):
+                    flat.append(name)
+                    flat.append(value)
+                return flat
+            i = tag & 0x1f
+            if i == 0x1f:
+                i += self.read_vint()
+            if i:
+                return self.strings[i - 1]
+            s = self.read_val()
+            self.strings.append(s)
+            return s
+
+        if tag == NULL:
+            return None
+        if tag == BOOL_TRUE:
+            return True
+        if tag == BOOL_FALSE:
+            return False
+        if tag == BYTE:
+            value = self.buf[self.pos]
+            self.pos += 1
+            return value - 256 if value > 127 else value
+        if tag == SHORT:
+            return self._unpack(_short)
+        if tag == DOUBLE:
+            return self._unpack(_double)
+        if tag == INT:
+            return self._unpack(_int)
+        if tag == LONG:
+            return self._unpack(_long)
+        if tag == FLOAT:
+            return _short_float(self._unpack(_float))
+        if tag == DATE:
+            return format_date(self._unpack(_long))
+        if tag == MAP:
+            return dict(self._pairs(self.read_vint()))
+        if tag == SOLRDOC:
+            return self._doc(self._size(self._tag()), input_doc=False)
+        if tag == SOLRDOCLST:
+            return self._doc_list()
+        if tag == BYTEARR:
+            size  = self.read_vint()
+            start = self.pos
+            self.pos += size
+            return bytes(self.buf[start:self.pos])
+        if tag == ITERATOR:
+            items = []
+            while self.buf[self.pos] != END:
+                items.append(self.read_val())
+            self.pos += 1
+            return items
+        if tag == SOLRINPUTDOC:
+            size = self.read_vint()
+            self.read_val()
+            return self._doc(size, input_doc=True)
+        if tag == MAP_ENTRY_ITER:
+            items = {}
+            while self.buf[self.pos] != END:
+                name = self.read_val()
+                items[name] = self.read_val()
+            self.pos += 1
+            return items
+        if tag == ENUM_FIELD_VALUE:
+            self.read_val()
+            return self.read_val()
+        if tag == MAP_ENTRY:
+            name = self.read_val()
+            return {name: self.read_val()}
+
+        raise JavabinError('unknown tag %d at %d' % (tag, self.pos - 1))
+
+    def _doc(self, size, input_doc):
+        doc = {}
+        for _ in range(size):
+            name = self.read_val()
+            if input_doc and isinstance(name, float):
+                name = self.read_val()
+            if isinstance(name, dict):
+                doc.setdefault('_childDocuments_', []).append(name)
+                continue
+            doc[name] = self.read_val()
+        return doc
+
+    def _doc_list(self):
+        info = self.read_val()
+        docs = self.read_val()
+        res  = {'numFound': info[0], 'start': info[1]}
+        if info[2] is not None:
+            res['maxScore'] = info[2]
+        if len(info) > 3 and info[3] is not None:
+            res['numFoundExact'] = info[3]
+        res['docs'] = docs
+        return res
+
+
+class JavabinEncoder(object):
+    """
+    Encodes Python values as javabin. Dicts are written as Maps, so dict
+    field values in input documents are atomic updates, lists and tuples
+    as arrays and datetimes, taken as UTC, as dates. Use :class:`NamedList`
+    and :class:`DocumentList` for the other Solr structures.
+    """
+
+    def __init__(self):
+        self.out     = bytearray([VERSION])
+        self.strings = {}
+
+    def encode(self, value):
+        self.write_val(value)
+        return bytes(self.out)
+
+    def write_tag(self, tag, size):
+        if tag & 0xe0:
+            if size < 0x1f:
+                self.out.append(tag | size)
+            else:
+                self.out.append(tag | 0x1f)
+                self.write_vint(size - 0x1f)
+        else:
+            self.out.append(tag)
+            self.write_vint(size)
+
+    def write_vint(self, value):
+        out = self.out
+        while value & ~0x7f:
+            out.append((value & 0x7f) | 0x80)
+            value >>= 7
+        out.append(value)
+
+    def write_str(self, s):
+        data = s.encode('utf8')
+        self.write_tag(STR, len(data))
+        self.out += data
+
+    def write_extern(self, s):
+        i = self.strings.get(s)
+        if i:
+            self.write_tag(EXTERN_STRING, i)
+            return
+        self.strings[s] = len(self.strings) + 1
+        self.write_tag(EXTERN_STRING, 0)
+        self.write_str(s)
+
+    def write_small(self, tag, value):
+        if value >= 0x0f:
+            self.out.append(tag | 0x10 | (value & 0x0f))
+            self.write_vint(value >> 4)
+        else:
+            self.out.append(tag | value)
+
+    def write_int(self, value):
+        if 0 < value < 2 ** 31:
+            self.write_small(SINT, value)
+        elif -2 ** 31 <= value < 2 ** 31:
+            self.out.append(INT)
+            self.out += _int.pack(value)
+        else:
+            self.write_long(value)
+
+    def write_long(self, value):
+        if 0 <= value < 2 ** 56:
+            self.write_small(SLONG, value)
+        else:
+            self.out.append(LONG)
+            self.out += _long.pack(value)
+
+    def write_val(self, value):
+        if value is None:
+            self.out.append(NULL)
+        elif value is True:
+            self.out.append(BOOL_TRUE)
+        elif value is False:
+            self.out.append(BOOL_FALSE)
+        elif isinstance(value, string_types):
+            self.write_str(value)
+        elif isinstance(value, int) or PY2 and isinstance(value, long):
+            self.write_int(value)
+        elif isinstance(value, float):
+            self.out.append(DOUBLE)
+            self.out += _double.pack(value)
+        elif isinstance(value, (list, tuple)):
+            self.write_tag(ARR, len(value))
+            for item in value:
+                self.write_val(item)
+        elif isinstance(value, dict):
+            self.write_tag(MAP, len(value))
+            for name, item in value.items():
+                self.write_val(name)
+                self.write_val(item)
+        elif isinstance(value, datetime):
+            if value.tzinfo is not None:
+                value = value.replace(tzinfo=None) - value.utcoffset()
+            delta = value - EPOCH
+            self.out.append(DATE)
+            self.out += _long.pack(
+                (delta.days * 86400 + delta.seconds) * 1000
+                + delta.microseconds // 1000
+            )
+        elif isinstance(value, binary_types):
+            self.out.append(BYTEARR)
+            self.write_vint(len(value))
+            self.out += value
+        elif isinstance(value, NamedList):
+            self.write_tag(
+                ORDERED_MAP if value.ordered else NAMED_LST, len(value.pairs)
+            )
+            for name, item in value.pairs:
+                self.write_extern(name)
+                self.write_val(item)
+        elif isinstance(value, DocumentList):
+            self.write_doc_list(value)
+        else:
+            raise JavabinError('cannot encode %r' % (value,))
+
+    def write_doc(self, doc):
+        self.out.append(SOLRDOC)
+        self.write_tag(ORDERED_MAP, len(doc))
+        for name, value in doc.items():
+            self.write_extern(name)
+            self.write_val(value)
+
+    def write_doc_list(self, docs):
+        self.out.append(SOLRDOCLST)
+        self.write_tag(ARR, 4)
+        self.write_long(docs.num_found)
+        self.write_long(docs.start)
+        if docs.max_score is None:
+            self.out.append(NULL)
+        else:
+            self.out.append(FLOAT)
+            self.out += _float.pack(docs.max_score)
+        self.out.append(BOOL_TRUE)
+        self.write_tag(ARR, len(docs.docs))
+        for doc in docs.docs:
+            self.write_doc(doc)
+
+    def write_input_doc(self, doc):
+        children = doc.get('_childDocuments_') or []
+        fields   = [(k, v) for k, v in doc.items() if k != '_childDocuments_']
+        self.write_tag(SOLRINPUTDOC, len(fields) + len(children))
+        # document boost, ignored by Solr 7 and later
+        self.out.append(FLOAT)
+        self.out += _float.pack(1.0)
+        for name, value in fields:
+            self.write_extern(name)
+            self.write_val(value)
+        for child in children:
+            self.write_input_doc(child)
+
+
+def loads(data):
+    """
+    Decodes a javabin body, see :class:`JavabinDecoder`.
+    """
+    return JavabinDecoder(data).decode()
+
+
+def dumps(value):
+    """
+    Encodes a value as javabin, see :class:`JavabinEncoder`.
+    """
+    return JavabinEncoder().encode(value)
+
+
+def update_request(docs=(), params=None, delete_ids=None, delete_queries=None):
+    """
+    Encodes an ``application/javabin`` update request body, as SolrJ's
+    JavaBinUpdateRequestCodec does.
+
+    :arg docs:           Iterable of document dictionaries to add
+    :arg params:         Update parameters, like ``commitWithin``
+    :arg delete_ids:     Document ids to delete
+    :arg delete_queries: Queries whose matches are deleted
+    """
+    enc = JavabinEncoder()
+    pairs = [('params', NamedList(
+        (name, [str(value)]) for name, value in sorted((params or {}).items())
+    ))]
+    if delete_ids:
+        pairs.append(('delById', list(delete_ids)))
+    pairs.append(('delByQ', list(delete_queries) if delete_queries else None))
+
+    enc.write_tag(NAMED_LST, len(pairs) + 1)
+    for name, value in pairs:
+        enc.write_extern(name)
+        enc.write_val(value)
+
+    enc.write_extern('docs')
+    enc.out.append(ITERATOR)
+    for doc in docs:
+        enc.write_input_doc(doc)
+    enc.out.append(END)
+    return bytes(enc.out)
+
+
+class JavabinCodec(object):
+    """
+    Codec for ``wt=javabin`` responses, used by :class:`solnado.results.QueryResult`
+    in place of a JSON codec.
+    """
+
+    name         = 'javabin'
+    binary       = True
+    content_type = CONTENT_TYPE
+
+    def dumps(self, obj):
+        return dumps(obj)
+
+    def loads(self, data):
+        return loads(data)
@@ -0,0 +1,244 @@
+import copy
+import random
+from   tornado import gen
+from   tornado.concurrent import Future, chain_future
+from   tornado.ioloop import PeriodicCallback
+from   .client import SolrClient, SolrConfigurationError
+
+
+STRATEGIES = ('round_robin', 'random', 'least_outstanding')
+
+# responses counted against a node, other errors come from the request
+FAILURE_CODES = frozenset([502, 503, 504, 599])
+
+
+class Node(object):
+    """
+    A Solr node and its health: requests in flight, an EWMA of response
+    latency in seconds and consecutive failures.
+    """
+
+    def __init__(self, url):
+        self.url         = url
+        self.outstanding = 0
+        self.latency     = None
+        self.failures    = 0
+        self.errors      = 0
+        self.requests    = 0
+        self.healthy     = True
+        self.down_since  = None
+
+    def __repr__(self):
+        return '<Node %s healthy=%s outstanding=%d>' % (
+            self.url, self.healthy, self.outstanding
+        )
+
+    def to_dict(self):
+        return {
+            'url':         self.url,
+            'healthy':     self.healthy,
+            'outstanding': self.outstanding,
+            'latency':     self.latency,
+            'errors':      self.errors,
+            'requests':    self.requests,
+        }
+
+
+class LoadBalancedClient(SolrClient):
+    """
+    A :class:`SolrClient` spreading requests over several nodes.
+
+    Requests built against the client's own base url go to a node picked
+    by ``strategy``: 'round_robin', 'random' or 'least_outstanding', which
+    prefers the node with the fewest requests in flight, then the lowest
+    latency. Requests sent to an explicit ``base_url``, like routed updates,
+    are left alone.
+
+    A node is taken out of rotation after ``fail_threshold`` consecutive
+    failures, which are connection errors and 502, 503 or 504 responses. It
+    comes back when a ping succeeds, or after ``retry_after`` seconds when it
+    gets a trial request. If every node is down, all of them are used.
+
+    :arg nodes:          List of base urls, ``host:port`` strings or
+                         ``(host, port)`` tuples
+    :arg strategy:       'round_robin', 'random' or 'least_outstanding'
+    :arg ping_interval:  Seconds between pings of every node, None to disable
+    :arg ping_path:      Path requested by pings
+    :arg fail_threshold: Consecutive failures before a node is taken out
+    :arg retry_after:    Seconds before a failed node gets a trial request
+    :arg ewma_alpha:     Weight of the newest sample in the latency average
+    :arg kwargs:         :class:`SolrClient` arguments
+    """
+
+    def __init__(self,
+            nodes,
+            strategy       = 'round_robin',
+            ping_interval  = 10.0,
+            ping_path      = '/solr/admin/info/system?wt=json',
+            fail_threshold = 3,
+            retry_after    = 30.0,
+            ewma_alpha     = 0.3,
+            **kwargs
+    ):
+        if strategy not in STRATEGIES:
+            raise SolrConfigurationError('unknown strategy %r' % strategy)
+        if not nodes:
+            raise SolrConfigurationError('no nodes')
+
+        super(LoadBalancedClient, self).__init__(**kwargs)
+
+        method = kwargs.get('method', 'http')
+        prefix = kwargs.get('prefix', '')
+
+        self.nodes = []
+        for node in nodes:
+            if isinstance(node, (list, tuple)):
+                node = '%s:%s' % tuple(node)
+            if '://' not in node:
+                node = '%s://%s%s' % (method, node, prefix)
+            self.nodes.append(Node(node.rstrip('/')))
+
+        self.base_url       = self.nodes[0].url
+        self.strategy       = strategy
+        self.ping_path      = ping_path
+        self.fail_threshold = fail_threshold
+        self.retry_after    = retry_after
+        self.ewma_alpha     = ewma_alpha
+        self._next_node     = 0
+
+        self._pinger = None
+        if ping_interval:
+            self._pinger = PeriodicCallback(self.ping, ping_interval * 1000)
+            self._pinger.start()
+
+    @property
+    def node_stats(self):
+        return [node.to_dict() for node in self.nodes]
+
+    def close(self):
+        """
+        Stops pinging nodes.
+        """
+        if self._pinger is not None:
+            self._pinger.stop()
+            self._pinger = None
+
+    def pick(self, exclude=None):
+        """
+        Returns the :class:`Node` for the next request.
+
+        :arg exclude: Url of a node to avoid if there is another
+        """
+        now   = self.ioloop.time()
+        nodes = [
+            n for n in self.nodes
+            if n.healthy or now - n.down_since >= self.retry_after
+        ] or self.nodes
+        if exclude is not None:
+            nodes = [n for n in nodes if n.url != exclude] or nodes
+
+        if self.strategy == 'random':
+            return random.choice(nodes)
+        if self.strategy == 'least_outstanding':
+            return min(nodes, key=lambda n: (n.outstanding, n.latency or 0))
+
+        node = nodes[self._next_node % len(nodes)]
+        self._next_node += 1
+        return node
+
+    @gen.coroutine
+    def ping(self):
+        """
+        Requests ``ping_path`` from every node, updating their health.
+        """
+        yield [self._ping(node) for node in self.nodes]
+
+    @gen.coroutine
+    def _ping(self, node):
+        request = self.mk_req(self.ping_path, base_url=node.url)
+        start   = self.ioloop.time()
+        try:
+            response = yield self.client.fetch(request, raise_error=False)
+            failed   = response.code != 200
+        except Exception:
+            failed = True
+        self._record(node, self.ioloop.time() - start, failed)
+
+    def mk_req(self, url, base_url=None, **kwargs):
+        request = super(LoadBalancedClient, self).mk_req(
+            url, base_url=base_url, **kwargs
+        )
+        request.balanced = base_url is None
+        return request
+
+    def _send(self, request):
+        if not getattr(request, 'balanced', False):
+            return super(LoadBalancedClient, self)._send(request)
+
+        node = self.pick(exclude=getattr(request, 'avoid', None))
+        request.node = node.url
+        if node.url != self.base_url:
+            request = copy.copy(request)
+            request.url = node.url + request.url[len(self.base_url):]
+
+        node.outstanding += 1
+        node.requests    += 1
+        start = self.ioloop.time()
+        done  = Future()
+
+        def on_done(f):
+            node.outstanding -= 1
+            try:
+                failed = f.result().code in FAILURE_CODES
+            except Exception:
+                failed = True
+            self._record(node, self.ioloop.time() - start, failed)
+            chain_future(f, done)
+
+        super(LoadBalancedClient, self)._send(request).add_done_callback(on_done)
+        return done
+
+    def _hedge_request(self, request):
+        if not getattr(request, 'balanced', False):
+            return super(LoadBalancedClient, self)._hedge_request(request)
+        if len(self.nodes) < 2:
+            return None
+        hedge = copy.copy(request)
+        hedge.avoid = getattr(request, 'node', None)
+        return hedge
+
+    def _reroute(self, request):
+        if not getattr(request, 'balanced', False) or len(self.nodes) < 2:
+            return None
+        retry = copy.copy(request)
+        retry.avoid = getattr(request, 'node', None)
+        return retry
+
+    def _start_stream(self, stream, url, **kwargs):
+        node = self.pick()
+        node.outstanding += 1
+        node.requests    += 1
+
+        def on_done(f):
+            node.outstanding -= 1
+
+        future = stream.start(node.url + url, ca_certs=self.certs, **kwargs)
+        future.add_done_callback(on_done)
+        return future
+
+    def _record(self, node, latency, failed):
+        if node.latency is None:
+            node.latency = latency
+        else:
+            node.latency += self.ewma_alpha * (latency - node.latency)
+
+        if not failed:
+            node.failures = 0
+            node.healthy  = True
+            return
+
+        node.errors   += 1
+        node.failures += 1
+        if node.failures >= self.fail_threshold:
+            node.healthy    = False
+            node.down_since = self.ioloop.time()
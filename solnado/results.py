@@ -0,0 +1,320 @@
+import json
+import re
+
+
+_HEADER_RE = re.compile(r'\s*\{\s*"responseHeader"\s*:\s*')
+
+_RESPONSE_RE = re.compile(
+    r'"response"\s*:\s*\{\s*'
+    r'"numFound"\s*:\s*(\d+)\s*,\s*'
+    r'"start"\s*:\s*(\d+)\s*,\s*'
+    r'(?:"maxScore"\s*:\s*([-+0-9.eE]+|"?NaN"?)\s*,\s*)?'
+    r'(?:"numFoundExact"\s*:\s*(?:true|false)\s*,\s*)?'
+    r'"docs"\s*:\s*\['
+)
+
+_WS_RE = re.compile(r'[ \t\n\r]*')
+
+_CURSOR_RE = re.compile(r'"nextCursorMark"\s*:\s*"([^"]*)"')
+
+# strings, which may hold brackets, and the brackets between them
+_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[\[\]{}]')
+
+
+def _skip_array(text, pos):
+    """
+    Returns the position after the ``]`` closing the array ``pos`` is in.
+    """
+    depth = 1
+    for m in _TOKEN_RE.finditer(text, pos):
+        c = m.group()
+        if c == '[' or c == '{':
+            depth += 1
+        elif c == ']' or c == '}':
+            depth -= 1
+            if not depth:
+                return m.end()
+    return len(text)
+
+
+class Document(object):
+    """
+    Read only mapping for a single result document. Field names live in a
+    field index shared by every document with the same field list, so each
+    document only holds a tuple of values.
+    """
+
+    __slots__ = ('_index', '_values')
+
+    def __init__(self, index, values):
+        self._index  = index
+        self._values = values
+
+    def __getitem__(self, field):
+        return self._values[self._index[field]]
+
+    def __contains__(self, field):
+        return field in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __eq__(self, other):
+        if isinstance(other, Document):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'Document(%r)' % self.to_dict()
+
+    def get(self, field, default=None):
+        i = self._index.get(field)
+        return default if i is None else self._values[i]
+
+    def keys(self):
+        return list(self._index)
+
+    def values(self):
+        return [self._values[i] for i in self._index.values()]
+
+    def items(self):
+        return [(k, self._values[i]) for k, i in self._index.items()]
+
+    def to_dict(self):
+        return dict(self.items())
+
+
+class DocumentFactory(object):
+    """
+    Builds :class:`Document` objects from decoded key/value pairs, sharing one
+    field index per distinct field list (usually the query's ``fl``).
+    """
+
+    def __init__(self):
+        self._indexes = {}
+
+    def __call__(self, pairs):
+        keys = tuple(k for k, _ in pairs)
+        index = self._indexes.get(keys)
+        if index is None:
+            index = self._indexes[keys] = dict(
+                (k, i) for i, k in enumerate(keys)
+            )
+        return Document(index, tuple(v for _, v in pairs))
+
+
+class QueryResult(object):
+    """
+    Result of :meth:`SolrClient.query` for ``wt='json'`` and ``wt='javabin'``
+    responses.
+
+    The response header, ``num_found``, ``start`` and ``max_score`` are read
+    when the result is created. Documents are decoded one at a time as they
+    are accessed, so rendering the first few rows of a large page only pays
+    for those rows. ``data`` decodes the whole body with the client's codec.
+    Binary codecs, like :class:`solnado.javabin.JavabinCodec`, decode the
+    whole body up front.
+
+    Lazy decoding uses the standard library's ``json.JSONDecoder``, as the
+    faster codecs have no way to decode one value out of a larger text, so
+    reading every document of a page can cost more than ``data`` with such
+    a codec.
+    Other attributes, like ``code``, ``body`` and ``error``, come from the
+    tornado HTTPResponse.
+
+    :arg response: tornado HTTPResponse
+    :arg codec:    Codec used to decode ``data``
+    """
+
+    __slots__ = (
+        'response', 'header', 'num_found', 'start', 'max_score',
+        '_codec', '_text', '_pos', '_docs', '_done', '_data', '_decoder',
+        '_factory',
+    )
+
+    def __init__(self, response, codec=None):
+        self.response  = response
+        self.header    = None
+        self.num_found = None
+        self.start     = None
+        self.max_score = None
+        self._codec    = codec
+        self._text     = None
+        self._pos      = None
+        self._docs     = []
+        self._done     = True
+        self._data     = None
+        self._decoder  = None
+        self._factory  = None
+
+        body = response.body
+        if not body:
+            return
+        if getattr(codec, 'binary', False):
+            self._load()
+            return
+        if isinstance(body, bytes):
+            body = body.decode('utf8')
+
+        self._text = body
+        decoder = json.JSONDecoder()
+        pos = 0
+
+        m = _HEADER_RE.match(body)
+        if m:
+            try:
+                self.header, pos = decoder.raw_decode(body, m.end())
+            except ValueError:
+                return
+
+        m = _RESPONSE_RE.search(body, pos)
+        if m:
+            self.num_found = int(m.group(1))
+            self.start     = int(m.group(2))
+            if m.group(3) is not None:
+                self.max_score = float(m.group(3).strip('"'))
+            self._pos  = m.end()
+            self._done = False
+        else:
+            self._load()
+
+    def _load(self):
+        try:
+            data = self.data
+        except ValueError:
+            return
+        if not isinstance(data, dict):
+            return
+        self.header = data.get('responseHeader')
+        res = data.get('response') or {}
+        self.num_found = res.get('numFound')
+        self.start     = res.get('start')
+        self.max_score = res.get('maxScore')
+        factory = DocumentFactory()
+        self._docs = [
+            factory(list(d.items())) for d in res.get('docs', [])
+        ]
+
+    def __getattr__(self, name):
+        return getattr(self.response, name)
+
+    def __iter__(self):
+        i = 0
+        while True:
+            if i < len(self._docs):
+                yield self._docs[i]
+                i += 1
+            elif not self._next_doc():
+                return
+
+    def __getitem__(self, i):
+        if i < 0 or isinstance(i, slice):
+            return self.docs[i]
+        while i >= len(self._docs) and self._next_doc():
+            pass
+        return self._docs[i]
+
+    def __len__(self):
+        return len(self.docs)
+
+    def hydrate(self, docs):
+        """
+        Replaces the rows of an ids-only search with full documents, keeping
+        each row's score. Rows without a document, deleted since the search,
+        are dropped. ``data`` still holds the ids-only response.
+
+        :arg docs: Documents or None, one for each row in order
+        """
+        factory = DocumentFactory()
+        rows    = []
+        for row, doc in zip(self.docs, docs):
+            if doc is None:
+                continue
+            pairs = [(k, v) for k, v in doc.items() if k != 'score']
+            if 'score' in row:
+                pairs.append(('score', row['score']))
+            rows.append(factory(pairs))
+        self._docs = rows
+        self._done = True
+
+    @property
+    def partial(self):
+        """
+        True when Solr cut the search short, after ``timeAllowed`` ran out,
+        and the documents are incomplete.
+        """
+        return bool((self.header or {}).get('partialResults'))
+
+    @property
+    def decoded(self):
+        """
+        Number of documents decoded so far.
+        """
+        return len(self._docs)
+
+    @property
+    def docs(self):
+        """
+        Every document in the page, decoding any not yet decoded.
+        """
+        while self._next_doc():
+            pass
+        return self._docs
+
+    @property
+    def next_cursor_mark(self):
+        """
+        The ``nextCursorMark`` of a cursor query, found after the documents
+        without decoding them.
+        """
+        if self._text is None or self._pos is None:
+            if isinstance(self._data, dict):
+                return self._data.get('nextCursorMark')
+            return None
+        m = _CURSOR_RE.search(self._text, _skip_array(self._text, self._pos))
+        return m.group(1) if m else None
+
+    @property
+    def data(self):
+        """
+        The whole response body, decoded with the client's codec.
+        """
+        if self._data is None and self.response.body:
+            if self._codec is not None:
+                self._data = self._codec.loads(self.response.body)
+            else:
+                self._data = json.loads(self._text)
+        return self._data
+
+    def _next_doc(self):
+        if self._done:
+            return False
+
+        text = self._text
+        pos  = _WS_RE.match(text, self._pos).end()
+
+        if text[pos] == ']':
+            self._done = True
+            return False
+
+        if self._decoder is None:
+            self._decoder = json.JSONDecoder()
+            self._factory = DocumentFactory()
+
+        # only the document itself is a Document, nested values stay dicts
+        # like they are from _load
+        doc, pos = self._decoder.raw_decode(text, pos)
+        doc = self._factory(list(doc.items()))
+        pos = _WS_RE.match(text, pos).end()
+        if text[pos] == ',':
+            pos += 1
+
+        self._pos = pos
+        self._docs.append(doc)
+        return True
@@ -0,0 +1,194 @@
+import random
+import time
+from   collections import deque
+
+
+# responses worth another attempt, 599 is tornado's code for network errors
+RETRY_CODES = frozenset([429, 502, 503, 504, 599])
+
+
+class SolrCircuitOpenError(Exception):
+    pass
+
+
+def is_failure(response, error, codes=RETRY_CODES):
+    """
+    Returns True when a request failed in a way another attempt may fix:
+    a network error or one of ``codes``.
+    """
+    if error is not None:
+        return True
+    return response.code in codes
+
+
+class RetryBudget(object):
+    """
+    Caps retries to a ratio of requests over a sliding window, so retries
+    cannot multiply load on a cluster that is already struggling. At least
+    ``min_retries`` are allowed per window.
+
+    :arg ratio:       Retries allowed per request
+    :arg min_retries: Retries always allowed per window
+    :arg window:      Window length in seconds
+    :arg clock:       Function returning the current time in seconds
+    """
+
+    def __init__(self, ratio=0.2, min_retries=10, window=10.0, clock=time.time):
+        self.ratio       = ratio
+        self.min_retries = min_retries
+        self.window      = window
+        self.clock       = clock
+
+        self._requests = deque()
+        self._retries  = deque()
+
+    def _trim(self, now):
+        for q in (self._requests, self._retries):
+            while q and q[0] <= now - self.window:
+                q.popleft()
+
+    def deposit(self):
+        """
+        Records a first attempt.
+        """
+        self._requests.append(self.clock())
+
+    def withdraw(self):
+        """
+        Returns True and records a retry if the budget allows one.
+        """
+        now = self.clock()
+        self._trim(now)
+        allowed = max(self.min_retries, self.ratio * len(self._requests))
+        if len(self._retries) >= allowed:
+            return False
+        self._retries.append(now)
+        return True
+
+
+class RetryPolicy(object):
+    """
+    Retries idempotent requests that fail with a network error or a 429,
+    502, 503 or 504 response, waiting an exponentially growing, fully
+    jittered delay between attempts: a random time between zero and
+    ``backoff * 2 ** attempt``, capped at ``max_backoff``.
+
+    Queries, the other read requests and adds or deletes keyed on
+    ``unique_key`` are idempotent. Other updates and Collections or Core
+    API actions are never retried.
+
+    :arg max_attempts: Attempts per request, including the first
+    :arg backoff:      Base delay in seconds
+    :arg max_backoff:  Maximum delay in seconds
+    :arg budget:       A :class:`RetryBudget`, None for the default one or
+                       False for no budget
+    :arg unique_key:   The uniqueKey field adds must carry to be retried
+    :arg codes:        Response codes that are retried
+    """
+
+    def __init__(self,
+            max_attempts = 3,
+            backoff      = 0.1,
+            max_backoff  = 5.0,
+            budget       = None,
+            unique_key   = 'id',
+            codes        = RETRY_CODES
+    ):
+        self.max_attempts = max_attempts
+        self.backoff      = backoff
+        self.max_backoff  = max_backoff
+        self.budget       = RetryBudget() if budget is None else budget or None
+        self.unique_key   = unique_key
+        self.codes        = codes
+
+    def delay(self, attempt):
+        """
+        Returns the seconds to wait before retry number ``attempt``, from 1.
+        """
+        return random.uniform(
+            0, min(self.max_backoff, self.backoff * 2 ** attempt)
+        )
+
+    def should_retry(self, response, error, attempt):
+        """
+        Returns True if a request that got ``response`` or ``error`` on
+        attempt number ``attempt``, from 1, should be sent again.
+        """
+        if attempt >= self.max_attempts:
+            return False
+        if not is_failure(response, error, self.codes):
+            return False
+        return self.budget is None or self.budget.withdraw()
+
+    def keyed(self, docs):
+        """
+        Returns True if every document carries ``unique_key``, which makes
+        adding them idempotent. Atomic updates, documents with a dict value
+        like ``{'inc': 1}``, are not: a retry may apply them twice.
+        """
+        return all(
+            isinstance(doc, dict) and self.unique_key in doc and
+            not any(isinstance(v, dict) for v in doc.values())
+            for doc in docs
+        )
+
+
+class CircuitBreaker(object):
+    """
+    Per node circuit breakers. After ``failure_threshold`` consecutive
+    failures a node's circuit opens and requests to it fail at once with
+    :class:`SolrCircuitOpenError`. After ``reset_timeout`` seconds one trial
+    request is let through: success closes the circuit, failure opens it
+    again.
+
+    :arg failure_threshold: Consecutive failures that open a circuit
+    :arg reset_timeout:     Seconds before an open circuit allows a trial
+    :arg codes:             Response codes counted as failures
+    :arg clock:             Function returning the current time in seconds
+    """
+
+    CLOSED    = 'closed'
+    OPEN      = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self,
+            failure_threshold = 5,
+            reset_timeout     = 10.0,
+            codes             = RETRY_CODES,
+            clock             = time.time
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout     = reset_timeout
+        self.codes             = codes
+        self.clock             = clock
+        self._nodes            = {}
+
+    def state(self, node):
+        return self._nodes.get(node, (self.CLOSED, 0, None))[0]
+
+    def allow(self, node):
+        """
+        Returns True if a request may be sent to ``node``.
+        """
+        state, failures, opened = self._nodes.get(node, (self.CLOSED, 0, None))
+        if state == self.CLOSED:
+            return True
+        if state == self.OPEN and self.clock() - opened >= self.reset_timeout:
+            self._nodes[node] = (self.HALF_OPEN, failures, opened)
+            return True
+        return False
+
+    def record(self, node, response, error):
+        """
+        Records the outcome of a request to ``node``.
+        """
+        if not is_failure(response, error, self.codes):
+            self._nodes.pop(node, None)
+            return
+
+        state, failures, opened = self._nodes.get(node, (self.CLOSED, 0, None))
+        failures += 1
+        if state == self.HALF_OPEN or failures >= self.failure_threshold:
+            self._nodes[node] = (self.OPEN, failures, self.clock())
+        else:
+            self._nodes[node] = (state, failures, opened)
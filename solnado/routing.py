@@ -0,0 +1,233 @@
+from bisect import bisect_right
+from collections import OrderedDict
+
+
+class SolrRoutingError(Exception):
+    pass
+
+
+def _rotl32(x, r):
+    return ((x << r) | (x >> (32 - r))) & 0xffffffff
+
+
+def _to_signed32(x):
+    return x - 0x100000000 if x & 0x80000000 else x
+
+
+def murmurhash3_x86_32(data, seed=0):
+    """
+    MurmurHash3 x86 32-bit, as used by Solr's ``Hash.murmurhash3_x86_32``.
+    Text is hashed as utf8. Returns a signed 32-bit int like Java does.
+
+    :arg data: Text or bytes to hash
+    :arg seed: Hash seed
+    """
+    if not isinstance(data, bytes):
+        data = data.encode('utf8')
+    data = bytearray(data)
+
+    c1 = 0xcc9e2d51
+    c2 = 0x1b873593
+    length = len(data)
+    h1 = seed & 0xffffffff
+    rounded_end = length & ~3
+
+    for i in range(0, rounded_end, 4):
+        k1 = data[i] | data[i + 1] << 8 | data[i + 2] << 16 | data[i + 3] << 24
+        k1 = (k1 * c1) & 0xffffffff
+        k1 = _rotl32(k1, 15)
+        k1 = (k1 * c2) & 0xffffffff
+        h1 ^= k1
+        h1 = _rotl32(h1, 13)
+        h1 = (h1 * 5 + 0xe6546b64) & 0xffffffff
+
+    k1 = 0
+    tail = length & 3
+    if tail == 3:
+        k1 = data[rounded_end + 2] << 16
+    if tail >= 2:
+        k1 |= data[rounded_end + 1] << 8
+    if tail >= 1:
+        k1 |= data[rounded_end]
+        k1 = (k1 * c1) & 0xffffffff
+        k1 = _rotl32(k1, 15)
+        k1 = (k1 * c2) & 0xffffffff
+        h1 ^= k1
+
+    h1 ^= length
+    h1 ^= h1 >> 16
+    h1 = (h1 * 0x85ebca6b) & 0xffffffff
+    h1 ^= h1 >> 13
+    h1 = (h1 * 0xc2b2ae35) & 0xffffffff
+    h1 ^= h1 >> 16
+
+    return _to_signed32(h1)
+
+
+def _split_key(key):
+    # mirrors CompositeIdRouter.KeyParser: at most three parts, a trailing
+    # separator adds an empty last part
+    first = key.find('!')
+    if first == -1:
+        return [key]
+
+    parts = [key[:first]]
+    last = len(key) - 1
+    if first < last:
+        second = key.find('!', first + 1)
+        if second == -1:
+            parts.append(key[first + 1:])
+        elif second == last:
+            if first < second - 1:
+                parts.append(key[first + 1:second])
+        else:
+            parts.append(key[first + 1:second])
+            parts.append(key[second + 1:])
+
+    if key.endswith('!') and len(parts) < 3:
+        parts.append('')
+    return parts
+
+
+def composite_id_hash(doc_id):
+    """
+    Hashes a document id the way Solr's compositeId router does, including
+    ``tenant!id``, ``tenant/bits!id`` and ``a!b!id`` prefixes.
+
+    :arg doc_id: The uniqueKey value of the document
+    """
+    parts = _split_key(str(doc_id))
+    if len(parts) == 1:
+        return murmurhash3_x86_32(parts[0])
+
+    tri = len(parts) == 3
+    bits = [8, 8] if tri else [16]
+    limit = 8 if tri else 16
+
+    for i in range(len(parts) - 1):
+        idx = parts[i].find('/')
+        if idx > 0:
+            try:
+                n = int(parts[i][idx + 1:])
+            except ValueError:
+                n = bits[i]
+            bits[i] = min(max(n, 0), limit)
+            parts[i] = parts[i][:idx]
+
+    if tri:
+        m0 = (0xffffffff << (32 - bits[0])) & 0xffffffff if bits[0] else 0
+        m1 = (0xffffffff << (32 - bits[0] - bits[1])) & 0xffffffff \
+            if bits[0] + bits[1] else 0
+        m1 = m0 ^ m1
+        masks = [m0, m1, ~(m0 | m1) & 0xffffffff]
+    else:
+        m0 = (0xffffffff << (32 - bits[0])) & 0xffffffff if bits[0] else 0
+        masks = [m0, ~m0 & 0xffffffff]
+
+    h = 0
+    for part, mask in zip(parts, masks):
+        h |= (murmurhash3_x86_32(part) & 0xffffffff) & mask
+    return _to_signed32(h)
+
+
+def parse_range(r):
+    """
+    Parses a CLUSTERSTATUS hash range such as ``80000000-ffffffff`` into a
+    signed ``(min, max)`` tuple.
+    """
+    lo, hi = r.split('-')
+    return _to_signed32(int(lo, 16)), _to_signed32(int(hi, 16))
+
+
+class Shard(object):
+
+    def __init__(self, name, range_min, range_max, leader_url=None):
+        self.name       = name
+        self.range_min  = range_min
+        self.range_max  = range_max
+        self.leader_url = leader_url
+
+    def __repr__(self):
+        return '<Shard %s %08x-%08x %s>' % (
+            self.name,
+            self.range_min & 0xffffffff,
+            self.range_max & 0xffffffff,
+            self.leader_url,
+        )
+
+
+class CompositeIdRouter(object):
+    """
+    Client side version of Solr's compositeId router. Maps document ids to
+    the active shard owning their hash, so updates can be sent straight to
+    the shard leader instead of being forwarded by whichever node gets them.
+
+    :arg shards: List of :class:`Shard`
+    """
+
+    def __init__(self, shards):
+        self.shards = sorted(shards, key=lambda s: s.range_min)
+        self._mins  = [s.range_min for s in self.shards]
+
+    @classmethod
+    def from_cluster_status(cls, status, collection):
+        """
+        Builds a router from a decoded
+        `CLUSTERSTATUS <https://cwiki.apache.org/confluence/display/solr/Collections+API#CollectionsAPI-api18>`_
+        response.
+
+        :arg status:     Decoded CLUSTERSTATUS response
+        :arg collection: The name of the collection
+        """
+        try:
+            coll = status['cluster']['collections'][collection]
+        except KeyError:
+            raise SolrRoutingError('unknown collection %s' % collection)
+
+        router = coll.get('router', {}).get('name', 'compositeId')
+        if router != 'compositeId':
+            raise SolrRoutingError('collection uses %s router' % router)
+
+        shards = []
+        for name, shard in coll.get('shards', {}).items():
+            if shard.get('state', 'active') != 'active' or not shard.get('range'):
+                continue
+
+            leader_url = None
+            for replica in shard.get('replicas', {}).values():
+                if replica.get('leader') == 'true':
+                    leader_url = '%s/%s' % (
+                        replica['base_url'].rstrip('/'), replica['core']
+                    )
+                    break
+
+            lo, hi = parse_range(shard['range'])
+            shards.append(Shard(name, lo, hi, leader_url))
+
+        return cls(shards)
+
+    def shard_for(self, doc_id):
+        """
+        Returns the :class:`Shard` owning ``doc_id``.
+
+        :arg doc_id: The uniqueKey value of the document
+        """
+        h = composite_id_hash(doc_id)
+        i = bisect_right(self._mins, h) - 1
+        if i < 0 or h > self.shards[i].range_max:
+            raise SolrRoutingError('no shard for hash %d' % h)
+        return self.shards[i]
+
+    def group(self, docs, id_field='id'):
+        """
+        Splits ``docs`` into per shard lists, returning an ordered mapping of
+        :class:`Shard` to documents.
+
+        :arg docs:     List of dictionaries
+        :arg id_field: The uniqueKey field name
+        """
+        groups = OrderedDict()
+        for doc in docs:
+            shard = self.shard_for(doc[id_field])
+            groups.setdefault(shard, []).append(doc)
+        return groups
@@ -0,0 +1,313 @@
+import codecs
+import json
+import re
+import ssl
+import sys
+from   collections import deque
+from   datetime import timedelta
+from   tornado import gen, httputil
+from   tornado.concurrent import Future
+from   tornado.http1connection import HTTP1Connection, HTTP1ConnectionParameters
+from   tornado.httpclient import HTTPError
+from   tornado.tcpclient import TCPClient
+from   .results import DocumentFactory
+
+PY2 = sys.version_info[0] == 2
+if PY2:
+    from urlparse import urlsplit
+else:
+    from urllib.parse import urlsplit
+
+try:
+    StopAsyncIteration = StopAsyncIteration
+except NameError:
+    # python < 3.5, only raised when __anext__ is called directly
+    class StopAsyncIteration(Exception):
+        pass
+
+
+_DOCS_RE      = re.compile(r'"docs"\s*:\s*\[')
+_NUM_FOUND_RE = re.compile(r'"numFound"\s*:\s*(\d+)')
+_SKIP_RE      = re.compile(r'[ \t\n\r,]*')
+
+
+class SolrStreamError(Exception):
+    pass
+
+
+class JSONDocsParser(object):
+    """
+    Incremental parser for responses holding a ``"docs": [...]`` array, such
+    as ``/export``. Bytes are fed in as they arrive and each complete document
+    is returned as soon as its closing brace has been seen. Only the current
+    partial document is buffered.
+    """
+
+    def __init__(self):
+        self.num_found = None
+        self.done      = False
+        self._text     = codecs.getincrementaldecoder('utf8')()
+        self._decoder  = json.JSONDecoder()
+        self._factory  = DocumentFactory()
+        self._buf      = ''
+        self._in_docs  = False
+
+    def feed(self, data):
+        """
+        Feeds a chunk of the body, returning the documents it completed.
+
+        :arg data: Bytes read from the response
+        """
+        self._buf += self._text.decode(data)
+        docs = []
+
+        if not self._in_docs:
+            m = _DOCS_RE.search(self._buf)
+            if not m:
+                return docs
+            nf = _NUM_FOUND_RE.search(self._buf, 0, m.start())
+            if nf:
+                self.num_found = int(nf.group(1))
+            self._buf     = self._buf[m.end():]
+            self._in_docs = True
+
+        buf = self._buf
+        pos = 0
+        while not self.done:
+            pos = _SKIP_RE.match(buf, pos).end()
+            if pos >= len(buf):
+                break
+            if buf[pos] == ']':
+                self.done = True
+                pos += 1
+                break
+            try:
+                doc, pos = self._decoder.raw_decode(buf, pos)
+            except ValueError:
+                break
+            docs.append(self._factory(list(doc.items())))
+
+        self._buf = buf[pos:]
+        return docs
+
+
+class DocumentStream(httputil.HTTPMessageDelegate):
+    """
+    Documents of a streamed response, yielded as they arrive over the wire.
+
+    At most ``max_buffer`` parsed documents are held. Once that many are
+    waiting, reading from the socket pauses until the consumer catches up,
+    so memory stays constant whatever the size of the result. Call
+    :meth:`cancel` to stop early and close the connection.
+
+    Use with ``async for``, or call :meth:`next` from a coroutine until it
+    resolves to None.
+
+    :arg max_buffer: Maximum number of parsed documents held
+    :arg parser:     Incremental parser, defaults to :class:`JSONDocsParser`
+    """
+
+    def __init__(self, max_buffer=1000, parser=None):
+        self.max_buffer = max_buffer
+        self.parser     = parser or JSONDocsParser()
+        self.code       = None
+        self.headers    = None
+
+        self._docs      = deque()
+        self._error     = None
+        self._finished  = False
+        self._cancelled = False
+        self._waiter    = None
+        self._drained   = None
+        self._stream    = None
+        self._errbody   = []
+
+    @property
+    def num_found(self):
+        return self.parser.num_found
+
+    @property
+    def buffered(self):
+        return len(self._docs)
+
+    def __aiter__(self):
+        return self
+
+    @gen.coroutine
+    def __anext__(self):
+        doc = yield self.next()
+        if doc is None:
+            raise StopAsyncIteration()
+        raise gen.Return(doc)
+
+    @gen.coroutine
+    def next(self):
+        """
+        Resolves to the next document, or None at the end of the stream.
+        """
+        while not self._docs:
+            if self._error is not None:
+                raise self._error
+            if self._finished:
+                raise gen.Return(None)
+            self._waiter = Future()
+            yield self._waiter
+
+        doc = self._docs.popleft()
+        if self._drained is not None and len(self._docs) <= self.max_buffer // 2:
+            self._drained.set_result(None)
+            self._drained = None
+        raise gen.Return(doc)
+
+    def cancel(self):
+        """
+        Stops reading and closes the connection. Documents already buffered
+        are dropped.
+        """
+        self._cancelled = True
+        self._docs.clear()
+        if self._stream is not None:
+            self._stream.close()
+        self._done()
+
+    def start(self, url, method='GET', body=None, headers=None,
+            ca_certs=None, connect_timeout=None):
+        """
+        Opens the connection and starts reading in the background.
+        """
+        return self._run(url, method, body, headers, ca_certs, connect_timeout)
+
+    @gen.coroutine
+    def _run(self, url, method, body, headers, ca_certs, connect_timeout):
+        parts = urlsplit(url)
+        https = parts.scheme == 'https'
+        port  = parts.port or (443 if https else 80)
+        path  = parts.path + ('?' + parts.query if parts.query else '')
+
+        hdrs = httputil.HTTPHeaders(headers or {})
+        hdrs['Host']       = parts.netloc
+        hdrs['Connection'] = 'close'
+        if body is not None:
+            hdrs['Content-Length'] = str(len(body))
+
+        try:
+            ssl_options = None
+            if https:
+                ssl_options = ssl.create_default_context(cafile=ca_certs or None)
+
+            connect = TCPClient().connect(
+                parts.hostname, port, ssl_options=ssl_options
+            )
+            if connect_timeout:
+                connect = gen.with_timeout(
+                    timedelta(seconds=connect_timeout),
+                    connect,
+                    quiet_exceptions = (Exception,),
+                )
+            self._stream = yield connect
+            if self._cancelled:
+                self._stream.close()
+                return
+
+            conn = HTTP1Connection(
+                self._stream,
+                True,
+                HTTP1ConnectionParameters(
+                    no_keep_alive = True,
+                    decompress    = True,
+                    max_body_size = sys.maxsize,
+                ),
+            )
+            conn.write_headers(
+                httputil.RequestStartLine(method, path, 'HTTP/1.1'), hdrs
+            )
+            if body is not None:
+                conn.write(body)
+            conn.finish()
+            yield conn.read_response(self)
+        except Exception as e:
+            if not self._cancelled:
+                self._error = e
+        finally:
+            self._done()
+
+    def _done(self):
+        self._finished = True
+        self._wake()
+        if self._drained is not None:
+            self._drained.set_result(None)
+            self._drained = None
+
+    def _push(self, docs):
+        self._docs.extend(docs)
+        self._wake()
+
+    def _wake(self):
+        if self._waiter is not None:
+            waiter, self._waiter = self._waiter, None
+            waiter.set_result(None)
+
+    def headers_received(self, start_line, headers):
+        self.code    = start_line.code
+        self.headers = headers
+
+    def data_received(self, chunk):
+        if self._cancelled:
+            return None
+
+        if self.code != 200:
+            self._errbody.append(chunk)
+            return None
+
+        docs = self.parser.feed(chunk)
+        if docs:
+            self._push(docs)
+
+        if len(self._docs) >= self.max_buffer:
+            self._drained = Future()
+            return self._drained
+        return None
+
+    def finish(self):
+        if self.code != 200 and not self._cancelled:
+            self._error = HTTPError(
+                self.code, b''.join(self._errbody).decode('utf8', 'replace')
+            )
+        elif not self.parser.done and not self._cancelled:
+            self._error = SolrStreamError('response ended before the docs did')
+        self._done()
+
+    def on_connection_close(self):
+        if not self._finished and not self._cancelled:
+            self._error = SolrStreamError('connection closed')
+        self._done()
+
+
+class TupleStream(DocumentStream):
+    """
+    Tuples of a
+    `streaming expression <https://cwiki.apache.org/confluence/display/solr/Streaming+Expressions>`_,
+    yielded as they arrive. The EOF tuple ends the stream and is kept in
+    ``eof``, which holds ``RESPONSE_TIME``. An ``EXCEPTION`` tuple raises
+    :class:`SolrStreamError` once the tuples before it are consumed.
+
+    :arg max_buffer: Maximum number of parsed tuples held
+    """
+
+    def __init__(self, max_buffer=1000):
+        super(TupleStream, self).__init__(max_buffer=max_buffer)
+        self.eof = None
+
+    def _push(self, docs):
+        if self.eof is not None:
+            return
+
+        for i, doc in enumerate(docs):
+            if 'EOF' in doc or 'EXCEPTION' in doc:
+                self.eof = doc
+                if 'EXCEPTION' in doc:
+                    self._error = SolrStreamError(doc['EXCEPTION'])
+                docs = docs[:i]
+                break
+
+        super(TupleStream, self)._push(docs)
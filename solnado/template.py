@@ -0,0 +1,154 @@
+import sys
+from   .client import with_callback
+
+PY2 = sys.version_info[0] == 2
+if PY2:
+    from urllib import urlencode
+else:
+    from urllib.parse import urlencode
+
+
+class QueryTemplate(object):
+    """
+    A query whose static parameters, like ``fl``, ``defType`` and boosts,
+    are urlencoded once. Only the values that change are encoded per call,
+    see :meth:`CollectionHandle.query`::
+
+        search = QueryTemplate({'defType': 'edismax', 'qf': 'title^2 body'})
+        res = yield products.query(search, {'q': 'shoes', 'rows': 20})
+
+    :arg q:      Static query dictionary
+    :arg indent: Indent the response body
+    :arg wt:     Response format: 'json', 'javabin' or 'xml'
+    """
+
+    def __init__(self, q=None, indent='off', wt='json'):
+        self.q       = dict(q or {})
+        self.indent  = indent
+        self.wt      = wt
+        self.params  = dict(self.q, indent=indent, wt=wt)
+        self.encoded = urlencode(self.params)
+        self._keys   = frozenset(self.params)
+
+    def render(self, values=None):
+        """
+        Returns the query string for the template with ``values`` filled in.
+        Values that replace a static parameter re-encode the whole query.
+
+        :arg values: Dictionary of the parameters that change per call
+        """
+        if not values:
+            return self.encoded
+        if not self._keys.isdisjoint(values):
+            return urlencode(dict(self.params, **values))
+        return self.encoded + '&' + urlencode(values)
+
+    def merge(self, values=None):
+        """
+        Returns the query dictionary with ``values`` filled in.
+        """
+        return dict(self.q, **values) if values else dict(self.q)
+
+    def static(self):
+        """
+        True if every static value can go in a GET URL as it is.
+        """
+        return not any(
+            isinstance(v, (list, tuple, dict)) for v in self.q.values()
+        )
+
+
+class CollectionHandle(object):
+    """
+    A :class:`solnado.client.SolrClient` bound to one collection, with its
+    query URL prefix built once.
+
+    :meth:`query` sends a :class:`QueryTemplate` as a GET without building
+    a query dictionary. The fast path is skipped, and the client's regular
+    :meth:`query <solnado.client.SolrClient.query>` used instead, when the
+    client has a ``cluster`` state, which routes per call, or a ``cache``,
+    which keys on the query dictionary, or when the URL is too long for a
+    GET. Only the query path is precomputed: :meth:`get_many`,
+    :meth:`add_json_documents` and :meth:`delete` just pass the collection
+    on to the client.
+
+    :arg client:     A :class:`solnado.client.SolrClient`
+    :arg collection: The name of the collection
+    """
+
+    def __init__(self, client, collection):
+        self.client     = client
+        self.collection = collection
+        self.query_path = client.mk_url('solr', collection, 'query') + '?'
+
+    def query(self,
+            template,
+            values   = None,
+            callback = None,
+            timeout  = None,
+            deadline = None
+        ):
+        """
+        Runs ``template`` with ``values`` filled in. Resolves like
+        :meth:`solnado.client.SolrClient.query`.
+
+        :arg template: A :class:`QueryTemplate`
+        :arg values:   Dictionary of the parameters that change per call
+        :arg callback: Callback to run on completion
+        :arg timeout:  Seconds the call may take
+        :arg deadline: IOLoop time the call must finish by
+        """
+        values = values or {}
+        client = self.client
+        if client.cluster is not None or client.cache is not None or \
+                not template.static():
+            return self._query(template, values, callback, timeout, deadline)
+
+        deadline = client.deadline(timeout, deadline)
+        if deadline is not None and 'timeAllowed' not in template.q:
+            values = dict(values)
+            values.setdefault(
+                'timeAllowed', max(1, int((deadline - client.ioloop.time()) * 1000))
+            )
+
+        url = self.query_path + template.render(values)
+        if len(url) > client.query_post_url or any(
+            isinstance(v, (list, tuple, dict)) for v in values.values()
+        ):
+            return self._query(template, values, callback, timeout, deadline)
+
+        future = client._fetch(
+            client.mk_req(url, deadline=deadline), coalesce=True, hedge=True
+        )
+        future = client._query_result(future, template.wt)
+        return with_callback(future, callback)
+
+    def _query(self, template, values, callback, timeout, deadline):
+        return self.client.query(
+            self.collection,
+            template.merge(values),
+            callback = callback,
+            indent   = template.indent,
+            timeout  = timeout,
+            deadline = deadline,
+            wt       = template.wt,
+        )
+
+    def get_many(self, ids, **kwargs):
+        """
+        :meth:`solnado.client.SolrClient.get_many` for this collection.
+        """
+        return self.client.get_many(self.collection, ids, **kwargs)
+
+    def add_json_documents(self, docs, **kwargs):
+        """
+        :meth:`solnado.client.SolrClient.add_json_documents` for this
+        collection.
+        """
+        return self.client.add_json_documents(self.collection, docs, **kwargs)
+
+    def delete(self, docs, **kwargs):
+        """
+        :meth:`solnado.client.SolrClient.delete` for this collection.
+        """
+        return self.client.delete(self.collection, docs, **kwargs)
@@ -0,0 +1,184 @@
+"""
+Stand-ins for tornado's HTTP client, shared by the test modules.
+"""
+import json
+from io import BytesIO
+from solnado import SolrClient
+from tornado import gen
+from tornado.concurrent import Future
+from tornado.httpclient import HTTPRequest, HTTPResponse
+
+try:
+    from urllib.parse import parse_qs, urlsplit
+except ImportError:
+    from urlparse import parse_qs, urlsplit
+
+
+def make_client(http, *args, **kwargs):
+    """
+    Returns a client, a :class:`solnado.SolrClient` unless ``cls`` says
+    otherwise, that sends its requests to the fake ``http`` client.
+    """
+    cls = kwargs.pop('cls', SolrClient)
+    client = cls(*args, **kwargs)
+    client.client = http
+    return client
+
+
+def response(body=b'', code=200, url='http://localhost:8983/solr/c/query'):
+    """
+    Returns a response with ``body``, encoded as JSON unless it is bytes.
+    """
+    if not isinstance(body, bytes):
+        body = json.dumps(body).encode('utf8')
+    return HTTPResponse(HTTPRequest(url), code, buffer=BytesIO(body))
+
+
+def params(request):
+    return parse_qs(urlsplit(getattr(request, 'url', request)).query)
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeHTTPClient(object):
+    """
+    Resolves each request with the request itself, or fails with ``error``.
+    """
+
+    def __init__(self, error=None):
+        self.requests = []
+        self.error    = error
+
+    def fetch(self, request, raise_error=True):
+        self.requests.append(request)
+        future = Future()
+        if self.error:
+            future.set_exception(self.error)
+        else:
+            future.set_result(request)
+        return future
+
+
+class HeldHTTPClient(FakeHTTPClient):
+    """
+    Never answers; the last request's Future is kept in ``held``.
+    """
+
+    def fetch(self, request, raise_error=True):
+        self.requests.append(request)
+        self.held = Future()
+        return self.held
+
+
+class DelayedHTTPClient(FakeHTTPClient):
+    """
+    Resolves each request after the number of seconds in its 'delay' param.
+    """
+
+    def __init__(self, ioloop):
+        super(DelayedHTTPClient, self).__init__()
+        self.ioloop = ioloop
+        self.active = 0
+        self.peak   = 0
+
+    def fetch(self, request, raise_error=True):
+        self.requests.append(request)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        delay  = float(params(request)['delay'][0])
+        future = Future()
+
+        def done():
+            self.active -= 1
+            future.set_result(request)
+
+        self.ioloop.add_timeout(self.ioloop.time() + delay, done)
+        return future
+
+
+class RecordingHTTPClient(FakeHTTPClient):
+    """
+    Answers every request with a ``code`` response holding ``body``.
+    """
+
+    def __init__(self, body=b'', code=200):
+        super(RecordingHTTPClient, self).__init__()
+        self.body = body
+        self.code = code
+
+    def fetch(self, request, raise_error=True):
+        self.requests.append(request)
+        future = Future()
+        future.set_result(
+            HTTPResponse(request, self.code, buffer=BytesIO(self.body))
+        )
+        return future
+
+
+class ScriptedHTTPClient(FakeHTTPClient):
+    """
+    Answers requests in order with ``responses``, then with 200s. Each is a
+    code, a ``(code, body)`` pair with a JSON body, or None for a connection
+    error. ``urls`` keeps the URL of each request as it was sent.
+    """
+
+    def __init__(self, *responses):
+        super(ScriptedHTTPClient, self).__init__()
+        self.responses = list(responses)
+        self.urls      = []
+
+    def fetch(self, request, raise_error=True):
+        self.requests.append(request)
+        self.urls.append(request.url)
+        scripted = self.responses.pop(0) if self.responses else 200
+        future   = Future()
+        if scripted is None:
+            future.set_exception(IOError('connection reset'))
+            return future
+
+        code, body = scripted if isinstance(scripted, tuple) else (scripted, None)
+        buffer = None if body is None else BytesIO(json.dumps(body).encode('utf8'))
+        future.set_result(HTTPResponse(request, code, buffer=buffer))
+        return future
+
+
+class NodesHTTPClient(FakeHTTPClient):
+    """
+    Answers every request with a 200, or with the code set for its node in
+    ``codes``, after the delay set for the node in ``delays``. Nodes in
+    ``held`` do not answer until released.
+    """
+
+    def __init__(self, delays=None):
+        super(NodesHTTPClient, self).__init__()
+        self.codes  = {}
+        self.delays = delays or {}
+        self.held   = {}
+
+    def fetch(self, request, raise_error=True):
+        self.requests.append(request)
+        node     = request.url.split('/solr')[0]
+        future   = Future()
+        response = HTTPResponse(request, self.codes.get(node, 200))
+        if node in self.held:
+            self.held[node].append((future, response))
+        elif self.delays.get(node):
+            gen.sleep(self.delays[node]).add_done_callback(
+                lambda f: future.set_result(response)
+            )
+        else:
+            future.set_result(response)
+        return future
+
+    def release(self, node):
+        for future, response in self.held.pop(node):
+            future.set_result(response)
+
+    def nodes(self):
+        return [r.url.split('/solr')[0] for r in self.requests]
@@ -0,0 +1,143 @@
+import json
+from nose.tools import ok_, eq_
+from solnado import BulkIndexer
+from solnado.bulk import BulkIndexerClosedError
+from solnado.codec import JSONCodec
+from tornado import gen
+from tornado.concurrent import Future
+from tornado.testing import AsyncTestCase, gen_test
+
+
+class FakeResponse(object):
+    def __init__(self, code=200, error=None):
+        self.code  = code
+        self.error = error
+
+
+class FakeClient(object):
+    codec = JSONCodec()
+
+    def __init__(self, ioloop, code=200, error=None):
+        self.ioloop  = ioloop
+        self.code    = code
+        self.error   = error
+        self.batches = []
+        self.bodies  = []
+        self.active  = 0
+        self.peak    = 0
+
+    def add_json_documents(self, collection, docs, body=None, **kwargs):
+        if self.error is not None:
+            raise self.error
+        self.batches.append(list(docs))
+        self.bodies.append(body)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        future = Future()
+
+        def done():
+            self.active -= 1
+            future.set_result(FakeResponse(self.code))
+
+        self.ioloop.add_timeout(self.ioloop.time() + 0.01, done)
+        return future
+
+
+class BulkIndexerTestCase(AsyncTestCase):
+    def setUp(self):
+        super(BulkIndexerTestCase, self).setUp()
+        self.client = FakeClient(self.io_loop)
+
+    @gen_test(timeout=5)
+    def test_batch_size(self):
+        b = BulkIndexer(self.client, 'c', batch_size=3, ioloop=self.io_loop)
+        for i in range(7):
+            yield b.add({'id': str(i)})
+        results = yield b.close()
+        eq_([3, 3, 1], [len(x) for x in self.client.batches])
+        eq_(7, b.stats['docs'])
+        eq_(0, b.stats['errors'])
+        ok_(all(r.latency >= 0 for r in results))
+
+    @gen_test(timeout=5)
+    def test_batch_bytes(self):
+        b = BulkIndexer(
+            self.client, 'c', batch_size=100, batch_bytes=40,
+            ioloop=self.io_loop
+        )
+        for i in range(4):
+            b.add({'id': str(i), 'title': 'xxxxxxxxxx'})
+        yield b.flush()
+        ok_(len(self.client.batches) > 1)
+        eq_(4, sum(len(x) for x in self.client.batches))
+
+    @gen_test(timeout=5)
+    def test_concurrency(self):
+        b = BulkIndexer(
+            self.client, 'c', batch_size=1, concurrency=2,
+            ioloop=self.io_loop
+        )
+        for i in range(6):
+            b.add({'id': str(i)})
+        eq_(2, b.in_flight)
+        yield b.flush()
+        eq_(2, self.client.peak)
+        eq_(6, len(self.client.batches))
+
+    @gen_test(timeout=5)
+    def test_flush_interval(self):
+        b = BulkIndexer(
+            self.client, 'c', flush_interval=0.05, ioloop=self.io_loop
+        )
+        b.add({'id': '1'})
+        eq_([], self.client.batches)
+        yield gen.sleep(0.2)
+        eq_([[{'id': '1'}]], self.client.batches)
+
+    @gen_test(timeout=5)
+    def test_errors(self):
+        self.client.code = 503
+        seen = []
+        b = BulkIndexer(
+            self.client, 'c', on_batch=seen.append, ioloop=self.io_loop
+        )
+        b.add({'id': '1'})
+        results = yield b.close()
+        eq_(503, results[0].error)
+        eq_(1, b.stats['errors'])
+        eq_(results, seen)
+        self.assertRaises(BulkIndexerClosedError, b.add, {'id': '2'})
+
+    @gen_test(timeout=5)
+    def test_encodes_once(self):
+        b = BulkIndexer(self.client, 'c', batch_size=2, ioloop=self.io_loop)
+        b.add({'id': '1'})
+        b.add({'id': '2'})
+        results = yield b.close()
+        eq_([{'id': '1'}, {'id': '2'}], json.loads(self.client.bodies[0].decode('utf8')))
+        eq_(len(self.client.bodies[0]), results[0].nbytes)
+
+    @gen_test(timeout=5)
+    def test_hook_errors(self):
+        def on_batch(result):
+            raise ValueError('hook')
+
+        b = BulkIndexer(
+            self.client, 'c', batch_size=1, concurrency=1, on_batch=on_batch,
+            ioloop=self.io_loop
+        )
+        for i in range(3):
+            b.add({'id': str(i)})
+        results = yield b.close()
+        eq_(3, len(results))
+        eq_(0, b.in_flight)
+
+    @gen_test(timeout=5)
+    def test_send_errors(self):
+        client = FakeClient(self.io_loop, error=ValueError('bad'))
+        b = BulkIndexer(client, 'c', batch_size=1, ioloop=self.io_loop)
+        b.add({'id': '1'})
+        results = yield b.close()
+        ok_(isinstance(results[0].error, ValueError))
+        eq_(0, b.in_flight)
+        eq_(1, b.stats['errors'])
@@ -0,0 +1,318 @@
+import json
+from io import BytesIO
+from nose.tools import ok_, eq_
+from solnado.cache import DocumentCache, QueryCache
+from tornado import gen
+from tornado.concurrent import Future
+from tornado.httpclient import HTTPResponse
+from tornado.testing import AsyncTestCase, gen_test
+from unittest import TestCase
+
+from fakes import Clock, make_client
+
+try:
+    from urllib.parse import parse_qsl, urlsplit
+except ImportError:
+    from urlparse import parse_qsl, urlsplit
+
+
+class FakeSolr(object):
+    """
+    Answers queries with a response naming the request number and holds
+    update responses until ``release`` is called.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.held     = []
+
+    def fetch(self, request, raise_error=True):
+        self.requests.append(request)
+        future = Future()
+        body = json.dumps({
+            'responseHeader': {'status': 0},
+            'response': {'numFound': len(self.requests), 'start': 0, 'docs': []},
+        }).encode('utf8')
+        response = HTTPResponse(request, 200, buffer=BytesIO(body))
+        if '/update' in request.url:
+            self.held.append((future, response))
+        else:
+            future.set_result(response)
+        return future
+
+    def release(self):
+        for future, response in self.held:
+            future.set_result(response)
+        self.held = []
+
+
+class QueryCacheTestCase(TestCase):
+    def test_key_is_canonical(self):
+        cache = QueryCache()
+        eq_(
+            cache.key('c', {'q': '*:*', 'rows': 10}, 'json'),
+            cache.key('c', {'rows': 10, 'q': '*:*'}, 'json'),
+        )
+        ok_(cache.key('c', {'q': 'a'}, 'json') != cache.key('c', {'q': 'a'}, 'xml'))
+
+    def test_lru_entries(self):
+        cache = QueryCache(max_entries=2)
+        cache.put(('c', 'a'), 1)
+        cache.put(('c', 'b'), 2)
+        eq_(1, cache.get(('c', 'a')))
+        cache.put(('c', 'c'), 3)
+        eq_(None, cache.get(('c', 'b')))
+        eq_(1, cache.get(('c', 'a')))
+        eq_(3, cache.get(('c', 'c')))
+        eq_(1, cache.stats['evictions'])
+        eq_(3, cache.stats['hits'])
+        eq_(1, cache.stats['misses'])
+
+    def test_lru_bytes(self):
+        cache = QueryCache(max_bytes=100)
+        cache.put(('c', 'a'), 1, nbytes=60)
+        cache.put(('c', 'b'), 2, nbytes=60)
+        eq_(None, cache.get(('c', 'a')))
+        eq_(60, cache.nbytes)
+        cache.put(('c', 'big'), 3, nbytes=101)
+        eq_(None, cache.get(('c', 'big')))
+        eq_(1, len(cache))
+
+    def test_ttl(self):
+        clock = Clock()
+        cache = QueryCache(ttl=10, clock=clock)
+        cache.put(('c', 'a'), 1)
+        clock.now += 9
+        eq_(1, cache.get(('c', 'a')))
+        clock.now += 1
+        eq_(None, cache.get(('c', 'a')))
+        eq_(1, cache.stats['expired'])
+        eq_(0, len(cache))
+
+    def test_invalidate(self):
+        cache = QueryCache()
+        cache.put(('a', 'q'), 1)
+        cache.put(('b', 'q'), 2)
+        generation = cache.generation('a')
+        cache.invalidate('a')
+        eq_(None, cache.get(('a', 'q')))
+        eq_(2, cache.get(('b', 'q')))
+
+        cache.put(('a', 'q'), 1, generation=generation)
+        eq_(None, cache.get(('a', 'q')))
+
+        generation = cache.generation('b')
+        cache.invalidate()
+        eq_(0, len(cache))
+        cache.put(('b', 'q'), 2, generation=generation)
+        eq_(0, len(cache))
+
+
+class ClientCacheTestCase(AsyncTestCase):
+    def setUp(self):
+        super(ClientCacheTestCase, self).setUp()
+        self.cache  = QueryCache()
+        self.client = make_client(
+            FakeSolr(), codec='json', ioloop=self.io_loop, cache=self.cache
+        )
+
+    @gen_test
+    def test_hit(self):
+        first  = yield self.client.query('c', {'q': '*:*', 'rows': 1})
+        second = yield self.client.query('c', {'rows': 1, 'q': '*:*'})
+        eq_(1, len(self.client.client.requests))
+        ok_(first is second)
+        eq_(1, self.cache.stats['hits'])
+
+        yield self.client.query('c', {'q': '*:*'}, req_kwargs={'request_timeout': 1})
+        eq_(2, len(self.client.client.requests))
+
+    @gen_test
+    def test_update_invalidates(self):
+        yield self.client.query('c', {'q': '*:*'})
+        yield self.client.query('other', {'q': '*:*'})
+
+        update = self.client.delete('c', '1')
+        eq_(1, len(self.cache))
+
+        # results cached while the update is in flight are dropped when it
+        # completes
+        res = yield self.client.query('c', {'q': '*:*'})
+        eq_(4, res.num_found)
+        eq_(2, len(self.cache))
+        self.client.client.release()
+        yield update
+        eq_(1, len(self.cache))
+
+        res = yield self.client.query('c', {'q': '*:*'})
+        eq_(5, res.num_found)
+        res = yield self.client.query('c', {'q': '*:*'})
+        eq_(5, res.num_found)
+
+    @gen_test
+    def test_commit_within(self):
+        update = self.client.update_json(
+            'c', {'add': {'doc': {'id': '1'}, 'commitWithin': 50}}
+        )
+        self.client.client.release()
+        yield update
+        yield self.client.query('c', {'q': '*:*'})
+        eq_(1, len(self.cache))
+
+        yield gen.sleep(0.1)
+        eq_(0, len(self.cache))
+
+
+
+class FakeRealTimeGet(object):
+    """
+    Answers real-time gets for ``n`` documents, in reverse id order like a
+    distributed get may, searches with the ids in ``hits`` and acknowledges
+    updates.
+    """
+
+    def __init__(self, n=10, hits=()):
+        self.docs     = dict((str(i), {'id': str(i), 'n': i}) for i in range(n))
+        self.hits     = hits
+        self.requests = []
+
+    def fetch(self, request, raise_error=True):
+        self.requests.append(request)
+        params = parse_qsl(urlsplit(request.url).query)
+        ids    = [v for k, v in params if k == 'id']
+        docs   = [self.docs[i] for i in reversed(ids) if i in self.docs]
+        if '/update' in request.url:
+            body = {'responseHeader': {'status': 0}}
+        elif '/query' in request.url:
+            body = {
+                'responseHeader': {'status': 0},
+                'response': {
+                    'numFound': len(self.hits),
+                    'start':    0,
+                    'docs':     [
+                        {'id': i, 'score': 1.0 / (n + 1)}
+                        for n, i in enumerate(self.hits)
+                    ],
+                },
+            }
+        elif len(ids) == 1:
+            body = {'doc': docs[0] if docs else None}
+        else:
+            body = {'response': {'numFound': len(docs), 'start': 0, 'docs': docs}}
+        future = Future()
+        future.set_result(HTTPResponse(
+            request, 200, buffer=BytesIO(json.dumps(body).encode('utf8'))
+        ))
+        return future
+
+
+class DocumentCacheTestCase(TestCase):
+    def test_invalidate_ids(self):
+        cache = DocumentCache()
+        cache.put(cache.key('c', 1), {'id': '1'})
+        cache.put(cache.key('c', '2'), {'id': '2'})
+        eq_({'id': '1'}, cache.get(cache.key('c', '1')))
+
+        generation = cache.generation('c')
+        cache.invalidate('c', ['1'])
+        eq_(None, cache.get(cache.key('c', '1')))
+        eq_({'id': '2'}, cache.get(cache.key('c', '2')))
+        cache.put(cache.key('c', '1'), {'id': '1'}, generation=generation)
+        eq_(1, len(cache))
+
+        cache.invalidate('c')
+        eq_(0, len(cache))
+
+
+class GetManyTestCase(AsyncTestCase):
+    @gen_test
+    def test_order_and_chunks(self):
+        client = make_client(FakeRealTimeGet(100), codec='json', ioloop=self.io_loop)
+        ids    = [str(i) for i in range(99, -1, -1)] + ['missing', '5']
+        docs   = yield client.get_many('c', ids, max_url=200)
+        eq_(ids[:100], [doc['id'] for doc in docs[:100]])
+        eq_(None, docs[100])
+        eq_({'id': '5', 'n': 5}, docs[101])
+
+        requests = client.client.requests
+        ok_(len(requests) > 1)
+        for request in requests:
+            ok_(request.url.startswith('http://localhost:8983/solr/c/get?'))
+            ok_(len(request.url) <= 200)
+
+        docs = yield client.get_many('c', ['3'], fl='n')
+        eq_([{'id': '3', 'n': 3}], docs)
+        ok_('fl=n%2Cid' in client.client.requests[-1].url)
+
+        docs = yield client.get_many('c', [])
+        eq_([], docs)
+
+    @gen_test
+    def test_cache(self):
+        cache  = DocumentCache()
+        client = make_client(
+            FakeRealTimeGet(), codec='json', ioloop=self.io_loop, doc_cache=cache
+        )
+        yield client.get_many('c', ['1', '2'])
+        docs = yield client.get_many('c', ['2', '1', '3'])
+        eq_(['2', '1', '3'], [doc['id'] for doc in docs])
+        eq_(2, len(client.client.requests))
+        ok_('id=3' in client.client.requests[-1].url)
+        ok_('id=1' not in client.client.requests[-1].url)
+
+        yield client.add_json_documents('c', [{'id': '1', 'n': 0}])
+        eq_(None, cache.get(cache.key('c', '1')))
+        ok_(cache.get(cache.key('c', '2')) is not None)
+
+        yield client.delete('c', ['2'])
+        eq_(None, cache.get(cache.key('c', '2')))
+        ok_(cache.get(cache.key('c', '3')) is not None)
+
+        yield client.delete('c', [{'query': 'n:3'}])
+        eq_(0, len(cache))
+
+        yield client.get_many('c', ['4'], fl='id')
+        eq_(0, len(cache))
+
+
+class HydrateTestCase(AsyncTestCase):
+    @gen_test
+    def test_hydrate(self):
+        cache  = DocumentCache()
+        client = make_client(
+            FakeRealTimeGet(hits=['3', '1', 'gone', '2']),
+            codec     = 'json',
+            ioloop    = self.io_loop,
+            doc_cache = cache,
+        )
+        yield client.get_many('c', ['1'])
+
+        res = yield client.query('c', {'q': 'x', 'fl': '*'}, hydrate=True)
+        query, get = client.client.requests[1:]
+        ok_('fl=id%2Cscore' in query.url)
+        ok_('id=1' not in get.url)
+        eq_(['3', '1', '2'], [doc['id'] for doc in res])
+        eq_({'id': '1', 'n': 1, 'score': 0.5}, res[1])
+        eq_(4, res.num_found)
+
+        # the user's fl is used for the documents, without the cache
+        res = yield client.query('c', {'q': 'x', 'fl': 'id'}, hydrate=True)
+        ok_('fl=id&' in client.client.requests[-1].url)
+        eq_('3', res[0]['id'])
+
+    @gen_test
+    def test_query_cache(self):
+        client = make_client(
+            FakeRealTimeGet(hits=['1']),
+            codec  = 'json',
+            ioloop = self.io_loop,
+            cache  = QueryCache(),
+        )
+        first  = yield client.query('c', {'q': 'x'}, hydrate=True)
+        second = yield client.query('c', {'q': 'x'}, hydrate=True)
+        ok_(first is second)
+        eq_(2, len(client.client.requests))
+
+        res = yield client.query('c', {'q': 'x'})
+        eq_(3, len(client.client.requests))
+        eq_({'id': '1', 'score': 1.0}, res[0])
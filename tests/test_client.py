@@ -1,9 +1,17 @@
 import json
-from functools import partial
+import zlib
 from nose.tools import ok_, eq_, nottest
-from solnado import SolrClient
-from tornado import gen
-from tornado.testing import AsyncTestCase, gen_test
+from solnado import QueryCache, RetryPolicy, SolrClient
+from solnado.client import SolrConfigurationError, iter_json_chunks, json_request_body
+from tornado import gen, web
+from tornado.simple_httpclient import SimpleAsyncHTTPClient
+from tornado.testing import AsyncHTTPTestCase, AsyncTestCase, gen_test
+from unittest import TestCase
+
+from fakes import (
+    DelayedHTTPClient, FakeHTTPClient, HeldHTTPClient, ScriptedHTTPClient,
+    make_client, params
+)
 
 
 class ClientTestCase(AsyncTestCase):
@@ -20,60 +28,58 @@ class ClientTestCase(AsyncTestCase):
 
     @gen_test(timeout=30)
     def test_create_collection(self):
-        p = partial(self.client.create_collection, 'fox', **{'collection_kwargs':{'numShards':1}})
-        res = yield gen.Task(p)
+        res = yield self.client.create_collection('fox', **{'collection_kwargs':{'numShards':1}})
         eq_(200, res.code)
-        p = partial(self.client.delete_collection, 'fox')
-        yield gen.Task(p)
+        yield self.client.delete_collection('fox')
 
     @gen_test(timeout=30)
     def test_core_status(self):
-        res = yield gen.Task(partial(self.client.core_status))
+        res = yield self.client.core_status()
         ok_(json.loads(res.body.decode('utf8')))
         eq_(200, res.code)
 
     @gen_test(timeout=30)
     def test_core_create(self):
-        yield gen.Task(partial(self.client.core_unload, 'test_core'))
-        res = yield gen.Task(partial(self.client.core_create, 'test_core'))
+        yield self.client.core_unload('test_core')
+        res = yield self.client.core_create('test_core')
         ok_(json.loads(res.body.decode('utf8')))
         eq_(200, res.code)
 
-        yield gen.Task(partial(self.client.core_unload, 'test_core'))
-        yield gen.Task(partial(self.client.core_reload, 'test_core'))
+        yield self.client.core_unload('test_core')
+        yield self.client.core_reload('test_core')
 
     @gen_test(timeout=30)
     def test_core_reload(self):
-        yield gen.Task(partial(self.client.core_create, 't'))
-        res = yield gen.Task(partial(self.client.core_reload, 't'))
+        yield self.client.core_create('t')
+        res = yield self.client.core_reload('t')
 
         ok_(json.loads(res.body.decode('utf8')))
         eq_(200, res.code)
 
-        unload = yield gen.Task(partial(self.client.core_unload, 't'))
+        unload = yield self.client.core_unload('t')
         eq_(200, unload.code)
-        yield gen.Task(partial(self.client.core_reload, 't'))
+        yield self.client.core_reload('t')
 
     #@gen_test(timeout=25)
     #def test_core_rename(self):
-    #    yield gen.Task(partial(self.client.core_create, 'baz'))
-    #    yield gen.Task(partial(self.client.core_reload, 'baz'))
+    #    yield self.client.core_create('baz')
+    #    yield self.client.core_reload('baz')
 
-    #    res = yield gen.Task(partial(self.client.core_rename, 'baz', 'qux'))
+    #    res = yield self.client.core_rename('baz', 'qux')
     #    eq_(200, res.code)
 
-    #    yield gen.Task(partial(self.client.core_reload, 'baz'))
-    #    yield gen.Task(partial(self.client.core_reload, 'qux'))
-    #    yield gen.Task(partial(self.client.core_unload, 'qux'))
-    #    yield gen.Task(partial(self.client.core_reload, 'qux'))
+    #    yield self.client.core_reload('baz')
+    #    yield self.client.core_reload('qux')
+    #    yield self.client.core_unload('qux')
+    #    yield self.client.core_reload('qux')
 
     @gen_test(timeout=30)
     def test_add_json_document(self):
         d = {"id":"123", "title":"test_add"}
-        yield gen.Task(partial(self.client.core_create, 'add_j'))
-        yield gen.Task(partial(self.client.core_reload, 'add_j'))
+        yield self.client.core_create('add_j')
+        yield self.client.core_reload('add_j')
 
-        res = yield gen.Task(partial(self.client.add_json_document, 'add_j', d))
+        res = yield self.client.add_json_document('add_j', d)
 
         ok_(json.loads(res.body.decode('utf8')))
         eq_(200, res.code)
@@ -84,10 +90,10 @@ class ClientTestCase(AsyncTestCase):
             {"id":"123", "title":"test_add"},
             {"id":"456", "title":"bar_baz"},
         ]
-        yield gen.Task(partial(self.client.core_create, 'add_docs'))
-        yield gen.Task(partial(self.client.core_reload, 'add_docs'))
+        yield self.client.core_create('add_docs')
+        yield self.client.core_reload('add_docs')
 
-        res = yield gen.Task(partial(self.client.add_json_document, 'add_docs', d))
+        res = yield self.client.add_json_document('add_docs', d)
 
         eq_(200, res.code)
 
@@ -97,237 +103,703 @@ class ClientTestCase(AsyncTestCase):
             {"id":"123", "title":"test_add"},
             {"id":"456", "title":"bar_baz"},
         ]
-        yield gen.Task(partial(self.client.core_create, 'add_docs'))
-        yield gen.Task(partial(self.client.core_reload, 'add_docs'))
+        yield self.client.core_create('add_docs')
+        yield self.client.core_reload('add_docs')
 
-        yield gen.Task(partial(self.client.add_json_document, 'add_docs', d))
+        yield self.client.add_json_document('add_docs', d)
 
         q = {'q':'bar_baz'}
-        res = yield gen.Task(partial(self.client.query, 'add_docs', q))
+        res = yield self.client.query('add_docs', q)
         eq_(200, res.code)
 
     @gen_test(timeout=30)
     def test_delete(self):
-        yield gen.Task(partial(self.client.delete_collection, 'qux'))
-        yield gen.Task(partial(self.client.create_collection, 'qux'))
+        yield self.client.delete_collection('qux')
+        yield self.client.create_collection('qux')
         d = [
             {"id":"123", "title":"test_add"},
             {"id":"456", "title":"bar_baz"},
         ]
-        yield gen.Task(partial(self.client.add_json_document, 'add_docs', d))
-        res = yield gen.Task(partial(self.client.delete, 'qux', ['123']))
+        yield self.client.add_json_document('add_docs', d)
+        res = yield self.client.delete('qux', ['123'])
         eq_(200, res.code)
-        yield gen.Task(partial(self.client.delete_collection, 'qux'))
+        yield self.client.delete_collection('qux')
 
     @gen_test(timeout=30)
     def test_create_collection(self):
-        yield gen.Task(partial(self.client.delete_collection, 'qux'))
-        res = yield gen.Task(partial(self.client.create_collection, 'qux'))
+        yield self.client.delete_collection('qux')
+        res = yield self.client.create_collection('qux')
         eq_(200, res.code)
 
     @gen_test(timeout=30)
     def test_delete_collection(self):
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
-        yield gen.Task(partial(self.client.create_collection, 'bix'))
-        res = yield gen.Task(partial(self.client.delete_collection, 'bix'))
+        yield self.client.delete_collection('bix')
+        yield self.client.create_collection('bix')
+        res = yield self.client.delete_collection('bix')
         eq_(200, res.code)
 
     @gen_test(timeout=30)
     def test_reload_collection(self):
-        yield gen.Task(partial(self.client.create_collection, 'qux'))
-        res = yield gen.Task(partial(self.client.reload_collection, 'qux'))
+        yield self.client.create_collection('qux')
+        res = yield self.client.reload_collection('qux')
         eq_(200, res.code)
-        yield gen.Task(partial(self.client.delete_collection, 'qux'))
+        yield self.client.delete_collection('qux')
 
     @gen_test(timeout=30)
     def test_alias_collection(self):
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
-        yield gen.Task(partial(self.client.create_collection, 'bix'))
-        res = yield gen.Task(partial(self.client.alias_collection, ['bix'], 'quix'))
+        yield self.client.delete_collection('bix')
+        yield self.client.create_collection('bix')
+        res = yield self.client.alias_collection(['bix'], 'quix')
         eq_(200, res.code)
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
+        yield self.client.delete_collection('bix')
 
     @gen_test(timeout=30)
     def test_delete_alias_collection(self):
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
-        yield gen.Task(partial(self.client.create_collection, 'bix'))
-        yield gen.Task(partial(self.client.alias_collection, ['bix'], 'quix'))
-        res = yield gen.Task(partial(self.client.delete_alias_collection, 'quix'))
+        yield self.client.delete_collection('bix')
+        yield self.client.create_collection('bix')
+        yield self.client.alias_collection(['bix'], 'quix')
+        res = yield self.client.delete_alias_collection('quix')
         eq_(200, res.code)
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
+        yield self.client.delete_collection('bix')
 
     @gen_test(timeout=30)
     def test_add_field(self):
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
-        yield gen.Task(partial(self.client.create_collection, 'bix'))
-        res = yield gen.Task(partial(self.client.add_field, 'bix', 'stamp', 'tdate'))
+        yield self.client.delete_collection('bix')
+        yield self.client.create_collection('bix')
+        res = yield self.client.add_field('bix', 'stamp', 'tdate')
         eq_(200, res.code)
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
+        yield self.client.delete_collection('bix')
 
     @gen_test(timeout=30)
     def test_delete_field(self):
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
-        yield gen.Task(partial(self.client.create_collection, 'bix'))
-        yield gen.Task(partial(self.client.add_field, 'bix', 'stamp', 'tdate'))
-        res = yield gen.Task(partial(self.client.delete_field, 'bix', 'stamp'))
+        yield self.client.delete_collection('bix')
+        yield self.client.create_collection('bix')
+        yield self.client.add_field('bix', 'stamp', 'tdate')
+        res = yield self.client.delete_field('bix', 'stamp')
         eq_(200, res.code)
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
+        yield self.client.delete_collection('bix')
 
     @gen_test(timeout=30)
     def test_replace_field(self):
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
-        yield gen.Task(partial(self.client.create_collection, 'bix'))
-        yield gen.Task(partial(self.client.add_field, 'bix', 'stamp', 'tdate'))
-        res = yield gen.Task(partial(
-            self.client.replace_field, 'bix', 'stamp',
-            field_kwargs = {'type':'date'}
-        ))
+        yield self.client.delete_collection('bix')
+        yield self.client.create_collection('bix')
+        yield self.client.add_field('bix', 'stamp', 'tdate')
+        res = yield self.client.replace_field('bix', 'stamp',
+            field_kwargs = {'type':'date'})
         eq_(200, res.code)
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
+        yield self.client.delete_collection('bix')
 
     @gen_test(timeout=30)
     def test_add_dynamic_field(self):
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
-        yield gen.Task(partial(self.client.create_collection, 'bix'))
-        res = yield gen.Task(
-            partial(self.client.add_dynamic_field, 'bix', '*_s', 'string')
-        )
+        yield self.client.delete_collection('bix')
+        yield self.client.create_collection('bix')
+        res = yield self.client.add_dynamic_field('bix', '*_s', 'string')
         eq_(200, res.code)
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
+        yield self.client.delete_collection('bix')
 
     @gen_test(timeout=30)
     def test_replace_field_type(self):
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
-        yield gen.Task(partial(self.client.create_collection, 'bix'))
-        yield gen.Task(partial(self.client.add_field, 'bix', 'stamp', 'tdate'))
-        res = yield gen.Task(partial(
-            self.client.replace_field_type, 'bix', 'stamp',
-            field_kwargs = {'type':'date'}
-        ))
+        yield self.client.delete_collection('bix')
+        yield self.client.create_collection('bix')
+        yield self.client.add_field('bix', 'stamp', 'tdate')
+        res = yield self.client.replace_field_type('bix', 'stamp',
+            field_kwargs = {'type':'date'})
         eq_(200, res.code)
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
+        yield self.client.delete_collection('bix')
 
     @gen_test(timeout=30)
     def test_add_copy_field(self):
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
-        yield gen.Task(partial(self.client.create_collection, 'bix'))
-        yield gen.Task(partial(self.client.add_field, 'bix', 'stamp', 'tdate'))
-        res = yield gen.Task(partial(
-            self.client.add_copy_field, 'bix', 'stamp', 'Stamp',
-        ))
+        yield self.client.delete_collection('bix')
+        yield self.client.create_collection('bix')
+        yield self.client.add_field('bix', 'stamp', 'tdate')
+        res = yield self.client.add_copy_field('bix', 'stamp', 'Stamp')
         eq_(200, res.code)
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
+        yield self.client.delete_collection('bix')
 
     @gen_test(timeout=30)
     def test_delete_copy_field(self):
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
-        yield gen.Task(partial(self.client.create_collection, 'bix'))
-        yield gen.Task(partial(self.client.add_field, 'bix', 'stamp', 'tdate'))
-        yield gen.Task(partial(
-            self.client.add_copy_field, 'bix', 'stamp', 'Stamp',
-        ))
-        res = yield gen.Task(partial(
-            self.client.delete_copy_field, 'bix', 'stamp', 'Stamp',
-        ))
+        yield self.client.delete_collection('bix')
+        yield self.client.create_collection('bix')
+        yield self.client.add_field('bix', 'stamp', 'tdate')
+        yield self.client.add_copy_field('bix', 'stamp', 'Stamp')
+        res = yield self.client.delete_copy_field('bix', 'stamp', 'Stamp')
         eq_(200, res.code)
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
+        yield self.client.delete_collection('bix')
 
     @gen_test(timeout=30)
     def test_schema(self):
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
-        yield gen.Task(partial(self.client.create_collection, 'bix'))
-        res = yield gen.Task(partial(
-            self.client.schema, 'bix'
-        ))
+        yield self.client.delete_collection('bix')
+        yield self.client.create_collection('bix')
+        res = yield self.client.schema('bix')
         eq_(200, res.code)
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
+        yield self.client.delete_collection('bix')
 
     @gen_test(timeout=30)
     def test_schema_fields(self):
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
-        yield gen.Task(partial(self.client.create_collection, 'bix'))
-        res = yield gen.Task(partial(
-            self.client.schema_fields, 'bix'
-        ))
+        yield self.client.delete_collection('bix')
+        yield self.client.create_collection('bix')
+        res = yield self.client.schema_fields('bix')
         eq_(200, res.code)
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
+        yield self.client.delete_collection('bix')
 
     @gen_test(timeout=30)
     def test_schema_dynamic_fields(self):
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
-        yield gen.Task(partial(self.client.create_collection, 'bix'))
-        res = yield gen.Task(partial(
-            self.client.schema_dynamic_fields, 'bix'
-        ))
+        yield self.client.delete_collection('bix')
+        yield self.client.create_collection('bix')
+        res = yield self.client.schema_dynamic_fields('bix')
         eq_(200, res.code)
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
+        yield self.client.delete_collection('bix')
 
     @gen_test(timeout=30)
     def test_schema_field_types(self):
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
-        yield gen.Task(partial(self.client.create_collection, 'bix'))
-        res = yield gen.Task(partial(
-            self.client.schema_field_types, 'bix'
-        ))
+        yield self.client.delete_collection('bix')
+        yield self.client.create_collection('bix')
+        res = yield self.client.schema_field_types('bix')
         eq_(200, res.code)
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
+        yield self.client.delete_collection('bix')
 
     @gen_test(timeout=30)
     def test_schema_copy_fields(self):
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
-        yield gen.Task(partial(self.client.create_collection, 'bix'))
-        res = yield gen.Task(partial(
-            self.client.schema_copy_fields, 'bix'
-        ))
+        yield self.client.delete_collection('bix')
+        yield self.client.create_collection('bix')
+        res = yield self.client.schema_copy_fields('bix')
         eq_(200, res.code)
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
+        yield self.client.delete_collection('bix')
 
     @gen_test(timeout=30)
     def test_schema_name(self):
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
-        yield gen.Task(partial(self.client.create_collection, 'bix'))
-        res = yield gen.Task(partial(
-            self.client.schema_name, 'bix'
-        ))
+        yield self.client.delete_collection('bix')
+        yield self.client.create_collection('bix')
+        res = yield self.client.schema_name('bix')
         eq_(200, res.code)
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
+        yield self.client.delete_collection('bix')
 
     @gen_test(timeout=30)
     def test_schema_version(self):
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
-        yield gen.Task(partial(self.client.create_collection, 'bix'))
-        res = yield gen.Task(partial(
-            self.client.schema_version, 'bix'
-        ))
+        yield self.client.delete_collection('bix')
+        yield self.client.create_collection('bix')
+        res = yield self.client.schema_version('bix')
         eq_(200, res.code)
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
+        yield self.client.delete_collection('bix')
 
     @gen_test(timeout=30)
     def test_schema_unique_key(self):
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
-        yield gen.Task(partial(self.client.create_collection, 'bix'))
-        res = yield gen.Task(partial(
-            self.client.schema_unique_key, 'bix'
-        ))
+        yield self.client.delete_collection('bix')
+        yield self.client.create_collection('bix')
+        res = yield self.client.schema_unique_key('bix')
         eq_(200, res.code)
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
+        yield self.client.delete_collection('bix')
 
     @gen_test(timeout=30)
     def test_schema_similarity(self):
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
-        yield gen.Task(partial(self.client.create_collection, 'bix'))
-        res = yield gen.Task(partial(
-            self.client.schema_similarity, 'bix'
-        ))
+        yield self.client.delete_collection('bix')
+        yield self.client.create_collection('bix')
+        res = yield self.client.schema_similarity('bix')
         eq_(200, res.code)
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
+        yield self.client.delete_collection('bix')
 
     @gen_test(timeout=30)
     def test_schema_default_operator(self):
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
-        yield gen.Task(partial(self.client.create_collection, 'bix'))
-        res = yield gen.Task(partial(
-            self.client.schema_default_operator, 'bix'
-        ))
+        yield self.client.delete_collection('bix')
+        yield self.client.create_collection('bix')
+        res = yield self.client.schema_default_operator('bix')
         eq_(200, res.code)
-        yield gen.Task(partial(self.client.delete_collection, 'bix'))
+        yield self.client.delete_collection('bix')
+
+class StreamingBodyTestCase(TestCase):
+    def test_iter_json_chunks(self):
+        docs = [{'id': str(i)} for i in range(100)]
+        chunks = list(iter_json_chunks(docs, chunk_size=64))
+        ok_(len(chunks) > 1)
+        eq_(docs, json.loads(b''.join(chunks).decode('utf8')))
+
+    def test_iter_json_chunks_empty(self):
+        eq_(b'[]', b''.join(iter_json_chunks([])))
+
+    def test_iter_json_chunks_jsonl(self):
+        docs = [{'id': str(i)} for i in range(10)]
+        body = b''.join(iter_json_chunks(docs, fmt='jsonl', chunk_size=16))
+        lines = body.decode('utf8').splitlines()
+        eq_(docs, [json.loads(l) for l in lines])
+
+    def test_iter_json_chunks_lazy(self):
+        consumed = []
+        def gen_docs():
+            for i in range(1000):
+                consumed.append(i)
+                yield {'id': str(i)}
+        chunks = iter_json_chunks(gen_docs(), chunk_size=64)
+        next(chunks)
+        ok_(len(consumed) < 10)
+
+
+def decode_pairs(body):
+    return json.loads(body.decode('utf8'), object_pairs_hook=list)
+
+
+class UpdateBodyTestCase(AsyncTestCase):
+    def setUp(self):
+        super(UpdateBodyTestCase, self).setUp()
+        self.client = make_client(
+            FakeHTTPClient(), codec='json', ioloop=self.io_loop
+        )
+
+    def test_add_json_document(self):
+        self.client.add_json_document('c', {'id': '1'})
+        body = json.loads(self.client.client.requests[0].body.decode('utf8'))
+        eq_({'id': '1'}, body['add']['doc'])
+
+    def test_add_json_documents(self):
+        self.client.add_json_documents('c', [{'id': '1'}], commitWithin=500)
+        eq_(['500'], params(self.client.client.requests[0])['commitWithin'])
+        self.client.add_json_documents('c', [{'id': '1'}], commitWithin=None)
+        ok_('commitWithin' not in params(self.client.client.requests[1]))
+
+    def test_delete(self):
+        self.client.delete('c', '1')
+        self.client.delete('c', ['1', '2'])
+        bodies = [
+            json.loads(r.body.decode('utf8'))
+            for r in self.client.client.requests
+        ]
+        eq_([{'delete': ['1']}, {'delete': ['1', '2']}], bodies)
+
+    def test_stream_update_timeout(self):
+        self.client.stream_update('c', iter([{'id': '1'}]))
+        self.client.stream_update(
+            'c', iter([{'id': '1'}]), req_kwargs={'request_timeout': 5}
+        )
+        self.client.request_timeout = 30
+        self.client.stream_update('c', iter([{'id': '1'}]))
+        eq_(
+            [0, 5, 30],
+            [r.request_timeout for r in self.client.client.requests],
+        )
+
+    def test_stream_update_curl(self):
+        # the curl client has no body_producer support
+        self.client.client._curls = []
+        self.assertRaises(
+            SolrConfigurationError, self.client.stream_update, 'c', iter([{'id': '1'}])
+        )
+        eq_([], self.client.client.requests)
+
+    def test_add_json_commands(self):
+        self.client.add_json_commands('c', [{'id': '1'}, {'id': '2'}])
+        pairs = decode_pairs(self.client.client.requests[0].body)
+        eq_(['add', 'add'], [k for k, _ in pairs])
+        eq_([[('id', '1')], [('id', '2')]], [dict(v)['doc'] for _, v in pairs])
+
+    @gen_test(timeout=5)
+    def test_add_window(self):
+        self.client.add_window = 0.01
+        seen = []
+        for i in range(3):
+            self.client.add_json_document('c', {'id': str(i)}, callback=seen.append)
+        eq_([], self.client.client.requests)
+        yield gen.sleep(0.05)
+        eq_(1, len(self.client.client.requests))
+        eq_(3, len(decode_pairs(self.client.client.requests[0].body)))
+        eq_(3, len(seen))
+
+    def test_add_window_max(self):
+        self.client.add_window = 60
+        self.client.add_window_max = 2
+        for i in range(4):
+            self.client.add_json_document('c', {'id': str(i)})
+        eq_(2, len(self.client.client.requests))
+
+
+class FutureAPITestCase(AsyncTestCase):
+    def setUp(self):
+        super(FutureAPITestCase, self).setUp()
+        self.client = make_client(
+            FakeHTTPClient(), codec='json', ioloop=self.io_loop
+        )
+
+    @gen_test(timeout=5)
+    def test_returns_future(self):
+        res = yield self.client.schema('c')
+        ok_(res.url.endswith('/solr/c/schema?indent=off&wt=json'))
+        res = yield self.client.add_json_documents('c', [{'id': '1'}])
+        eq_('POST', res.method)
+
+    @gen_test(timeout=5)
+    def test_callback(self):
+        seen = []
+        yield self.client.core_status(callback=seen.append)
+        yield gen.moment
+        eq_(1, len(seen))
+
+    @gen_test(timeout=5)
+    def test_callback_error(self):
+        self.client.client = FakeHTTPClient(error=IOError('refused'))
+        seen = []
+        future = self.client.core_status(callback=seen.append)
+        yield gen.moment
+        yield gen.moment
+        eq_(599, seen[0].code)
+        ok_(isinstance(future.exception(), IOError))
+
+
+class JSONRequestTestCase(AsyncTestCase):
+    def setUp(self):
+        super(JSONRequestTestCase, self).setUp()
+        self.client = make_client(
+            FakeHTTPClient(), codec='json', ioloop=self.io_loop
+        )
+
+    def test_json_request_body(self):
+        body = json_request_body({
+            'q':           'title:foo',
+            'fq':          'a:1',
+            'json.filter': ['b:2', 'c:3'],
+            'rows':        10,
+            'fl':          'id',
+            'json.facet':  {'x': {'type': 'terms', 'field': 'x'}},
+            'defType':     'edismax',
+        })
+        eq_('title:foo', body['query'])
+        eq_(['a:1', 'b:2', 'c:3'], body['filter'])
+        eq_(10, body['limit'])
+        eq_('id', body['fields'])
+        eq_('terms', body['facet']['x']['type'])
+        eq_({'defType': 'edismax'}, body['params'])
+
+    def test_json_request_body_classic_params(self):
+        fq   = ['a:1']
+        q    = {'q': '*:*', 'fq': fq, 'filter': 'b:2', 'facet': 'true',
+                'facet.field': 'cat', 'sort': 'id asc'}
+        body = json_request_body(q)
+        eq_(['a:1', 'b:2'], sorted(body['filter']))
+        eq_(['a:1'], fq)
+        eq_('id asc', body['sort'])
+        ok_('facet' not in body)
+        eq_({'facet': 'true', 'facet.field': 'cat'}, body['params'])
+
+        body = json_request_body({'facet': {'x': {'type': 'terms', 'field': 'x'}}})
+        eq_('terms', body['facet']['x']['type'])
+        eq_({'sort': ['a']}, json_request_body({'sort': ['a']})['params'])
+
+    @gen_test(timeout=5)
+    def test_query_get(self):
+        res = yield self.client.query('c', {'q': '*:*'})
+        eq_('GET', res.method)
+        ok_('q=%2A%3A%2A' in res.url)
+
+    @gen_test(timeout=5)
+    def test_query_post(self):
+        res = yield self.client.query('c', {'q': '*:*', 'rows': 5}, mode='post')
+        eq_('POST', res.method)
+        ok_(res.url.endswith('/solr/c/query?indent=off&wt=json'))
+        eq_({'query': '*:*', 'limit': 5}, json.loads(res.body.decode('utf8')))
+
+    @gen_test(timeout=5)
+    def test_query_auto(self):
+        res = yield self.client.query('c', {'q': 'x' * 4096})
+        eq_('POST', res.method)
+        res = yield self.client.query('c', {'q': '*:*', 'json.filter': ['a:1']})
+        eq_('POST', res.method)
+        res = yield self.client.query('c', {'q': 'x' * 4096}, mode='get')
+        eq_('GET', res.method)
+
+    def test_query_mode(self):
+        self.assertRaises(
+            SolrConfigurationError, self.client.query, 'c', {}, mode='put'
+        )
+
+
+class CoalesceTestCase(AsyncTestCase):
+    def setUp(self):
+        super(CoalesceTestCase, self).setUp()
+        self.client = make_client(
+            HeldHTTPClient(), codec='json', ioloop=self.io_loop
+        )
+
+    @gen_test(timeout=5)
+    def test_identical_reads(self):
+        futures = [self.client.schema_fields('c') for _ in range(5)]
+        futures.append(self.client.schema_fields('other'))
+        eq_(2, len(self.client.client.requests))
+        eq_(4, self.client.stats['coalesced'])
+
+        self.client.client.held.set_result('other')
+        res = yield futures[-1]
+        eq_('other', res)
+
+        self.client.schema_fields('c')
+        eq_(2, len(self.client.client.requests))
+
+    @gen_test(timeout=5)
+    def test_query_post_body(self):
+        self.client.query('c', {'q': 'a'}, mode='post')
+        self.client.query('c', {'q': 'a'}, mode='post')
+        self.client.query('c', {'q': 'b'}, mode='post')
+        eq_(2, len(self.client.client.requests))
+
+    @gen_test(timeout=5)
+    def test_writes_not_coalesced(self):
+        self.client.delete('c', '1')
+        self.client.delete('c', '1')
+        eq_(2, len(self.client.client.requests))
+
+    @gen_test(timeout=5)
+    def test_disabled(self):
+        self.client.coalesce = False
+        self.client.core_status()
+        self.client.core_status()
+        eq_(2, len(self.client.client.requests))
+        eq_(0, self.client.stats['coalesced'])
+
+
+def delay_of(res):
+    return float(params(res)['delay'][0])
+
+
+class QueryManyTestCase(AsyncTestCase):
+    def setUp(self):
+        super(QueryManyTestCase, self).setUp()
+        self.client = make_client(
+            DelayedHTTPClient(self.io_loop), codec='json', ioloop=self.io_loop
+        )
+
+    @gen_test(timeout=5)
+    def test_in_order(self):
+        delays  = [0.03, 0.01, 0.02, 0.0, 0.01, 0.02]
+        results = yield self.client.query_many(
+            [('c', {'q': '*:*', 'delay': d}) for d in delays],
+            concurrency = 2,
+        )
+        eq_(delays, [delay_of(r) for r in results])
+        eq_(2, self.client.client.peak)
+
+    @gen_test(timeout=5)
+    def test_timeout(self):
+        results = yield self.client.query_many(
+            [
+                ('c', {'q': '*:*', 'delay': 0.5}),
+                ('c', {'q': '*:*', 'delay': 0.0}, {'mode': 'get'}),
+            ],
+            timeout = 0.05,
+        )
+        ok_(isinstance(results[0], gen.TimeoutError))
+        eq_(0.0, delay_of(results[1]))
+
+    @gen_test(timeout=5)
+    def test_request_timeout(self):
+        results = yield self.client.query_many(
+            [
+                ('c', {'q': '*:*', 'delay': 0.1}, {'timeout': 1}),
+                ('c', {'q': '*:*', 'delay': 0.5}, {'timeout': 0.05}),
+            ],
+            timeout = 0.05,
+        )
+        eq_(0.1, delay_of(results[0]))
+        ok_(isinstance(results[1], gen.TimeoutError))
+
+    @gen_test(timeout=5)
+    def test_as_completed(self):
+        delays = [0.03, 0.0, 0.01]
+        it = self.client.query_many(
+            [('c', {'q': '*:*', 'delay': d}) for d in delays],
+            as_completed = True,
+        )
+        order = []
+        while not it.done():
+            res = yield it.next()
+            eq_(delays[it.current_index], delay_of(res))
+            order.append(it.current_index)
+        eq_([1, 2, 0], order)
+
+
+def time_allowed(request):
+    return int(params(request)['timeAllowed'][0])
+
+
+class DeadlineTestCase(AsyncTestCase):
+    @gen_test(timeout=5)
+    def test_query_timeout(self):
+        client = make_client(ScriptedHTTPClient(), ioloop=self.io_loop)
+        yield client.query('c', {'q': '*:*'}, timeout=2)
+        request = client.client.requests[0]
+        ok_(1900 < time_allowed(request) <= 2000)
+        ok_(request.request_timeout <= 2)
+        ok_(request.connect_timeout <= 2)
+
+        yield client.query('c', {'q': '*:*', 'timeAllowed': 50}, timeout=2)
+        eq_(50, time_allowed(client.client.requests[1]))
+
+        yield client.query('c', {'q': '*:*', 'fq': ['a', 'b']}, timeout=2)
+        request = client.client.requests[2]
+        eq_('POST', request.method)
+        ok_(time_allowed(request) <= 2000)
+
+    @gen_test(timeout=5)
+    def test_expired(self):
+        client = make_client(ScriptedHTTPClient(), ioloop=self.io_loop)
+        res = yield client.query(
+            'c', {'q': '*:*'}, deadline=self.io_loop.time() - 1
+        )
+        eq_(599, res.code)
+        eq_([], client.client.requests)
+
+    @gen_test(timeout=5)
+    def test_retries(self):
+        client = make_client(
+            ScriptedHTTPClient(503, 503),
+            ioloop = self.io_loop,
+            retry  = RetryPolicy(backoff=0.05, budget=False),
+        )
+        client.retry.delay = lambda attempt: 0.05
+        yield client.query('c', {'q': '*:*'}, timeout=1)
+        first, second = client.client.urls[:2]
+        ok_(time_allowed(second) < time_allowed(first))
+
+        client = make_client(
+            ScriptedHTTPClient(503),
+            ioloop = self.io_loop,
+            retry  = RetryPolicy(budget=False),
+        )
+        client.retry.delay = lambda attempt: 1.0
+        res = yield client.query('c', {'q': '*:*'}, timeout=0.5)
+        eq_(503, res.code)
+        eq_(1, len(client.client.requests))
+
+    @gen_test(timeout=5)
+    def test_partial(self):
+        body = {
+            'responseHeader': {'status': 0, 'partialResults': True},
+            'response':       {'numFound': 0, 'start': 0, 'docs': []},
+        }
+        client = make_client(
+            ScriptedHTTPClient((200, body)), ioloop=self.io_loop, cache=QueryCache()
+        )
+        res = yield client.query('c', {'q': '*:*'}, timeout=1)
+        ok_(res.partial)
+        eq_(0, len(client.cache))
+
+        res = yield client.query('c', {'q': '*:*'})
+        ok_(not res.partial)
+        eq_(1, len(client.cache))
+
+    @gen_test(timeout=5)
+    def test_update_timeout(self):
+        client = make_client(
+            ScriptedHTTPClient(), ioloop=self.io_loop, add_window=10
+        )
+        yield client.add_json_document('c', {'id': '1'}, timeout=1)
+        yield client.delete('c', '1', timeout=1)
+        for request in client.client.requests:
+            ok_(request.request_timeout <= 1)
+            ok_('timeAllowed' not in request.url)
+
+
+class SlowHandler(web.RequestHandler):
+    @gen.coroutine
+    def get(self, collection):
+        yield gen.sleep(0.05)
+        self.finish({'collection': collection})
+
+
+class PoolTestCase(AsyncHTTPTestCase):
+    def get_app(self):
+        return web.Application([(r'/solr/(\w+)/schema', SlowHandler)])
+
+    def test_backend(self):
+        client = SolrClient(
+            http_backend    = 'simple',
+            max_clients     = 50,
+            connect_timeout = 2,
+            request_timeout = 3,
+        )
+        ok_(isinstance(client.client, SimpleAsyncHTTPClient))
+        eq_(50, client.pool_stats['max_clients'])
+        eq_(2, client.client.defaults['connect_timeout'])
+        eq_(3, client.client.defaults['request_timeout'])
+        self.assertRaises(SolrConfigurationError, SolrClient, http_backend='nope')
+
+    @gen_test(timeout=5)
+    def test_queue_depth(self):
+        client = SolrClient(
+            port        = self.get_http_port(),
+            max_clients = 1,
+            ioloop      = self.io_loop,
+        )
+        futures = [client.schema(c) for c in ('a', 'b', 'c')]
+        eq_({'active': 1, 'queued': 2, 'max_clients': 1}, client.pool_stats)
+
+        responses = yield futures
+        eq_([200] * 3, [r.code for r in responses])
+        eq_(0, client.pool_stats['queued'])
+
+    def test_unknown_backend(self):
+        client = make_client(FakeHTTPClient())
+        eq_({'active': 0, 'queued': 0, 'max_clients': None}, client.pool_stats)
+
+
+class InflatingUpdateHandler(web.RequestHandler):
+    def post(self, collection):
+        encoding = self.request.headers.get('Content-Encoding')
+        body     = self.request.body
+        if encoding:
+            body = zlib.decompress(body, 31 if encoding == 'gzip' else 15)
+        self.finish({
+            'encoding': encoding,
+            'sent':     len(self.request.body),
+            'docs':     len(json.loads(body.decode('utf8'))),
+            'accept':   self.request.headers.get('Accept-Encoding'),
+            'padding':  'x' * 2048,
+        })
+
+
+class CompressionTestCase(AsyncHTTPTestCase):
+    def get_app(self):
+        return web.Application(
+            [(r'/solr/(\w+)/update', InflatingUpdateHandler)],
+            compress_response = True,
+        )
+
+    def make_client(self, **kwargs):
+        return SolrClient(
+            port         = self.get_http_port(),
+            ioloop       = self.io_loop,
+            http_backend = 'simple',
+            **kwargs
+        )
+
+    def docs(self, n):
+        return [{'id': str(i), 'body_t': 'solr tornado ' * 20} for i in range(n)]
+
+    def test_config(self):
+        self.assertRaises(SolrConfigurationError, SolrClient, compress='br')
+        ok_(not self.make_client(compress_responses=False).client.defaults['decompress_response'])
+
+    @gen_test(timeout=5)
+    def test_threshold(self):
+        client = self.make_client(compress='gzip', compress_min_size=1024)
+        res = yield client.add_json_documents('c', self.docs(1))
+        eq_(None, json.loads(res.body)['encoding'])
+
+        res  = yield client.add_json_documents('c', self.docs(50))
+        body = json.loads(res.body)
+        eq_('gzip', body['encoding'])
+        eq_(50, body['docs'])
+        ok_(body['sent'] < len(client.codec.dumps(self.docs(50))) / 5)
+        eq_('gzip', body['accept'])
+        eq_('gzip', res.headers.get('X-Consumed-Content-Encoding'))
+
+    @gen_test(timeout=5)
+    def test_offload(self):
+        client = self.make_client(compress='deflate', compress_offload=4096)
+        res  = yield client.add_json_documents('c', self.docs(200))
+        body = json.loads(res.body)
+        eq_('deflate', body['encoding'])
+        eq_(200, body['docs'])
+
+    @gen_test(timeout=5)
+    def test_stream_update(self):
+        client = self.make_client(compress='gzip')
+        res  = yield client.stream_update('c', iter(self.docs(100)), chunk_size=512)
+        body = json.loads(res.body)
+        eq_('gzip', body['encoding'])
+        eq_(100, body['docs'])
@@ -0,0 +1,206 @@
+import copy
+import json
+from io import BytesIO
+from nose.tools import ok_, eq_
+from solnado.cache import QueryCache
+from solnado.cluster import ClusterState, SolrClusterError
+from tornado.concurrent import Future
+from tornado.httpclient import HTTPResponse
+from tornado.testing import AsyncTestCase, gen_test
+from unittest import TestCase
+
+from fakes import make_client
+
+
+def replica(core, node, state='active', leader=False):
+    r = {
+        'core':      core,
+        'base_url':  'http://%s/solr' % node,
+        'node_name': '%s_solr' % node,
+        'state':     state,
+    }
+    if leader:
+        r['leader'] = 'true'
+    return r
+
+
+STATUS = {
+    'cluster': {
+        'collections': {
+            'c': {
+                'znodeVersion': 3,
+                'router': {'name': 'compositeId'},
+                'shards': {
+                    'shard1': {
+                        'range': '80000000-ffffffff',
+                        'state': 'active',
+                        'replicas': {
+                            'core_node1': replica('c_shard1_replica1', 'n1:8983', leader=True),
+                            'core_node2': replica('c_shard1_replica2', 'n2:8983'),
+                        },
+                    },
+                    'shard2': {
+                        'range': '0-7fffffff',
+                        'state': 'active',
+                        'replicas': {
+                            'core_node3': replica('c_shard2_replica1', 'n3:8983', leader=True),
+                            'core_node4': replica('c_shard2_replica2', 'n2:8983', state='recovering'),
+                        },
+                    },
+                },
+            },
+            'd': {
+                'znodeVersion': 1,
+                'shards': {
+                    'shard1': {
+                        'range': '80000000-7fffffff',
+                        'replicas': {
+                            'core_node1': replica('d_shard1_replica1', 'n4:8983', leader=True),
+                        },
+                    },
+                },
+            },
+        },
+        'aliases':    {'current': 'c', 'both': 'c,d'},
+        'live_nodes': ['n1:8983_solr', 'n2:8983_solr', 'n3:8983_solr'],
+    },
+}
+
+
+class FakeClusterClient(object):
+    def __init__(self, status):
+        self.status   = status
+        self.requests = []
+
+    def fetch(self, request, raise_error=True):
+        self.requests.append(request)
+        code = 200
+        body = {'responseHeader': {'status': 0}}
+        if 'CLUSTERSTATUS' in request.url:
+            body = self.status
+            if 'collection=gone' in request.url:
+                code = 400
+        future = Future()
+        future.set_result(HTTPResponse(
+            request, code, buffer=BytesIO(json.dumps(body).encode('utf8'))
+        ))
+        return future
+
+
+class ClusterStateTestCase(TestCase):
+    def setUp(self):
+        self.state = ClusterState(None)
+        self.state.load(copy.deepcopy(STATUS))
+
+    def test_load(self):
+        eq_(['c', 'd'], sorted(self.state.collections))
+        c = self.state.collections['c']
+        eq_(3, c.version)
+        eq_(['shard1', 'shard2'], [s.name for s in c.shards])
+        eq_('c_shard1_replica1', c.shards[0].leader.core)
+
+    def test_resolve(self):
+        eq_(['c'], self.state.resolve('current'))
+        eq_(['c', 'd'], self.state.resolve('both'))
+        eq_(['x'], self.state.resolve('x'))
+        self.state.set_alias('loop', 'loop')
+        eq_(['loop'], self.state.resolve('loop'))
+
+    def test_active_replicas(self):
+        cores = [r.core for r in self.state.active_replicas('c')]
+        eq_(['c_shard1_replica1', 'c_shard1_replica2', 'c_shard2_replica1'], cores)
+        # d only lives on a node that is not live
+        eq_([], self.state.active_replicas('d'))
+        eq_(None, self.state.node_url('d'))
+
+    def test_node_url(self):
+        urls = [self.state.node_url('c') for _ in range(4)]
+        eq_(['http://n1:8983', 'http://n2:8983', 'http://n3:8983', 'http://n1:8983'], urls)
+
+    def test_router(self):
+        router = self.state.router('c')
+        eq_(
+            ['http://n1:8983/solr/c_shard1_replica1', 'http://n3:8983/solr/c_shard2_replica1'],
+            [s.leader_url for s in router.shards],
+        )
+        eq_([None], [s.leader_url for s in self.state.router('d').shards])
+        self.assertRaises(SolrClusterError, self.state.router, 'x')
+
+    def test_incremental(self):
+        c = self.state.collections['c']
+        status = copy.deepcopy(STATUS)
+        status['cluster']['collections']['d']['znodeVersion'] = 2
+        del status['cluster']['collections']['c']['shards']['shard2']
+        self.state.load(status)
+        ok_(c is self.state.collections['c'])
+        eq_(2, self.state.collections['d'].version)
+
+        del status['cluster']['collections']['d']
+        self.state.load(status)
+        eq_(['c'], list(self.state.collections))
+
+
+class ClusterRoutingTestCase(AsyncTestCase):
+    def setUp(self):
+        super(ClusterRoutingTestCase, self).setUp()
+        self.client = make_client(
+            FakeClusterClient(copy.deepcopy(STATUS)), codec='json', ioloop=self.io_loop
+        )
+        self.state = self.client.cluster = ClusterState(self.client)
+
+    @gen_test(timeout=5)
+    def test_refresh(self):
+        yield self.state.refresh()
+        eq_(['c', 'd'], sorted(self.state.collections))
+        eq_(2, self.state.stats['changed'])
+
+        self.state.collections['gone'] = self.state.collections['d']
+        yield self.state.refresh('gone')
+        ok_('gone' not in self.state.collections)
+
+    @gen_test(timeout=5)
+    def test_routing(self):
+        yield self.state.refresh()
+        requests = self.client.client.requests
+
+        yield self.client.query('current', {'q': '*:*'})
+        ok_(requests[-1].url.startswith('http://n1:8983/solr/c/query?'))
+
+        yield self.client.query('both', {'q': '*:*'})
+        ok_(requests[-1].url.startswith('http://n2:8983/solr/c/query?'))
+        ok_('collection=c%2Cd' in requests[-1].url)
+
+        yield self.client.add_json_documents('current', [{'id': '1'}])
+        ok_(requests[-1].url.startswith('http://n3:8983/solr/c/update?'))
+
+        self.client.stream_update('current', iter([{'id': '1'}]))
+        ok_(requests[-1].url.startswith('http://n1:8983/solr/c/update?'))
+
+        self.client.add_window = 0.01
+        yield self.client.add_json_document('current', {'id': '1'})
+        ok_(requests[-1].url.startswith('http://n2:8983/solr/c/update?'))
+
+        yield self.client.query('d', {'q': '*:*'})
+        ok_(requests[-1].url.startswith('http://localhost:8983/solr/d/query?'))
+
+    @gen_test(timeout=5)
+    def test_alias(self):
+        yield self.client.alias_collection('c,d', 'latest')
+        eq_(['c', 'd'], self.state.resolve('latest'))
+        yield self.client.delete_alias_collection('latest')
+        eq_(['latest'], self.state.resolve('latest'))
+
+    @gen_test(timeout=5)
+    def test_multi_collection_alias_not_cached(self):
+        yield self.state.refresh()
+        self.client.cache = QueryCache()
+        requests = self.client.client.requests
+
+        yield self.client.query('current', {'q': '*:*'})
+        yield self.client.query('both', {'q': '*:*'})
+        eq_(1, len(self.client.cache))
+
+        # writes to d would not drop it, so it always goes to Solr
+        sent = len(requests)
+        yield self.client.query('both', {'q': '*:*'})
+        eq_(sent + 1, len(requests))
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+from unittest import TestCase
+from nose.tools import ok_, eq_
+from solnado import SolrClient
+from solnado.codec import JSONCodec, available_codecs, get_codec
+
+
+DOC = {
+    'id':     'doc-1',
+    'title':  u'café ☃',
+    'price':  12.5,
+    'count':  3,
+    'tags':   ['a', 'b'],
+    'active': True,
+    'empty':  None,
+}
+
+
+class CodecTestCase(TestCase):
+    def test_round_trip(self):
+        for name in available_codecs():
+            codec = get_codec(name)
+            eq_(name, codec.name)
+            data = codec.dumps(DOC)
+            ok_(isinstance(data, bytes))
+            eq_(DOC, codec.loads(data))
+            eq_(DOC, codec.loads(data.decode('utf8')))
+
+    def test_default_is_fastest(self):
+        eq_(available_codecs()[0], get_codec().name)
+        ok_('json' in available_codecs())
+
+    def test_passthrough(self):
+        codec = JSONCodec()
+        ok_(get_codec(codec) is codec)
+
+    def test_unknown(self):
+        self.assertRaises(ValueError, get_codec, 'nope')
+
+    def test_client_codec(self):
+        eq_('json', SolrClient(codec='json').codec.name)
+
+        class Response(object):
+            body = b'{"responseHeader": {"status": 0}}'
+
+        eq_(0, SolrClient().decode(Response())['responseHeader']['status'])
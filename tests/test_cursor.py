@@ -0,0 +1,92 @@
+import json
+from io import BytesIO
+from nose.tools import ok_, eq_
+from solnado.cursor import Cursor, SolrCursorError, StopAsyncIteration, ensure_sort
+from solnado.results import QueryResult
+from tornado.concurrent import Future
+from tornado.httpclient import HTTPRequest, HTTPResponse
+from tornado.testing import AsyncTestCase, gen_test
+
+
+class FakeCursorClient(object):
+    def __init__(self, ndocs, cursor=True):
+        self.ids     = ['%04d' % i for i in range(ndocs)]
+        self.cursor  = cursor
+        self.queries = []
+
+    def query(self, collection, q, **kwargs):
+        self.queries.append(dict(q))
+        mark  = q['cursorMark']
+        start = 0 if mark == '*' else int(mark)
+        docs  = [{'id': i} for i in self.ids[start:start + q['rows']]]
+        body  = {
+            'responseHeader': {'status': 0},
+            'response': {'numFound': len(self.ids), 'start': 0, 'docs': docs},
+        }
+        if self.cursor:
+            body['nextCursorMark'] = str(start + len(docs)) if docs else mark
+        res = HTTPResponse(
+            HTTPRequest('http://localhost/solr/c/query'),
+            200,
+            buffer = BytesIO(json.dumps(body).encode('utf8')),
+        )
+        f = Future()
+        f.set_result(QueryResult(res))
+        return f
+
+
+class CursorTestCase(AsyncTestCase):
+    def test_ensure_sort(self):
+        eq_('id asc', ensure_sort(None, 'id'))
+        eq_('score desc,id asc', ensure_sort('score desc', 'id'))
+        eq_('id desc', ensure_sort('id desc', 'id'))
+
+    @gen_test(timeout=5)
+    def test_pages(self):
+        client = FakeCursorClient(25)
+        cursor = Cursor(client, 'c', {'q': '*:*', 'start': 10}, rows=10)
+        ids = []
+        while True:
+            doc = yield cursor.next()
+            if doc is None:
+                break
+            ids.append(doc['id'])
+        eq_(client.ids, ids)
+        eq_(25, cursor.num_found)
+        eq_('id asc', client.queries[0]['sort'])
+        ok_('start' not in client.queries[0])
+        eq_('*', client.queries[0]['cursorMark'])
+
+    @gen_test(timeout=5)
+    def test_prefetch(self):
+        client = FakeCursorClient(25)
+        cursor = Cursor(client, 'c', {'q': '*:*'}, rows=10)
+        yield cursor.next()
+        eq_(2, len(client.queries))
+
+        client = FakeCursorClient(25)
+        cursor = Cursor(client, 'c', {'q': '*:*'}, rows=10, prefetch=False)
+        yield cursor.next()
+        eq_(1, len(client.queries))
+
+    @gen_test(timeout=5)
+    def test_anext(self):
+        cursor = Cursor(FakeCursorClient(3), 'c', {'q': '*:*'}, rows=2)
+        ids = []
+        try:
+            while True:
+                doc = yield cursor.__anext__()
+                ids.append(doc['id'])
+        except StopAsyncIteration:
+            pass
+        eq_(['0000', '0001', '0002'], ids)
+
+    @gen_test(timeout=5)
+    def test_missing_cursor_mark(self):
+        cursor = Cursor(FakeCursorClient(3, cursor=False), 'c', {'q': '*:*'})
+        try:
+            yield cursor.next()
+        except SolrCursorError:
+            pass
+        else:
+            ok_(False)
@@ -0,0 +1,38 @@
+from nose.tools import eq_
+from solnado.expressions import (
+    Expr, count, inner_join, metric, parallel, rollup, search, top
+)
+from unittest import TestCase
+
+
+class ExpressionsTestCase(TestCase):
+    def test_expr(self):
+        eq_('f(a,b,n=3,q="x \\"y\\"",z=true)', str(Expr('f', 'a', 'b', n=3, q='x "y"', z=True)))
+        eq_('f(fl="a,b")', str(Expr('f', fl=['a', 'b'])))
+
+    def test_quote_raw_text(self):
+        eq_(u'f(q="name_s:caf\xe9")', u'%s' % Expr('f', q=u'name_s:caf\xe9'))
+        eq_('f(q="path_s:C\\\\dir")', str(Expr('f', q='path_s:C\\\\dir')))
+        eq_('f(q="a\\nb")', str(Expr('f', q='a\\nb')))
+
+    def test_search(self):
+        eq_(
+            'search(c,fl="id,a_s",q="a_s:x",qt="/export",sort="a_s asc")',
+            str(search('c', q='a_s:x', fl='id,a_s', sort='a_s asc')),
+        )
+
+    def test_rollup_top(self):
+        s = search('c', fl='a_s,b_i', sort='a_s asc')
+        eq_(
+            'top(rollup(%s,sum(b_i),count(*),over="a_s"),n=2,sort="sum(b_i) desc")' % s,
+            str(top(rollup(s, 'a_s', metric('sum', 'b_i'), count()), 2, 'sum(b_i) desc')),
+        )
+
+    def test_inner_join_parallel(self):
+        a = search('a', sort='id asc')
+        b = search('b', sort='id asc', partitionKeys='id')
+        eq_('innerJoin(%s,%s,on="id")' % (a, b), str(inner_join(a, b, 'id')))
+        eq_(
+            'parallel(c,%s,sort="id asc",workers=4)' % b,
+            str(parallel('c', b, 4, 'id asc')),
+        )
@@ -0,0 +1,109 @@
+from nose.tools import ok_, eq_
+from solnado.cluster import ClusterState
+from solnado.hedge import HedgePolicy
+from solnado.lb import LoadBalancedClient
+from solnado.retry import RetryBudget
+from tornado import gen
+from tornado.testing import AsyncTestCase, gen_test
+from unittest import TestCase
+
+from fakes import NodesHTTPClient, make_client
+
+
+class HedgePolicyTestCase(TestCase):
+    def test_delay(self):
+        eq_(0.2, HedgePolicy(delay=0.2).delay())
+
+        policy = HedgePolicy(percentile=90, min_samples=5, initial_delay=1)
+        for i in range(4):
+            policy.record(i / 10.0)
+        eq_(1, policy.delay())
+        for i in range(4, 11):
+            policy.record(i / 10.0)
+        eq_(0.9, policy.delay())
+
+    def test_budget(self):
+        policy = HedgePolicy(budget=RetryBudget(ratio=0, min_retries=1))
+        ok_(policy.allow())
+        ok_(not policy.allow())
+        ok_(HedgePolicy(budget=False).allow())
+
+
+class HedgingTestCase(AsyncTestCase):
+    def make_client(self, delays):
+        return make_client(
+            NodesHTTPClient(delays),
+            ['a:8983', 'b:8983'],
+            cls           = LoadBalancedClient,
+            ioloop        = self.io_loop,
+            ping_interval = None,
+            hedge         = HedgePolicy(delay=0.02),
+        )
+
+    @gen_test(timeout=5)
+    def test_hedge_wins(self):
+        client = self.make_client({'http://a:8983': 0.5})
+        res = yield client.query('c', {'q': '*:*'})
+        eq_(200, res.code)
+        eq_(['http://a:8983', 'http://b:8983'], client.client.nodes())
+        eq_(1, client.stats['hedges'])
+        eq_(1, client.stats['hedge_wins'])
+
+    @gen_test(timeout=5)
+    def test_fast_primary(self):
+        client = self.make_client({'http://b:8983': 0.5})
+        yield client.query('c', {'q': '*:*'})
+        yield gen.sleep(0.05)
+        eq_(['http://a:8983'], client.client.nodes())
+        eq_(0, client.stats['hedges'])
+        eq_(1, len(client.hedge.latencies))
+
+    @gen_test(timeout=5)
+    def test_primary_wins(self):
+        client = self.make_client({'http://a:8983': 0.04, 'http://b:8983': 0.5})
+        res = yield client.query('c', {'q': '*:*'})
+        ok_(res.request.url.startswith('http://a:8983'))
+        eq_(1, client.stats['hedges'])
+        eq_(0, client.stats['hedge_wins'])
+
+    @gen_test(timeout=5)
+    def test_budget(self):
+        client = self.make_client({'http://a:8983': 0.05})
+        client.hedge.budget = RetryBudget(ratio=0, min_retries=1)
+        yield client.query('c', {'q': '*:*'})
+        yield client.query('c', {'q': '*:*'})
+        eq_(1, client.stats['hedges'])
+
+    @gen_test(timeout=5)
+    def test_needs_replicas(self):
+        client = make_client(
+            NodesHTTPClient({'http://localhost:8983': 0.05}),
+            ioloop = self.io_loop,
+            hedge  = HedgePolicy(delay=0.01),
+        )
+        yield client.query('c', {'q': '*:*'})
+        eq_(1, len(client.client.requests))
+        eq_(0, client.stats['hedges'])
+
+    @gen_test(timeout=5)
+    def test_cluster(self):
+        client = make_client(
+            NodesHTTPClient({'http://n1:8983': 0.5}),
+            ioloop = self.io_loop,
+            hedge  = HedgePolicy(delay=0.01),
+        )
+        client.cluster = ClusterState(client)
+        client.cluster.load({'cluster': {
+            'collections': {'c': {'shards': {'shard1': {
+                'range':    '80000000-7fffffff',
+                'replicas': {
+                    'r1': {'core': 'c1', 'base_url': 'http://n1:8983/solr', 'state': 'active'},
+                    'r2': {'core': 'c2', 'base_url': 'http://n2:8983/solr', 'state': 'active'},
+                },
+            }}}},
+        }})
+        res = yield client.query('c', {'q': '*:*'})
+        eq_(['http://n1:8983', 'http://n2:8983'], client.client.nodes())
+        ok_(res.request.url.startswith('http://n2:8983/solr/c/query?'))
+        # the hedge did not move the rotation on
+        eq_('http://n2:8983', client.cluster.node_url('c'))
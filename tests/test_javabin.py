@@ -0,0 +1,140 @@
+from datetime import datetime
+from nose.tools import ok_, eq_
+from solnado.javabin import (
+    DocumentList, JavabinCodec, JavabinError, NamedList, dumps, loads,
+    update_request
+)
+from solnado.results import QueryResult
+from tornado.testing import AsyncTestCase, gen_test
+from unittest import TestCase
+
+from fakes import RecordingHTTPClient, make_client, response
+
+
+# {"responseHeader": {"status": 0}, "response": {"numFound": 1, "start": 0,
+#  "docs": [{"id": "1"}]}} as Solr writes it
+RESPONSE = (
+    b'\x02\xc2'
+    b'\xe0\x2eresponseHeader\xa1\xe0\x26status\x40'
+    b'\xe0\x28response\x0c\x84\x61\x60\x00\x01'
+    b'\x81\x0b\xa1\xe0\x22id\x211'
+)
+
+
+class JavabinTestCase(TestCase):
+    def test_solr_bytes(self):
+        eq_(
+            {
+                'responseHeader': {'status': 0},
+                'response': {
+                    'numFound': 1, 'start': 0, 'numFoundExact': True,
+                    'docs': [{'id': '1'}],
+                },
+            },
+            loads(RESPONSE),
+        )
+        eq_(300, loads(b'\x02\x5c\x12'))
+        eq_(-1, loads(b'\x02\x06\xff\xff\xff\xff'))
+
+    def test_scalars(self):
+        values = [
+            None, True, False, 0, 14, 15, 300, -5, 2 ** 31, 2 ** 60, -2 ** 40,
+            1.25, u'caf\xe9', 'x' * 40, b'\x00\xff', [1, [2, 'a']],
+            {'set': 'x', 'inc': 1},
+        ]
+        for value in values:
+            eq_(value, loads(dumps(value)))
+
+    def test_dates(self):
+        eq_('2016-01-02T03:04:05Z', loads(dumps(datetime(2016, 1, 2, 3, 4, 5))))
+        eq_(
+            '2016-01-02T03:04:05.250Z',
+            loads(dumps(datetime(2016, 1, 2, 3, 4, 5, 250000))),
+        )
+
+    def test_named_lists(self):
+        facets = NamedList([
+            ('facet_fields', NamedList([
+                ('cat', NamedList([('a', 2), ('b', 1)])),
+            ], ordered=True)),
+            ('facets', NamedList([
+                ('count', 3),
+                ('cat', NamedList([('buckets', [
+                    NamedList([('val', 'a'), ('count', 2)], ordered=True),
+                ])], ordered=True)),
+            ], ordered=True)),
+        ], ordered=True)
+        eq_(
+            {
+                'facet_fields': {'cat': ['a', 2, 'b', 1]},
+                'facets': {'count': 3, 'cat': {'buckets': [{'val': 'a', 'count': 2}]}},
+            },
+            loads(dumps(facets)),
+        )
+
+    def test_documents(self):
+        docs = DocumentList(
+            [{'id': str(i), 'score': 0.1, 'tags': ['x', 'y']} for i in range(40)],
+            num_found = 100,
+            start     = 20,
+            max_score = 0.1,
+        )
+        res = loads(dumps(docs))
+        eq_(100, res['numFound'])
+        eq_(20, res['start'])
+        eq_(0.1, res['maxScore'])
+        eq_(40, len(res['docs']))
+        eq_({'id': '39', 'score': 0.1, 'tags': ['x', 'y']}, res['docs'][-1])
+
+    def test_update_request(self):
+        body = update_request(
+            [{'id': '1', 'n': {'inc': 1}, '_childDocuments_': [{'id': '1a'}]}],
+            params     = {'commitWithin': 1000},
+            delete_ids = ['2'],
+        )
+        eq_(
+            {
+                'params':  ['commitWithin', ['1000']],
+                'delById': ['2'],
+                'delByQ':  None,
+                'docs':    [{'id': '1', 'n': {'inc': 1}, '_childDocuments_': [{'id': '1a'}]}],
+            },
+            loads(body),
+        )
+
+    def test_errors(self):
+        self.assertRaises(JavabinError, loads, b'{"a":1}')
+        self.assertRaises(JavabinError, loads, RESPONSE[:-3])
+        self.assertRaises(JavabinError, dumps, object())
+
+    def test_query_result(self):
+        res = QueryResult(response(RESPONSE), codec=JavabinCodec())
+        eq_(1, res.num_found)
+        eq_(0, res.header['status'])
+        eq_([{'id': '1'}], res.docs)
+        eq_('1', res[0]['id'])
+
+        body = dumps(NamedList([
+            ('response', DocumentList([])), ('nextCursorMark', 'AoE'),
+        ]))
+        eq_('AoE', QueryResult(response(body), codec=JavabinCodec()).next_cursor_mark)
+
+
+class JavabinRequestTestCase(AsyncTestCase):
+    @gen_test(timeout=5)
+    def test_query(self):
+        client = make_client(RecordingHTTPClient(RESPONSE), ioloop=self.io_loop)
+        res = yield client.query('c', {'q': '*:*'}, wt='javabin')
+        ok_('wt=javabin' in client.client.requests[0].url)
+        eq_([{'id': '1'}], res.docs)
+
+    @gen_test(timeout=5)
+    def test_add(self):
+        client = make_client(RecordingHTTPClient(), ioloop=self.io_loop)
+        yield client.add_javabin_documents('c', [{'id': '1'}], overwrite=False)
+        request = client.client.requests[0]
+        eq_('application/javabin', request.headers['Content-Type'])
+        ok_(request.url.endswith('/solr/c/update?wt=json'))
+        body = loads(request.body)
+        eq_(['commitWithin', ['1000'], 'overwrite', ['false']], body['params'])
+        eq_([{'id': '1'}], body['docs'])
@@ -0,0 +1,105 @@
+from nose.tools import ok_, eq_
+from solnado.client import SolrConfigurationError
+from solnado.lb import LoadBalancedClient
+from solnado.retry import CircuitBreaker, RetryPolicy
+from tornado.testing import AsyncTestCase, gen_test
+
+from fakes import NodesHTTPClient, make_client
+
+
+class LoadBalancerTestCase(AsyncTestCase):
+    def make_client(self, **kwargs):
+        kwargs.setdefault('ping_interval', None)
+        return make_client(
+            NodesHTTPClient(),
+            ['a:8983', ('b', 8983), 'http://c:8983'],
+            cls    = LoadBalancedClient,
+            ioloop = self.io_loop,
+            **kwargs
+        )
+
+    def test_config(self):
+        self.assertRaises(SolrConfigurationError, LoadBalancedClient, [])
+        self.assertRaises(
+            SolrConfigurationError, LoadBalancedClient, ['a:1'], strategy='x'
+        )
+        client = self.make_client()
+        eq_(
+            ['http://a:8983', 'http://b:8983', 'http://c:8983'],
+            [n.url for n in client.nodes],
+        )
+
+    @gen_test(timeout=5)
+    def test_round_robin(self):
+        client = self.make_client()
+        for c in 'abcdef':
+            yield client.schema(c)
+        eq_(
+            ['http://a:8983', 'http://b:8983', 'http://c:8983'] * 2,
+            client.client.nodes(),
+        )
+        ok_(client.client.requests[1].url.endswith('/solr/b/schema?indent=off&wt=json'))
+
+    @gen_test(timeout=5)
+    def test_least_outstanding(self):
+        client = self.make_client(strategy='least_outstanding')
+        client.client.held['http://a:8983'] = []
+        client.schema('1')
+        yield client.schema('2')
+        yield client.schema('3')
+        nodes = client.client.nodes()
+        eq_(['http://a:8983', 'http://b:8983'], nodes[:2])
+        ok_(nodes[2] != 'http://a:8983')
+        eq_(1, client.nodes[0].outstanding)
+        client.client.release('http://a:8983')
+
+    @gen_test(timeout=5)
+    def test_failover_and_recovery(self):
+        client = self.make_client(fail_threshold=2, retry_after=60)
+        client.client.codes['http://b:8983'] = 503
+        for i in range(6):
+            yield client.schema(str(i))
+        ok_(not client.nodes[1].healthy)
+        eq_(2, client.nodes[1].errors)
+
+        del client.client.requests[:]
+        for i in range(4):
+            yield client.schema(str(i))
+        ok_('http://b:8983' not in client.client.nodes())
+
+        del client.client.codes['http://b:8983']
+        yield client.ping()
+        ok_(client.nodes[1].healthy)
+        ok_(client.nodes[1].latency is not None)
+
+    @gen_test(timeout=5)
+    def test_all_down(self):
+        client = self.make_client(fail_threshold=1)
+        for node in client.nodes:
+            client.client.codes[node.url] = 599
+        for i in range(6):
+            yield client.schema(str(i))
+        eq_(6, len(client.client.requests))
+
+    @gen_test(timeout=5)
+    def test_open_circuit_retried_elsewhere(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.record('http://a:8983', None, IOError())
+        client  = self.make_client(
+            retry=RetryPolicy(backoff=0.001), circuit_breaker=breaker
+        )
+        res = yield client.query('c', {'q': '*:*'})
+        eq_(200, res.code)
+        nodes = client.client.nodes()
+        eq_(1, len(nodes))
+        ok_(nodes[0] != 'http://a:8983')
+        eq_(1, client.stats['shed'])
+        eq_(1, client.stats['retries'])
+
+    @gen_test(timeout=5)
+    def test_explicit_base_url(self):
+        client = self.make_client()
+        yield client._post_json(
+            '/update', [], base_url='http://leader:8983/solr/c_shard1'
+        )
+        eq_('http://leader:8983/solr/c_shard1/update', client.client.requests[0].url)
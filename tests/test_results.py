@@ -0,0 +1,136 @@
+import json
+from io import BytesIO
+from unittest import TestCase
+from nose.tools import ok_, eq_
+from solnado.codec import JSONCodec
+from solnado.results import DocumentFactory, QueryResult
+from tornado.httpclient import HTTPRequest, HTTPResponse
+
+
+def response(body, code=200):
+    if not isinstance(body, bytes):
+        body = json.dumps(body).encode('utf8')
+    return HTTPResponse(
+        HTTPRequest('http://localhost:8983/solr/c/query'),
+        code,
+        buffer = BytesIO(body),
+    )
+
+
+def solr_body(n=100, **kwargs):
+    body = {
+        'responseHeader': {'status': 0, 'QTime': 1, 'params': {'q': '*:*'}},
+        'response': {
+            'numFound': 12345,
+            'start':    0,
+            'docs':     [{'id': str(i), 'title': 't%d' % i} for i in range(n)],
+        },
+        'facet_counts': {'facet_fields': {}},
+    }
+    body['response'].update(kwargs)
+    return body
+
+
+class QueryResultTestCase(TestCase):
+    def test_header(self):
+        res = QueryResult(response(solr_body()))
+        eq_(0, res.header['status'])
+        eq_(12345, res.num_found)
+        eq_(0, res.start)
+        eq_(0, res.decoded)
+        eq_(200, res.code)
+
+    def test_lazy_docs(self):
+        res = QueryResult(response(solr_body()))
+        first = [d['id'] for _, d in zip(range(10), res)]
+        eq_([str(i) for i in range(10)], first)
+        eq_(10, res.decoded)
+        eq_('50', res[50]['id'])
+        eq_(51, res.decoded)
+        eq_(100, len(res))
+        eq_('99', res[-1]['id'])
+
+    def test_indented(self):
+        body = json.dumps(solr_body(5), indent=2).encode('utf8')
+        res = QueryResult(response(body))
+        eq_(12345, res.num_found)
+        eq_(['0', '1', '2', '3', '4'], [d['id'] for d in res])
+
+    def test_max_score(self):
+        body = solr_body(2)
+        body['response'] = dict(
+            [('numFound', 2), ('start', 0), ('maxScore', 1.5),
+             ('docs', body['response']['docs'])]
+        )
+        res = QueryResult(response(json.dumps(body).encode('utf8')))
+        eq_(1.5, res.max_score)
+        eq_(2, len(res))
+
+    def test_next_cursor_mark(self):
+        body = solr_body(3)
+        body['response']['docs'][1]['text'] = '], "nextCursorMark": "bad" {'
+        body['nextCursorMark'] = 'AoE'
+        body = json.dumps(body).encode('utf8')
+
+        eq_('AoE', QueryResult(response(body)).next_cursor_mark)
+        res = QueryResult(response(body))
+        res[1]
+        eq_('AoE', res.next_cursor_mark)
+        res.docs
+        eq_('AoE', res.next_cursor_mark)
+
+        body = solr_body(3)
+        body['response']['docs'][2]['nextCursorMark'] = 'bad'
+        eq_(None, QueryResult(response(body)).next_cursor_mark)
+
+    def test_fallback(self):
+        body = {'response': {'docs': [{'id': '1'}], 'numFound': 1, 'start': 0}}
+        res = QueryResult(response(body), codec=JSONCodec())
+        eq_(1, res.num_found)
+        eq_({'id': '1'}, res[0])
+
+    def test_data(self):
+        res = QueryResult(response(solr_body(3)))
+        eq_({'facet_fields': {}}, res.data['facet_counts'])
+
+    def test_error(self):
+        res = QueryResult(response(b'<html>oops</html>', code=500))
+        eq_(None, res.num_found)
+        eq_(0, len(res))
+        eq_(500, res.code)
+
+    def test_empty(self):
+        res = QueryResult(response(solr_body(0)))
+        eq_([], list(res))
+
+    def test_child_documents(self):
+        body = solr_body(0)
+        body['response']['docs'] = [{
+            'id': '1',
+            '_childDocuments_': [{'id': '1-1', 'meta': {'lang': 'en'}}],
+        }]
+        doc   = QueryResult(response(body))[0]
+        child = doc['_childDocuments_'][0]
+        ok_(isinstance(child, dict))
+        ok_(isinstance(child['meta'], dict))
+        eq_(body['response']['docs'][0], json.loads(json.dumps(doc.to_dict())))
+
+
+class DocumentTestCase(TestCase):
+    def test_shared_index(self):
+        factory = DocumentFactory()
+        a = factory([('id', '1'), ('title', 'a')])
+        b = factory([('id', '2'), ('title', 'b')])
+        ok_(a._index is b._index)
+        ok_(not hasattr(a, '__dict__'))
+
+    def test_mapping(self):
+        doc = DocumentFactory()([('id', '1'), ('title', 'a')])
+        eq_('1', doc['id'])
+        eq_('a', doc.get('title'))
+        eq_(None, doc.get('missing'))
+        ok_('id' in doc)
+        eq_({'id': '1', 'title': 'a'}, doc.to_dict())
+        eq_(doc, {'id': '1', 'title': 'a'})
+        eq_(2, len(doc))
+        self.assertRaises(KeyError, lambda: doc['missing'])
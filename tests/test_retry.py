@@ -0,0 +1,196 @@
+from nose.tools import ok_, eq_
+from solnado.retry import (
+    CircuitBreaker, RetryBudget, RetryPolicy, SolrCircuitOpenError
+)
+from tornado.testing import AsyncTestCase, gen_test
+from unittest import TestCase
+
+from fakes import Clock, ScriptedHTTPClient, make_client, response
+
+
+class RetryBudgetTestCase(TestCase):
+    def test_budget(self):
+        clock  = Clock()
+        budget = RetryBudget(ratio=0.5, min_retries=1, window=10, clock=clock)
+        ok_(budget.withdraw())
+        ok_(not budget.withdraw())
+
+        for _ in range(4):
+            budget.deposit()
+        ok_(budget.withdraw())
+        ok_(not budget.withdraw())
+
+        clock.now += 11
+        ok_(budget.withdraw())
+
+    def test_policy(self):
+        policy = RetryPolicy(max_attempts=3, backoff=1, max_backoff=3, budget=False)
+        for attempt in range(1, 6):
+            ok_(0 <= policy.delay(attempt) <= min(3, 2 ** attempt))
+
+        ok_(policy.should_retry(None, IOError(), 1))
+        ok_(policy.should_retry(response(code=503), None, 2))
+        ok_(not policy.should_retry(response(code=503), None, 3))
+        ok_(not policy.should_retry(response(code=400), None, 1))
+
+        ok_(policy.keyed([{'id': 1}, {'id': 2}]))
+        ok_(not policy.keyed([{'id': 1}, {'name': 'x'}]))
+        ok_(not policy.keyed([{'id': 1}, {'id': 2, 'views': {'inc': 1}}]))
+
+
+class CircuitBreakerTestCase(TestCase):
+    def test_states(self):
+        clock   = Clock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=5, clock=clock)
+        node    = 'http://a:8983'
+        failed  = response(code=503)
+
+        breaker.record(node, failed, None)
+        eq_('closed', breaker.state(node))
+        breaker.record(node, failed, None)
+        eq_('open', breaker.state(node))
+        ok_(not breaker.allow(node))
+
+        clock.now += 5
+        ok_(breaker.allow(node))
+        eq_('half_open', breaker.state(node))
+        ok_(not breaker.allow(node))
+        breaker.record(node, None, IOError())
+        eq_('open', breaker.state(node))
+
+        clock.now += 5
+        ok_(breaker.allow(node))
+        breaker.record(node, response(), None)
+        eq_('closed', breaker.state(node))
+        ok_(breaker.allow('http://b:8983'))
+
+
+class RetryingClientTestCase(AsyncTestCase):
+    def make_client(self, *codes, **kwargs):
+        kwargs.setdefault('retry', RetryPolicy(backoff=0.001))
+        return make_client(
+            ScriptedHTTPClient(*codes), codec='json', ioloop=self.io_loop, **kwargs
+        )
+
+    @gen_test(timeout=5)
+    def test_query_retried(self):
+        client = self.make_client(503, None)
+        res = yield client.query('c', {'q': '*:*'})
+        eq_(200, res.code)
+        eq_(3, len(client.client.requests))
+        eq_(2, client.stats['retries'])
+
+    @gen_test(timeout=5)
+    def test_gives_up(self):
+        client = self.make_client(503, 503, 503, 503)
+        res = yield client.schema('c')
+        eq_(503, res.code)
+        eq_(3, len(client.client.requests))
+
+        client = self.make_client(None, None, None)
+        try:
+            yield client.schema('c')
+            ok_(False)
+        except IOError:
+            pass
+
+    @gen_test(timeout=5)
+    def test_keyed_adds(self):
+        client = self.make_client(503)
+        res = yield client.add_json_documents('c', [{'id': '1'}, {'id': '2'}])
+        eq_(200, res.code)
+        eq_(2, len(client.client.requests))
+
+        client = self.make_client(503)
+        res = yield client.add_json_documents('c', [{'id': '1'}, {'title': 'x'}])
+        eq_(503, res.code)
+        eq_(1, len(client.client.requests))
+
+        client = self.make_client(503)
+        res = yield client.add_json_document('c', {'id': '1'}, overwrite=False)
+        eq_(503, res.code)
+
+        client = self.make_client(503)
+        res = yield client.add_json_documents('c', [{'id': '1', 'views': {'inc': 1}}])
+        eq_(503, res.code)
+        eq_(1, len(client.client.requests))
+
+    @gen_test(timeout=5)
+    def test_windowed_adds(self):
+        client = self.make_client(503, add_window=0.01)
+        res = yield client.add_json_document('c', {'id': '1'})
+        eq_(200, res.code)
+        eq_(2, len(client.client.requests))
+
+        client = self.make_client(503, add_window=0.01)
+        client.add_json_document('c', {'id': '1'})
+        res = yield client.add_json_document('c', {'title': 'x'})
+        eq_(503, res.code)
+        eq_(1, len(client.client.requests))
+
+    @gen_test(timeout=5)
+    def test_admin_not_retried(self):
+        client = self.make_client(503)
+        res = yield client.reload_collection('c')
+        eq_(503, res.code)
+        eq_(1, len(client.client.requests))
+
+    @gen_test(timeout=5)
+    def test_budget(self):
+        budget = RetryBudget(ratio=0, min_retries=1)
+        client = self.make_client(
+            503, 503, 503, 503, retry=RetryPolicy(backoff=0.001, budget=budget)
+        )
+        res = yield client.schema('c')
+        eq_(503, res.code)
+        eq_(2, len(client.client.requests))
+
+    @gen_test(timeout=5)
+    def test_circuit_breaker(self):
+        clock  = Clock()
+        client = self.make_client(
+            503, 503,
+            retry           = None,
+            circuit_breaker = CircuitBreaker(
+                failure_threshold=2, reset_timeout=5, clock=clock
+            ),
+        )
+        for _ in range(2):
+            res = yield client.schema('c')
+            eq_(503, res.code)
+
+        try:
+            yield client.schema('c')
+            ok_(False)
+        except SolrCircuitOpenError:
+            pass
+        eq_(2, len(client.client.requests))
+        eq_(1, client.stats['shed'])
+
+        responses = []
+        try:
+            yield client.schema('c', callback=responses.append)
+        except SolrCircuitOpenError:
+            pass
+        eq_(599, responses[0].code)
+
+        clock.now += 5
+        res = yield client.schema('c')
+        eq_(200, res.code)
+        eq_('closed', client.breaker.state('http://localhost:8983'))
+
+    @gen_test(timeout=5)
+    def test_open_circuit_not_retried(self):
+        breaker = CircuitBreaker(failure_threshold=1, clock=Clock())
+        breaker.record('http://localhost:8983', None, IOError())
+        client  = self.make_client(
+            retry=RetryPolicy(backoff=10), circuit_breaker=breaker
+        )
+        try:
+            yield client.query('c', {'q': '*:*'})
+            ok_(False)
+        except SolrCircuitOpenError:
+            pass
+        eq_(0, len(client.client.requests))
+        eq_(1, client.stats['shed'])
+        eq_(0, client.stats['retries'])
@@ -0,0 +1,94 @@
+from unittest import TestCase
+from nose.tools import ok_, eq_
+from solnado.routing import (
+    CompositeIdRouter,
+    SolrRoutingError,
+    composite_id_hash,
+    murmurhash3_x86_32,
+    parse_range,
+)
+
+
+def cluster_status(nshards=2):
+    step = 0x100000000 // nshards
+    shards = {}
+    for i in range(nshards):
+        lo = (0x80000000 + i * step) & 0xffffffff
+        hi = (lo + step - 1) & 0xffffffff
+        shards['shard%d' % (i + 1)] = {
+            'range':    '%08x-%08x' % (lo, hi),
+            'state':    'active',
+            'replicas': {
+                'core_node%d' % (i + 1): {
+                    'core':     'c_shard%d_replica1' % (i + 1),
+                    'base_url': 'http://node%d:8983/solr' % i,
+                    'state':    'active',
+                    'leader':   'true',
+                },
+            },
+        }
+    return {'cluster': {'collections': {'c': {
+        'router': {'name': 'compositeId'},
+        'shards': shards,
+    }}}}
+
+
+class RoutingTestCase(TestCase):
+    def test_murmurhash3(self):
+        eq_(0, murmurhash3_x86_32(''))
+        eq_(0x248bfa47, murmurhash3_x86_32('hello') & 0xffffffff)
+        eq_(
+            0x2e4ff723,
+            murmurhash3_x86_32(
+                'The quick brown fox jumps over the lazy dog'
+            ) & 0xffffffff
+        )
+
+    def test_composite_id_hash(self):
+        eq_(murmurhash3_x86_32('plain'), composite_id_hash('plain'))
+        h = composite_id_hash('IBM!12345') & 0xffffffff
+        eq_(murmurhash3_x86_32('IBM') & 0xffff0000, h & 0xffff0000)
+        eq_(murmurhash3_x86_32('12345') & 0x0000ffff, h & 0x0000ffff)
+
+        h = composite_id_hash('IBM/4!12345') & 0xffffffff
+        eq_(murmurhash3_x86_32('IBM') & 0xf0000000, h & 0xf0000000)
+
+        h = composite_id_hash('a!b!c') & 0xffffffff
+        eq_(murmurhash3_x86_32('a') & 0xff000000, h & 0xff000000)
+        eq_(murmurhash3_x86_32('b') & 0x00ff0000, h & 0x00ff0000)
+        eq_(murmurhash3_x86_32('c') & 0x0000ffff, h & 0x0000ffff)
+
+    def test_parse_range(self):
+        eq_((-0x80000000, -1), parse_range('80000000-ffffffff'))
+        eq_((0, 0x7fffffff), parse_range('0-7fffffff'))
+
+    def test_router(self):
+        router = CompositeIdRouter.from_cluster_status(cluster_status(4), 'c')
+        eq_(4, len(router.shards))
+        for i in range(100):
+            shard = router.shard_for(str(i))
+            h = composite_id_hash(str(i))
+            ok_(shard.range_min <= h <= shard.range_max)
+
+        docs = [{'id': 'tenant!%d' % i} for i in range(20)]
+        groups = router.group(docs)
+        eq_(1, len(groups))
+        shard = list(groups)[0]
+        ok_(shard.leader_url.startswith('http://node'))
+        ok_(shard.leader_url.endswith('_replica1'))
+
+    def test_router_skips_inactive(self):
+        status = cluster_status(2)
+        status['cluster']['collections']['c']['shards']['shard1']['state'] = \
+            'inactive'
+        router = CompositeIdRouter.from_cluster_status(status, 'c')
+        eq_(1, len(router.shards))
+        self.assertRaises(SolrRoutingError, lambda: [
+            router.shard_for(str(i)) for i in range(100)
+        ])
+
+    def test_router_unknown_collection(self):
+        self.assertRaises(
+            SolrRoutingError,
+            CompositeIdRouter.from_cluster_status, cluster_status(), 'x'
+        )
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+import json
+from nose.tools import ok_, eq_
+from solnado import SolrClient
+from solnado.expressions import metric, rollup, search
+from solnado.stream import JSONDocsParser, SolrStreamError
+from tornado import gen, web
+from tornado.httpclient import HTTPError
+from tornado.testing import AsyncHTTPTestCase, gen_test
+from unittest import TestCase
+
+
+def export_body(ndocs, pad=0):
+    docs = [{'id': '%05d' % i, 'pad': 'x' * pad} for i in range(ndocs)]
+    return json.dumps({
+        'responseHeader': {'status': 0},
+        'response': {'numFound': ndocs, 'docs': docs},
+    }).encode('utf8')
+
+
+class ExportHandler(web.RequestHandler):
+    @gen.coroutine
+    def get(self, collection):
+        args = dict((k, self.get_argument(k)) for k in self.request.arguments)
+        self.application.settings['requests'].append((collection, args))
+
+        if collection == 'missing':
+            self.set_status(400)
+            self.finish('{"error":{"msg":"no such collection"}}')
+            return
+
+        body = export_body(int(args.get('n', 10)), int(args.get('pad', 0)))
+        if collection == 'truncated':
+            body = body[:len(body) // 2]
+
+        for i in range(0, len(body), 1000):
+            self.write(body[i:i + 1000])
+            yield self.flush()
+
+
+class StreamHandler(web.RequestHandler):
+    def post(self, collection):
+        expr = self.get_argument('expr')
+        self.application.settings['requests'].append((collection, {'expr': expr}))
+
+        tuples = [{'a_s': 'x', 'sum(b_i)': 3}, {'a_s': 'y', 'sum(b_i)': 4}]
+        if 'fail' in expr:
+            tuples.append({'EXCEPTION': 'bad expression', 'EOF': True})
+        else:
+            tuples.append({'EOF': True, 'RESPONSE_TIME': 5})
+        body = json.dumps({'result-set': {'docs': tuples}}).encode('utf8')
+        for i in range(0, len(body), 7):
+            self.write(body[i:i + 7])
+            self.flush()
+
+
+class JSONDocsParserTestCase(TestCase):
+    def test_split_chunks(self):
+        body = json.dumps({
+            'responseHeader': {'status': 0},
+            'response': {'numFound': 3, 'docs': [
+                {'id': 'a', 'v': [1, 2]},
+                {'id': 'b', 'name': u'über'},
+                {'id': 'c', 'nested': {'x': '}]'}},
+            ]},
+        }, ensure_ascii=False).encode('utf8')
+
+        for size in (1, 2, 7, len(body)):
+            parser = JSONDocsParser()
+            docs = []
+            for i in range(0, len(body), size):
+                docs.extend(parser.feed(body[i:i + size]))
+            ok_(parser.done)
+            eq_(3, parser.num_found)
+            eq_(['a', 'b', 'c'], [d['id'] for d in docs])
+            eq_(u'über', docs[1]['name'])
+            eq_({'x': '}]'}, docs[2]['nested'])
+            ok_(isinstance(docs[2]['nested'], dict))
+
+    def test_buffer_is_trimmed(self):
+        parser = JSONDocsParser()
+        body = export_body(100)
+        for i in range(0, len(body), 50):
+            parser.feed(body[i:i + 50])
+            ok_(len(parser._buf) <= 100)
+
+
+class ExportTestCase(AsyncHTTPTestCase):
+    def get_app(self):
+        self.requests = []
+        return web.Application(
+            [
+                (r'/solr/(\w+)/export', ExportHandler),
+                (r'/solr/(\w+)/stream', StreamHandler),
+            ],
+            requests = self.requests,
+        )
+
+    def get_client(self):
+        return SolrClient(port=self.get_http_port(), ioloop=self.io_loop)
+
+    @gen_test(timeout=5)
+    def test_export(self):
+        stream = self.get_client().export(
+            'c', {'q': '*:*', 'n': 250}, fl='id', sort='id asc'
+        )
+        ids = []
+        while True:
+            doc = yield stream.next()
+            if doc is None:
+                break
+            ids.append(doc['id'])
+
+        eq_(['%05d' % i for i in range(250)], ids)
+        eq_(250, stream.num_found)
+        collection, args = self.requests[0]
+        eq_('c', collection)
+        eq_('id', args['fl'])
+        eq_('id asc', args['sort'])
+        eq_('json', args['wt'])
+
+    @gen_test(timeout=5)
+    def test_connect_timeout(self):
+        stream = self.get_client().export(
+            'c', {'q': '*:*', 'n': 3}, connect_timeout=5
+        )
+        doc = yield stream.next()
+        eq_('00000', doc['id'])
+
+        client = SolrClient(
+            port=self.get_http_port(), ioloop=self.io_loop, connect_timeout=5
+        )
+        stream = client.stream('c', 'fail()')
+        t = yield stream.next()
+        eq_('x', t['a_s'])
+
+    @gen_test(timeout=5)
+    def test_back_pressure(self):
+        stream = self.get_client().export(
+            'c', {'q': '*:*', 'n': 2000, 'pad': 1000}, max_buffer=10
+        )
+        doc = yield stream.next()
+        eq_('00000', doc['id'])
+        yield gen.sleep(0.2)
+        # reads pause once the buffer is full, so at most one extra read of
+        # roughly 64k, about 65 documents here, can overshoot
+        ok_(stream.buffered <= 10 + 70, stream.buffered)
+
+        count = 1
+        while True:
+            doc = yield stream.next()
+            if doc is None:
+                break
+            count += 1
+        eq_(2000, count)
+
+    @gen_test(timeout=5)
+    def test_cancel(self):
+        stream = self.get_client().export(
+            'c', {'q': '*:*', 'n': 2000, 'pad': 1000}, max_buffer=10
+        )
+        yield stream.next()
+        stream.cancel()
+        doc = yield stream.next()
+        eq_(None, doc)
+
+    @gen_test(timeout=5)
+    def test_http_error(self):
+        stream = self.get_client().export('missing', {'q': '*:*'})
+        try:
+            yield stream.next()
+        except HTTPError as e:
+            eq_(400, e.code)
+        else:
+            ok_(False)
+
+    @gen_test(timeout=5)
+    def test_truncated(self):
+        stream = self.get_client().export('truncated', {'q': '*:*', 'n': 100})
+        try:
+            while (yield stream.next()) is not None:
+                pass
+        except SolrStreamError:
+            pass
+        else:
+            ok_(False)
+
+    @gen_test(timeout=5)
+    def test_stream(self):
+        expr = rollup(search('c', fl='a_s,b_i', sort='a_s asc'), 'a_s', metric('sum', 'b_i'))
+        stream = self.get_client().stream('c', expr)
+        tuples = []
+        while True:
+            t = yield stream.next()
+            if t is None:
+                break
+            tuples.append(t.to_dict())
+
+        eq_([{'a_s': 'x', 'sum(b_i)': 3}, {'a_s': 'y', 'sum(b_i)': 4}], tuples)
+        eq_(5, stream.eof['RESPONSE_TIME'])
+        eq_(('c', {'expr': str(expr)}), self.requests[0])
+
+    @gen_test(timeout=5)
+    def test_stream_exception(self):
+        stream = self.get_client().stream('c', 'fail()')
+        t = yield stream.next()
+        eq_('x', t['a_s'])
+        t = yield stream.next()
+        eq_('y', t['a_s'])
+        try:
+            yield stream.next()
+        except SolrStreamError as e:
+            eq_('bad expression', str(e))
+        else:
+            ok_(False)
@@ -0,0 +1,73 @@
+from nose.tools import ok_, eq_
+from solnado import CollectionHandle, QueryCache, QueryTemplate
+from tornado.testing import AsyncTestCase, gen_test
+from unittest import TestCase
+
+from fakes import RecordingHTTPClient, make_client, params
+
+try:
+    from urllib.parse import parse_qs
+except ImportError:
+    from urlparse import parse_qs
+
+
+class QueryTemplateTestCase(TestCase):
+    def test_render(self):
+        template = QueryTemplate({'fl': 'id,title', 'defType': 'edismax'})
+        eq_(template.encoded, template.render())
+        eq_(
+            {
+                'fl': ['id,title'], 'defType': ['edismax'], 'indent': ['off'],
+                'wt': ['json'], 'q': ['a b'],
+            },
+            parse_qs(template.render({'q': 'a b'})),
+        )
+        eq_(['id'], parse_qs(template.render({'fl': 'id'}))['fl'])
+        eq_({'fl': 'id,title', 'defType': 'edismax', 'q': 'a'}, template.merge({'q': 'a'}))
+
+
+class CollectionHandleTestCase(AsyncTestCase):
+    def make_handle(self, **kwargs):
+        client = make_client(RecordingHTTPClient(), ioloop=self.io_loop, **kwargs)
+        return CollectionHandle(client, 'c')
+
+    @gen_test(timeout=5)
+    def test_query(self):
+        handle   = self.make_handle()
+        template = QueryTemplate({'fl': 'id', 'rows': 10})
+        res = yield handle.query(template, {'q': 'shoes', 'facet.field': 'cat'})
+        eq_(200, res.code)
+
+        http = handle.client.client
+        ok_(http.requests[0].url.startswith('http://localhost:8983/solr/c/query?'))
+        eq_(['shoes'], params(http.requests[-1])['q'])
+        eq_(['cat'], params(http.requests[-1])['facet.field'])
+
+        yield handle.client.query('c', {'fl': 'id', 'rows': 10, 'q': 'shoes', 'facet.field': 'cat'})
+        eq_(params(http.requests[0]), params(http.requests[1]))
+
+        yield handle.query(template, {'q': 'x'}, timeout=1)
+        ok_(0 < int(params(http.requests[-1])['timeAllowed'][0]) <= 1000)
+        ok_(http.requests[-1].request_timeout <= 1)
+
+    @gen_test(timeout=5)
+    def test_falls_back(self):
+        handle   = self.make_handle(query_post_url=100)
+        template = QueryTemplate({'fl': 'id'})
+        yield handle.query(template, {'q': 'x' * 100})
+        eq_('POST', handle.client.client.requests[-1].method)
+        yield handle.query(template, {'q': 'x', 'fq': ['a', 'b']})
+        eq_('POST', handle.client.client.requests[-1].method)
+
+        handle = self.make_handle(cache=QueryCache())
+        yield handle.query(template, {'q': 'x'})
+        yield handle.query(template, {'q': 'x'})
+        eq_(1, len(handle.client.client.requests))
+        eq_(1, len(handle.client.cache))
+
+    @gen_test(timeout=5)
+    def test_callback(self):
+        handle    = self.make_handle()
+        responses = []
+        yield handle.query(QueryTemplate(), {'q': '*:*'}, callback=responses.append)
+        eq_(1, len(responses))